@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Dataset
+from .services import bump_history_version
 
 
 @admin.register(Dataset)
@@ -13,3 +14,12 @@ class DatasetAdmin(admin.ModelAdmin):
 	)
 	search_fields = ("name", "source_filename")
 	ordering = ("-uploaded_at",)
+
+	def delete_model(self, request, obj):
+		super().delete_model(request, obj)
+		bump_history_version([obj.owner_id])
+
+	def delete_queryset(self, request, queryset):
+		owner_ids = set(queryset.values_list("owner_id", flat=True))
+		super().delete_queryset(request, queryset)
+		bump_history_version(owner_ids)
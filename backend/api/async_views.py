@@ -0,0 +1,272 @@
+"""Async versions of the dataset read endpoints, for ASGI deployments.
+
+DRF views are synchronous, so under ASGI Django runs each one on a thread.
+With ``API_ASYNC_VIEWS`` the read paths (latest, history, detail, records and
+the report download) are routed here instead. They query through the async ORM
+and stream the PDF through an async iterator, so one event loop can hold many
+slow or idle dashboard clients.
+
+Serializers, renderers, pagination and the exception handler come from DRF
+unchanged. None of them does any I/O once the data is loaded. Only work that
+is sync by nature (Basic auth hashing, PDF rendering, building a missing
+column store) is handed to ``sync_to_async``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import content_disposition_header, http_date
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.authentication import BasicAuthentication, get_authorization_header
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from .authentication import CachedTokenAuthentication
+from .caching import acached_payload, dataset_key, history_key
+from .columns import column_store
+from .conditional import IMMUTABLE, REVALIDATE, aconditional_response, dataset_etag, history_etag
+from .filters import filter_records, is_truthy
+from .models import Dataset, DatasetOwnerState
+from .pdf import ensure_dataset_report, report_etag
+from .renderers import ColumnarJSONRenderer
+from .serializers import (
+	DatasetDetailSerializer,
+	DatasetSummarySerializer,
+	EquipmentRecordSerializer,
+)
+from .views import DatasetHistoryView as SyncDatasetHistoryView
+from .views import RecordPagination
+
+FILE_CHUNK_BYTES = 64 * 1024
+
+
+async def authenticate(request):
+	"""Token from the cache or one async query, then Basic (on a thread), then the session."""
+
+	result = await CachedTokenAuthentication().aauthenticate(request)
+	if result is None and get_authorization_header(request)[:6].lower() == b"basic ":
+		result = await sync_to_async(BasicAuthentication().authenticate)(request)
+	if result is None and hasattr(request, "auser"):
+		user = await request.auser()
+		if user.is_authenticated:
+			result = (user, None)
+	if result is None:
+		raise exceptions.NotAuthenticated()
+	return result
+
+
+class AsyncAPIView(View):
+	"""Read-only async counterpart of ``APIView``: authenticate, negotiate, render.
+
+	The browsable API is left out: its forms are rendered synchronously.
+	"""
+
+	http_method_names = ["get", "head", "options"]
+	renderer_classes = [JSONRenderer]
+
+	async def dispatch(self, request, *args, **kwargs):
+		self.request = Request(request)
+		renderer, media_type = JSONRenderer(), JSONRenderer.media_type
+		try:
+			renderer, media_type = DefaultContentNegotiation().select_renderer(
+				self.request, [renderer_class() for renderer_class in self.renderer_classes]
+			)
+			self.request.accepted_renderer, self.request.accepted_media_type = renderer, media_type
+			self.request.user, self.request.auth = await authenticate(request)
+			handler = getattr(self, request.method.lower(), None)
+			if handler is None:
+				raise exceptions.MethodNotAllowed(request.method)
+			response = await handler(self.request, *args, **kwargs)
+		except Exception as exc:
+			response = self.handle_exception(exc)
+		return self.finalize_response(response, renderer, media_type)
+
+	def handle_exception(self, exc):
+		if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+			exc.auth_header = CachedTokenAuthentication().authenticate_header(self.request)
+		response = exception_handler(exc, {"view": self, "request": self.request})
+		if response is None:
+			raise exc
+		return response
+
+	def finalize_response(self, response, renderer, media_type):
+		if len(self.renderer_classes) > 1:
+			patch_vary_headers(response, ("Accept",))
+		if not isinstance(response, Response):
+			return response
+		response.accepted_renderer = renderer
+		response.accepted_media_type = media_type
+		response.renderer_context = {"view": self, "request": self.request, "response": response}
+		# Return a plain response: Django would render a deferred one on a thread.
+		return HttpResponse(
+			response.rendered_content, status=response.status_code, headers=response.headers
+		)
+
+
+@sync_to_async
+def _warm_records(dataset: Dataset) -> None:
+	"""Load ``dataset.content`` and open (or build) its column store, off the event loop.
+
+	Serializing ``records`` afterwards does no database access.
+	"""
+
+	column_store(dataset.content)
+
+
+class IncludeRecordsMixin:
+	cache_control = REVALIDATE
+	renderer_classes = [JSONRenderer, ColumnarJSONRenderer]
+
+	def get_queryset(self):
+		return Dataset.objects.owned_by(self.request.user).summaries()
+
+	async def respond(self, request, dataset: Dataset):
+		include_records = is_truthy(request.query_params.get("include_records"))
+		serializer_class = DatasetDetailSerializer if include_records else DatasetSummarySerializer
+		variant = "records" if include_records else "summary"
+
+		async def serialize():
+			return serializer_class(dataset, context={"request": request}).data
+
+		async def build():
+			if include_records:
+				await _warm_records(dataset)
+				return Response(await serialize())
+			return Response(
+				await acached_payload("summary", dataset_key(dataset.pk, "summary"), serialize)
+			)
+
+		return await aconditional_response(
+			request,
+			dataset_etag(dataset, f"{variant}.{request.accepted_renderer.format}"),
+			build,
+			self.cache_control,
+		)
+
+
+class LatestDatasetView(IncludeRecordsMixin, AsyncAPIView):
+	async def get(self, request):
+		queryset = self.get_queryset()
+		dataset = await queryset.filter(latest_for__owner=request.user).afirst()
+		if dataset is None:
+			dataset = await queryset.order_by("-uploaded_at").afirst()
+			if not dataset:
+				raise Http404("No datasets have been uploaded yet.")
+			await DatasetOwnerState.objects.aupdate_or_create(
+				owner=request.user, defaults={"latest_dataset": dataset}
+			)
+		return await self.respond(request, dataset)
+
+
+class DatasetDetailView(IncludeRecordsMixin, AsyncAPIView):
+	cache_control = IMMUTABLE
+
+	async def get(self, request, pk):
+		try:
+			dataset = await self.get_queryset().aget(pk=pk)
+		except Dataset.DoesNotExist as exc:
+			raise Http404("No Dataset matches the given query.") from exc
+		return await self.respond(request, dataset)
+
+
+class DatasetHistoryView(AsyncAPIView):
+	history_limit = SyncDatasetHistoryView.history_limit
+
+	async def get(self, request):
+		version = await (
+			DatasetOwnerState.objects.filter(owner=request.user)
+			.values_list("history_version", flat=True)
+			.afirst()
+		)
+		queryset = (
+			Dataset.objects.owned_by(request.user)
+			.summaries()
+			.order_by("-uploaded_at")[: self.history_limit]
+		)
+
+		async def serialize():
+			datasets = [dataset async for dataset in queryset]
+			return DatasetSummarySerializer(datasets, many=True).data
+
+		async def build():
+			key = history_key(request.user.pk, version or 0)
+			return Response(await acached_payload("history", key, serialize))
+
+		return await aconditional_response(
+			request, history_etag(request.user.pk, version or 0, self.history_limit), build
+		)
+
+
+class DatasetRecordsView(AsyncAPIView):
+	"""Async ``DatasetRecordsView``: the same pages, filters and columnar format."""
+
+	renderer_classes = [JSONRenderer, ColumnarJSONRenderer]
+
+	async def get(self, request, pk):
+		try:
+			dataset = await (
+				Dataset.objects.select_related("content")
+				.only("id", "content__sha256")
+				.aget(pk=pk, owner=request.user)
+			)
+		except Dataset.DoesNotExist as exc:
+			raise Http404("No Dataset matches the given query.") from exc
+
+		paginator = RecordPagination()
+		paginator.request = request
+		paginator.limit = paginator.get_limit(request)
+		paginator.offset = paginator.get_offset(request)
+		fields = EquipmentRecordSerializer.Meta.fields
+		window = slice(paginator.offset, paginator.offset + paginator.limit)
+		store = await sync_to_async(column_store)(dataset.content)
+		# Sorting may build an index file on first use; keep it off the event loop.
+		rows = await sync_to_async(filter_records)(store, fields, request.query_params)
+		paginator.count = len(rows)
+		page = rows[window] if paginator.offset < paginator.count else []
+
+		if not isinstance(request.accepted_renderer, ColumnarJSONRenderer):
+			return paginator.get_paginated_response([dict(zip(fields, row)) for row in page])
+		columns = zip(*page) if page else ([] for _ in fields)
+		return paginator.get_paginated_response(dict(zip(fields, map(list, columns))))
+
+
+async def _read_chunks(path, chunk_size: int = FILE_CHUNK_BYTES):
+	handle = await asyncio.to_thread(open, path, "rb")
+	try:
+		while chunk := await asyncio.to_thread(handle.read, chunk_size):
+			yield chunk
+	finally:
+		handle.close()
+
+
+class DatasetReportView(AsyncAPIView):
+	async def get(self, request, pk):
+		try:
+			dataset = await Dataset.objects.summaries().aget(pk=pk, owner=request.user)
+		except Dataset.DoesNotExist as exc:
+			raise Http404("Dataset not found") from exc
+
+		etag = report_etag(dataset)
+		last_modified = int(dataset.uploaded_at.timestamp())
+		not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+		if not_modified is not None:
+			return not_modified
+
+		path = await sync_to_async(ensure_dataset_report)(dataset)
+		response = StreamingHttpResponse(_read_chunks(path), content_type="application/pdf")
+		response["Content-Length"] = str(path.stat().st_size)
+		response["Content-Disposition"] = content_disposition_header(
+			True, f"dataset-report-{dataset.uploaded_at:%Y%m%d%H%M%S}.pdf"
+		)
+		response["ETag"] = etag
+		response["Last-Modified"] = http_date(last_modified)
+		patch_cache_control(response, private=True, no_cache=True)
+		return response
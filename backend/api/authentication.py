@@ -0,0 +1,110 @@
+"""Token authentication backed by an in-process cache of validated tokens.
+
+``BasicAuthentication`` runs the password hasher (hundreds of thousands of
+PBKDF2 rounds) on every request. Clients now exchange credentials for a token
+once at ``/api/auth/login/``; each request then costs a dictionary lookup, or
+one indexed query when the token is not cached yet.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+DEFAULT_TOKEN_CACHE_SIZE = 1024
+DEFAULT_TOKEN_CACHE_TTL = 300
+
+
+class TokenCache:
+    """Thread-safe LRU of ``key -> (user, token)`` whose entries expire after ``ttl`` seconds.
+
+    The cache is per process: a token revoked in another worker stays valid
+    here for at most ``ttl`` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: tuple) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    max_size=int(getattr(settings, "API_TOKEN_CACHE_SIZE", DEFAULT_TOKEN_CACHE_SIZE)),
+    ttl=float(getattr(settings, "API_TOKEN_CACHE_TTL", DEFAULT_TOKEN_CACHE_TTL)),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``Authorization: Token <key>`` with validated tokens kept in ``token_cache``."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (user, token))
+        return user, token
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views; only a cache miss queries, through the async ORM."""
+
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        try:
+            key = header[1].decode() if len(header) == 2 else None
+        except UnicodeError:
+            key = None
+        if key is None:
+            # Malformed header: the sync path raises the matching error before any query.
+            return self.authenticate(request)
+
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related("user").aget(key=key)
+        except model.DoesNotExist as exc:
+            raise AuthenticationFailed(_("Invalid token.")) from exc
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        token_cache.set(key, (token.user, token))
+        return token.user, token
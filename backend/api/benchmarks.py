@@ -0,0 +1,386 @@
+"""Synthetic equipment data and reference implementations used by benchmarks."""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .columns import ColumnWriter
+from .metrics import DEFAULT_SAMPLE_SIZE, NUMERIC_COLUMNS, MetricsAccumulator, summarize
+from .models import Dataset, DatasetContent
+from .parallel_ingest import ingest_parallel
+from .parsing import _iter_chunks, _prepare_chunk
+from .services import SUMMARY_FIELDS, advance_latest_dataset
+
+BASE_EQUIPMENT_TYPES = (
+    "Pump",
+    "Valve",
+    "Compressor",
+    "HeatExchanger",
+    "Reactor",
+    "Condenser",
+)
+
+
+def equipment_types(cardinality: int) -> list:
+    """``cardinality`` distinct type labels, starting with the realistic ones."""
+
+    labels = list(BASE_EQUIPMENT_TYPES[:cardinality])
+    labels.extend(f"Type-{index}" for index in range(len(labels), cardinality))
+    return labels
+
+
+def synthetic_frame(
+    rows: int, type_cardinality: int = 6, seed: int = 0, first_id: int = 0
+) -> pd.DataFrame:
+    """A raw frame shaped like an uploaded CSV (original column headers)."""
+
+    rng = np.random.default_rng(seed)
+    labels = np.array(equipment_types(type_cardinality), dtype=object)
+    types = labels[rng.integers(0, len(labels), rows)]
+    ids = np.arange(first_id, first_id + rows)
+    names = np.char.add("EQ-", ids.astype(str)).astype(object)
+    return pd.DataFrame(
+        {
+            "Equipment Name": names,
+            "Type": types,
+            "Flowrate": rng.normal(120, 35, rows).round(3),
+            "Pressure": rng.normal(6, 1.5, rows).round(3),
+            "Temperature": rng.normal(110, 20, rows).round(3),
+        }
+    )
+
+
+def write_synthetic_csv(
+    path,
+    rows: int,
+    type_cardinality: int = 6,
+    seed: int = 0,
+    block_rows: int = 500_000,
+) -> int:
+    """Write a synthetic upload of ``rows`` rows in blocks; returns its size in bytes."""
+
+    with open(path, "w", newline="") as handle:
+        for block, start in enumerate(range(0, rows, block_rows)):
+            frame = synthetic_frame(
+                min(block_rows, rows - start), type_cardinality, seed=seed + block, first_id=start
+            )
+            frame.to_csv(handle, header=block == 0, index=False)
+    return Path(path).stat().st_size
+
+
+def parse_row_count(raw: str) -> int:
+    """``"10k"``, ``"1M"`` or ``"2500"`` to an integer row count."""
+
+    raw = raw.strip().lower().replace("_", "")
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(raw[-1:], 1)
+    digits = raw[:-1] if multiplier > 1 else raw
+    return int(float(digits) * multiplier)
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far, or ``None`` where unsupported."""
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Rollback(Exception):
+    pass
+
+
+def time_ingest_phases(path, chunk_rows: int) -> Dict[str, float]:
+    """Run the chunked ingest loop on ``path`` with a timer around each phase.
+
+    Rows go to a column store that is discarded afterwards, and its content
+    row is created inside a transaction that is rolled back, so the database
+    and media directory are left as they were.
+    """
+
+    timings = {"parse_seconds": 0.0, "metrics_seconds": 0.0, "store_write_seconds": 0.0}
+    accumulator = MetricsAccumulator(NUMERIC_COLUMNS)
+    try:
+        with transaction.atomic(), open(path, "rb") as handle:
+            content = DatasetContent.objects.create(file=Path(path).name)
+            columns = ColumnWriter(content)
+            try:
+                chunks = _iter_chunks(handle, chunk_rows)
+                while True:
+                    started = time.perf_counter()
+                    chunk = next(chunks, None)
+                    timings["parse_seconds"] += time.perf_counter() - started
+                    if chunk is None:
+                        break
+
+                    started = time.perf_counter()
+                    accumulator.update(chunk.values, chunk.names, chunk.types)
+                    timings["metrics_seconds"] += time.perf_counter() - started
+
+                    started = time.perf_counter()
+                    columns.append(chunk)
+                    timings["store_write_seconds"] += time.perf_counter() - started
+            finally:
+                columns.abort()
+
+            started = time.perf_counter()
+            summarize(accumulator)
+            timings["metrics_seconds"] += time.perf_counter() - started
+            raise _Rollback
+    except _Rollback:
+        pass
+    return {key: round(value, 4) for key, value in timings.items()}
+
+
+def time_parallel_parse(path, processes, range_bytes: int, chunk_rows: int) -> Dict[str, float]:
+    """Seconds to parse and reduce ``path`` with each worker count in ``processes``.
+
+    Rows are discarded instead of written, so this isolates the part of ingest
+    that runs in worker processes.
+    """
+
+    timings = {}
+    for count in processes:
+        started = time.perf_counter()
+        ingest_parallel(
+            path,
+            lambda chunk, offset: None,
+            processes=count,
+            range_bytes=range_bytes,
+            chunk_rows=chunk_rows,
+            sample_size=DEFAULT_SAMPLE_SIZE,
+        )
+        timings[str(count)] = round(time.perf_counter() - started, 4)
+    return timings
+
+
+def time_request(send: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Median and best latency in milliseconds of ``send()`` over ``repeat`` calls."""
+
+    samples = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        response = send()
+        if getattr(response, "streaming", False):
+            b"".join(response.streaming_content)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.close()
+        if response.status_code >= 400:
+            raise RuntimeError(f"Benchmark request failed with HTTP {response.status_code}.")
+    return {"median_ms": round(statistics.median(samples), 2), "best_ms": round(min(samples), 2)}
+
+
+def legacy_compute_metrics(raw: pd.DataFrame) -> Tuple[Dict, Dict]:
+    """The pre-engine ``_load_dataframe`` + ``_compute_metrics`` path, kept as a baseline."""
+
+    renames = {
+        "Equipment Name": "equipment_name",
+        "Type": "equipment_type",
+        "Flowrate": "flowrate",
+        "Pressure": "pressure",
+        "Temperature": "temperature",
+    }
+    df = raw[list(renames.keys())].rename(columns=renames)
+    for column in ("flowrate", "pressure", "temperature"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    if df[["flowrate", "pressure", "temperature"]].isnull().any().any():
+        raise ValueError("Numeric columns contain invalid values. Please clean the CSV.")
+    df["flowrate"] = df["flowrate"].round(2)
+    df["pressure"] = df["pressure"].round(2)
+    df["temperature"] = df["temperature"].round(2)
+
+    totals = {
+        "total_records": int(df.shape[0]),
+        "avg_flowrate": round(df["flowrate"].mean(), 2),
+        "avg_pressure": round(df["pressure"].mean(), 2),
+        "avg_temperature": round(df["temperature"].mean(), 2),
+    }
+    raw_distribution = df["equipment_type"].value_counts().sort_index().to_dict()
+    type_distribution = {str(key): int(value) for key, value in raw_distribution.items()}
+
+    def _extreme(column: str, agg_func: str) -> Dict:
+        idx_func = df[column].idxmax if agg_func == "max" else df[column].idxmin
+        row = df.loc[idx_func()]
+        return {
+            "equipment_name": row["equipment_name"],
+            "equipment_type": row["equipment_type"],
+            column: float(row[column]),
+        }
+
+    metrics = {
+        "max_flowrate": _extreme("flowrate", "max"),
+        "min_flowrate": _extreme("flowrate", "min"),
+        "max_temperature": _extreme("temperature", "max"),
+    }
+    return totals | {"type_distribution": type_distribution}, metrics
+
+
+def pandas_group_stats(raw: pd.DataFrame) -> pd.DataFrame:
+    """Per-type mean/min/max/p95 the straightforward way, as a baseline for ``group_stats``."""
+
+    columns = ["Flowrate", "Pressure", "Temperature"]
+    grouped = raw.groupby("Type")[columns]
+    stats = grouped.agg(["count", "mean", "min", "max"])
+    upper = grouped.quantile(0.95)
+    upper.columns = pd.MultiIndex.from_product([upper.columns, ["p95"]])
+    return stats.join(upper)
+
+
+def engine_compute_metrics(raw: pd.DataFrame, sample_size: int = DEFAULT_SAMPLE_SIZE) -> Dict:
+    """Validate the frame and summarise it with the metrics engine."""
+
+    chunk = _prepare_chunk(raw)
+    accumulator = MetricsAccumulator(NUMERIC_COLUMNS, sample_size=sample_size)
+    accumulator.update(chunk.values, chunk.names, chunk.types)
+    return summarize(accumulator)
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    """Best wall-clock time in seconds over ``repeat`` runs."""
+
+    timings = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def grow_history(owner, content: DatasetContent, count: int) -> None:
+    """Add ``count`` datasets sharing ``content`` to ``owner``'s history and advance the pointer."""
+
+    summary = content.summary
+    datasets = Dataset.objects.bulk_create(
+        (
+            Dataset(
+                owner=owner,
+                name=f"history-{index}",
+                source_filename="history.csv",
+                content=content,
+                stored_bytes=content.size,
+                **{field: summary[field] for field in SUMMARY_FIELDS},
+            )
+            for index in range(count)
+        ),
+        batch_size=2_000,
+    )
+    if datasets:
+        advance_latest_dataset(datasets[-1])
+
+
+def time_latest_lookup(owner, history_sizes, repeat: int, send: Callable[[], object]) -> list:
+    """Latency of ``send`` (a latest-dataset request) as ``owner``'s history grows.
+
+    Each size also times the ordered scan the pointer replaced, for comparison.
+    The synthetic history is deleted afterwards; requests go through the full
+    handler, which closes the connection, so it cannot live in a transaction.
+    """
+
+    summary = engine_compute_metrics(synthetic_frame(10, type_cardinality=3))
+    content = DatasetContent.objects.create(
+        file="benchmark.csv", summary={field: summary[field] for field in SUMMARY_FIELDS}
+    )
+
+    def scan():
+        return Dataset.objects.owned_by(owner).summaries().order_by("-uploaded_at").first()
+
+    runs = []
+    size = 0
+    try:
+        for target in sorted(history_sizes):
+            grow_history(owner, content, target - size)
+            size = target
+            runs.append(
+                {
+                    "history": size,
+                    "endpoint": time_request(send, repeat),
+                    "ordered_scan_ms": round(best_of(scan, repeat) * 1000, 3),
+                }
+            )
+    finally:
+        Dataset.objects.filter(content=content).delete()
+        content.delete()
+    return runs
+
+
+# What a web worker does before it can serve its first request.
+STARTUP_SNIPPET = "import django; django.setup(); import config.urls"
+# Loaded on first use (ingest, PDF rendering, Parquet export), never at startup.
+LAZY_MODULES = ("pandas", "reportlab", "pyarrow")
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds per module from ``python -X importtime`` output.
+
+    Only top-level imports are kept, so the values sum to the total import time.
+    """
+
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure_startup(repeat: int, snippet: str = STARTUP_SNIPPET) -> Dict:
+    """Run ``snippet`` in fresh interpreters under ``-X importtime``.
+
+    Returns the median wall time (interpreter start included) and median
+    import time in milliseconds, the slowest top-level imports of the last run,
+    and which of ``LAZY_MODULES`` were imported.
+    """
+
+    env = {**os.environ}
+    env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    wall, imports, loaded = [], [], set()
+    modules: Dict[str, int] = {}
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", snippet],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall.append((time.perf_counter() - started) * 1000)
+        if completed.returncode:
+            raise RuntimeError(f"Startup snippet failed:\n{completed.stderr[-2000:]}")
+        modules = parse_importtime(completed.stderr)
+        imports.append(sum(modules.values()) / 1000)
+        names = {
+            line.rsplit("|", 1)[-1].strip()
+            for line in completed.stderr.splitlines()
+            if line.startswith("import time:")
+        }
+        loaded.update(
+            lazy
+            for lazy in LAZY_MODULES
+            if any(name == lazy or name.startswith(f"{lazy}.") for name in names)
+        )
+
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "wall_ms": round(statistics.median(wall), 1),
+        "import_ms": round(statistics.median(imports), 1),
+        "slowest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in slowest],
+        "lazy_modules_loaded": sorted(loaded),
+    }
@@ -0,0 +1,133 @@
+"""Computed dataset payloads kept in the Django cache, with hit and miss counters.
+
+Datasets never change after ingest, so serialized summaries, per-group stats
+and chart payloads are cached under keys that embed the dataset (or stored
+content) id. History lists are keyed by the owner's ``history_version``, which
+ingest and pruning bump, so a list is never served once it is out of date.
+``create_dataset_from_file`` and ``prune_datasets`` still delete the entries
+they supersede when their transaction commits, rather than leaving them to
+take up room until they are evicted.
+
+The counters are per process and served to staff at ``/api/cache/stats/``.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+
+from .conditional import PAYLOAD_VERSION
+from .metrics import GROUP_BY_FIELDS
+from .models import DatasetOwnerState
+
+PAYLOAD_KINDS = ("summary", "history", "stats", "charts")
+_MISSING = object()
+
+
+class CacheCounters:
+    """Thread-safe hit and miss counts per payload kind."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, hit: bool) -> None:
+        with self._lock:
+            self._counts[kind, hit] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                kind: {"hits": self._counts[kind, True], "misses": self._counts[kind, False]}
+                for kind in PAYLOAD_KINDS
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+counters = CacheCounters()
+
+
+def dataset_key(dataset_id, variant: str) -> str:
+    return f"dataset:{dataset_id}:{variant}:v{PAYLOAD_VERSION}"
+
+
+def stats_key(dataset_id, group_by: str) -> str:
+    return dataset_key(dataset_id, f"stats:{group_by}")
+
+
+def history_key(owner_id, version: int) -> str:
+    return f"history:{owner_id}:{version}:v{PAYLOAD_VERSION}"
+
+
+def content_key(content_id, variant: str) -> str:
+    return f"content:{content_id}:{variant}:v{PAYLOAD_VERSION}"
+
+
+def cached_payload(kind: str, key: str, build: Callable[[], Any], timeout=DEFAULT_TIMEOUT):
+    """The cached value of ``key``, or ``build()`` stored under it; counted under ``kind``."""
+
+    value = cache.get(key, _MISSING)
+    counters.record(kind, value is not _MISSING)
+    if value is _MISSING:
+        value = build()
+        cache.set(key, value, timeout)
+    return value
+
+
+async def acached_payload(
+    kind: str, key: str, build: Callable[[], Awaitable[Any]], timeout=DEFAULT_TIMEOUT
+):
+    """``cached_payload`` for async views; ``build`` is a coroutine function."""
+
+    value = await cache.aget(key, _MISSING)
+    counters.record(kind, value is not _MISSING)
+    if value is _MISSING:
+        value = await build()
+        await cache.aset(key, value, timeout)
+    return value
+
+
+def _delete_on_commit(keys) -> None:
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_datasets(dataset_ids: Iterable) -> None:
+    """Drop the summary and stats payloads of ``dataset_ids`` once the transaction commits."""
+
+    variants = ["summary", *(f"stats:{field}" for field in GROUP_BY_FIELDS)]
+    _delete_on_commit([dataset_key(pk, variant) for pk in dataset_ids for variant in variants])
+
+
+def invalidate_history(owner_ids: Iterable) -> None:
+    """Drop the history lists of the current ``history_version`` of ``owner_ids``.
+
+    Call it before the version is bumped; the entries go once the transaction commits.
+    """
+
+    owner_ids = set(owner_ids)
+    versions = dict(
+        DatasetOwnerState.objects.filter(owner_id__in=owner_ids).values_list(
+            "owner_id", "history_version"
+        )
+    )
+    _delete_on_commit([history_key(owner, versions.get(owner, 0)) for owner in owner_ids])
+
+
+def cache_stats() -> Dict:
+    """Backend name and hit/miss counts, overall and per payload kind."""
+
+    kinds = counters.snapshot()
+    return {
+        "backend": type(caches[DEFAULT_CACHE_ALIAS]).__name__,
+        "hits": sum(counts["hits"] for counts in kinds.values()),
+        "misses": sum(counts["misses"] for counts in kinds.values()),
+        "kinds": kinds,
+    }
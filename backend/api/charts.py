@@ -0,0 +1,143 @@
+"""Fixed-size chart payloads: NumPy histograms and LTTB-downsampled scatter data.
+
+Both read the memory-mapped column files of the stored content
+(``columns.column_store``). They are computed once per stored content and
+parameter set and kept in the Django cache (``caching.cached_payload``), so
+re-uploads of the same file share entries. Content never changes after
+ingest, so entries only expire by timeout.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Mapping
+
+import numpy as np
+from rest_framework.exceptions import ValidationError
+
+from .caching import cached_payload, content_key
+from .columns import column_store
+from .metrics import NUMERIC_COLUMNS
+from .models import Dataset
+
+DEFAULT_HISTOGRAM_BINS = 20
+MAX_HISTOGRAM_BINS = 200
+DEFAULT_SCATTER_POINTS = 1000
+MAX_SCATTER_POINTS = 5000
+CHART_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _parse_column(params: Mapping, key: str, default: str) -> str:
+    column = params.get(key) or default
+    if column not in NUMERIC_COLUMNS:
+        raise ValidationError({key: f"Must be one of: {', '.join(NUMERIC_COLUMNS)}."})
+    return column
+
+
+def _parse_bounded_int(params: Mapping, key: str, default: int, low: int, high: int) -> int:
+    raw = params.get(key)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except (TypeError, ValueError) as exc:
+        raise ValidationError({key: "Must be an integer."}) from exc
+    if not low <= value <= high:
+        raise ValidationError({key: f"Must be between {low} and {high}."})
+    return value
+
+
+def _column_values(dataset: Dataset, *columns: str) -> np.ndarray:
+    """A ``(rows, len(columns))`` float block of the dataset, in upload order."""
+
+    store = column_store(dataset.content)
+    return np.column_stack([store.numeric(column) for column in columns])
+
+
+def histogram(values: np.ndarray, bins: int) -> Dict:
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        "edges": np.round(edges, 4).tolist(),
+        "counts": counts.tolist(),
+        "total": int(values.size),
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    ``x`` must be sorted. The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle with
+    the previous pick and the average of the next bucket.
+    """
+
+    size = x.size
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    every = (size - 2) / (threshold - 2)
+    edges = np.r_[(np.arange(threshold - 1) * every).astype(np.intp) + 1, size]
+    x_sums = np.r_[0.0, np.cumsum(x)]
+    y_sums = np.r_[0.0, np.cumsum(y)]
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = anchor = 0
+    for bucket in range(threshold - 2):
+        start, end, next_end = edges[bucket], edges[bucket + 1], edges[bucket + 2]
+        span = next_end - end
+        avg_x = (x_sums[next_end] - x_sums[end]) / span
+        avg_y = (y_sums[next_end] - y_sums[end]) / span
+        areas = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(areas.argmax())
+        selected[bucket + 1] = anchor
+    selected[-1] = size - 1
+    return selected
+
+
+def dataset_histogram(dataset: Dataset, params: Mapping) -> Dict:
+    """Histogram payload for ``?column=&bins=``."""
+
+    column = _parse_column(params, "column", NUMERIC_COLUMNS[0])
+    bins = _parse_bounded_int(params, "bins", DEFAULT_HISTOGRAM_BINS, 1, MAX_HISTOGRAM_BINS)
+
+    def build() -> Dict:
+        # Binned straight from the mapped column file, without a copy.
+        values = column_store(dataset.content).numeric(column)
+        return {"column": column, "bins": bins, **histogram(values, bins)}
+
+    return cached_payload(
+        "charts",
+        content_key(dataset.content_id, f"histogram:{column}:{bins}"),
+        build,
+        CHART_CACHE_TIMEOUT,
+    )
+
+
+def dataset_scatter(dataset: Dataset, params: Mapping) -> Dict:
+    """Downsampled ``(x, y)`` pairs sorted by ``x`` for ``?x=&y=&max_points=``."""
+
+    x_column = _parse_column(params, "x", "flowrate")
+    y_column = _parse_column(params, "y", "temperature")
+    max_points = _parse_bounded_int(
+        params, "max_points", DEFAULT_SCATTER_POINTS, 3, MAX_SCATTER_POINTS
+    )
+
+    def build() -> Dict:
+        values = _column_values(dataset, x_column, y_column)
+        values = values[np.argsort(values[:, 0], kind="stable")]
+        keep = lttb(values[:, 0], values[:, 1], max_points)
+        return {
+            "x": x_column,
+            "y": y_column,
+            "total": int(values.shape[0]),
+            "points": values[keep].tolist(),
+        }
+
+    return cached_payload(
+        "charts",
+        content_key(dataset.content_id, f"scatter:{x_column}:{y_column}:{max_points}"),
+        build,
+        CHART_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,424 @@
+"""Memory-mapped column files for stored uploads.
+
+Records never change after ingest, so each ``DatasetContent`` gets a
+read-only copy of its rows as flat files under
+``MEDIA_ROOT/columns/<key>-v<version>/``, where the key is the content hash
+(``store_key``):
+
+* ``<column>.f64``: little-endian float64, one value per row, for the
+  numeric columns;
+* ``<column>.txt`` and ``<column>.off``: UTF-8 text, each value followed by a
+  NUL byte, plus int64 start offsets (one per row and a final end offset), for
+  the name and type columns. A missing value is stored as an empty string,
+  which pandas never produces for a present one.
+
+Readers map the files with ``np.memmap``, so every worker process shares the
+OS page cache. Record pages (filtered and sorted too), inline records, exports
+and charts are served straight from the mappings; the files are the only copy
+of the rows besides the uploaded CSV. Filtering and sorting by a text column
+use ``<column>.rank`` (int64 rank of each value among the sorted distinct
+values) and ``<column>.levels``, and each requested sort order is kept as an
+``order.<terms>.idx`` permutation. These are derived on first use and never
+change afterwards. Stores missing on read are rebuilt from the stored CSV, or
+from the records table for content ingested before this existed.
+
+Directories are named by content hash rather than primary key, so a
+rolled-back upload whose key is reused can never leave its files behind for another upload. Content
+migrated without its file has no hash and falls back to ``pk-<id>``; such
+rows are only ever created by that migration, never by a new upload.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .metrics import NUMERIC_COLUMNS
+from .models import DatasetContent, EquipmentRecord
+from .parsing import ParsedChunk, _iter_chunks
+
+COLUMN_STORE_DIR = "columns"
+# Bump whenever the file layout changes so stores are rebuilt.
+COLUMN_STORE_VERSION = 1
+TEXT_COLUMNS = ("equipment_name", "equipment_type")
+FLOAT_DTYPE = np.dtype("<f8")
+OFFSET_DTYPE = np.dtype("<i8")
+TERMINATOR = "\0"
+BACKFILL_BATCH_ROWS = 50_000
+
+
+def column_store_root() -> Path:
+    return Path(settings.MEDIA_ROOT) / COLUMN_STORE_DIR
+
+
+def store_key(sha256: str | None, content_id) -> str:
+    return sha256 or f"pk-{content_id}"
+
+
+def _store_name(key: str) -> str:
+    return f"{key}-v{COLUMN_STORE_VERSION}"
+
+
+def column_store_path(key: str) -> Path:
+    return column_store_root() / _store_name(key)
+
+
+def _encode_text(values: Sequence) -> Tuple[bytes, np.ndarray]:
+    """NUL-terminated UTF-8 for ``values`` and the byte length of each entry."""
+
+    strings = [value if isinstance(value, str) else "" for value in values]
+    blob = "".join(value + TERMINATOR for value in strings).encode("utf-8")
+    if len(blob) == sum(map(len, strings)) + len(strings):
+        lengths = np.fromiter(map(len, strings), dtype=OFFSET_DTYPE, count=len(strings))
+    else:
+        lengths = np.fromiter(
+            (len(value.encode("utf-8")) for value in strings),
+            dtype=OFFSET_DTYPE,
+            count=len(strings),
+        )
+    return blob, lengths + 1
+
+
+class ColumnWriter:
+    """Append parsed chunks to a temporary directory; ``commit`` moves it into place."""
+
+    def __init__(self, content: DatasetContent):
+        self.path = column_store_path(store_key(content.sha256, content.pk))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = Path(
+            tempfile.mkdtemp(dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp")
+        )
+        self._numeric = {column: self._create(f"{column}.f64") for column in NUMERIC_COLUMNS}
+        self._text = {
+            column: (self._create(f"{column}.txt"), self._create(f"{column}.off"))
+            for column in TEXT_COLUMNS
+        }
+        self._text_bytes = dict.fromkeys(TEXT_COLUMNS, 0)
+        for _blob, offsets in self._text.values():
+            offsets.write(np.zeros(1, dtype=OFFSET_DTYPE).tobytes())
+
+    def _create(self, name: str):
+        return open(self._tmp / name, "wb")
+
+    def append(self, chunk: ParsedChunk) -> None:
+        for index, column in enumerate(NUMERIC_COLUMNS):
+            self._numeric[column].write(chunk.values[:, index].astype(FLOAT_DTYPE).tobytes())
+        for column, values in zip(TEXT_COLUMNS, (chunk.names, chunk.types)):
+            blob, lengths = _encode_text(values.tolist())
+            blob_handle, offsets_handle = self._text[column]
+            blob_handle.write(blob)
+            offsets_handle.write((np.cumsum(lengths) + self._text_bytes[column]).tobytes())
+            self._text_bytes[column] += len(blob)
+
+    def _close(self) -> None:
+        for handle in self._numeric.values():
+            handle.close()
+        for blob, offsets in self._text.values():
+            blob.close()
+            offsets.close()
+
+    def commit(self) -> None:
+        self._close()
+        try:
+            os.replace(self._tmp, self.path)
+        except OSError:
+            # Another process built the same store first; both copies are identical.
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def abort(self) -> None:
+        self._close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+class ColumnStore:
+    """Read-only, memory-mapped rows of one stored upload."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._numeric = {
+            column: np.memmap(path / f"{column}.f64", dtype=FLOAT_DTYPE, mode="r")
+            for column in NUMERIC_COLUMNS
+        }
+        self._text = {
+            column: (
+                np.memmap(path / f"{column}.txt", dtype=np.uint8, mode="r"),
+                np.memmap(path / f"{column}.off", dtype=OFFSET_DTYPE, mode="r"),
+            )
+            for column in TEXT_COLUMNS
+        }
+        self._derived_cache: Dict[str, np.ndarray] = {}
+        self._levels: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return self._numeric[NUMERIC_COLUMNS[0]].shape[0]
+
+    def numeric(self, column: str) -> np.ndarray:
+        """The whole column as a read-only view of the mapping (no copy)."""
+
+        return self._numeric[column]
+
+    def text(self, column: str, start: int, stop: int) -> List:
+        blob, offsets = self._text[column]
+        raw = blob[offsets[start] : offsets[stop]].tobytes().decode("utf-8")
+        return [value or None for value in raw.split(TERMINATOR)[:-1]]
+
+    def text_at(self, column: str, indices: np.ndarray) -> List:
+        blob, offsets = self._text[column]
+        values = (
+            blob[offsets[index] : offsets[index + 1] - 1].tobytes().decode("utf-8")
+            for index in indices.tolist()
+        )
+        return [value or None for value in values]
+
+    def column(self, field: str, start: int, stop: int) -> List:
+        if field == "position":
+            return list(range(start, stop))
+        if field in self._numeric:
+            return self._numeric[field][start:stop].tolist()
+        return self.text(field, start, stop)
+
+    def columns(
+        self, fields: Sequence[str], start: int = 0, stop: int | None = None
+    ) -> Dict[str, List]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = min(start, stop)
+        return {field: self.column(field, start, stop) for field in fields}
+
+    def take(self, fields: Sequence[str], indices: np.ndarray) -> Dict[str, List]:
+        """``{field: values}`` of the rows at ``indices``, in that order."""
+
+        taken = {}
+        for field in fields:
+            if field == "position":
+                taken[field] = indices.tolist()
+            elif field in self._numeric:
+                taken[field] = self._numeric[field][indices].tolist()
+            else:
+                taken[field] = self.text_at(field, indices)
+        return taken
+
+    def rows(self, fields: Sequence[str], indices: np.ndarray | None = None) -> "RowSlicer":
+        return RowSlicer(self, fields, indices)
+
+    def _derived(self, name: str, build: Callable[[], np.ndarray]) -> np.ndarray:
+        """Map ``name`` from the store directory, writing ``build()`` there first if missing."""
+
+        if name not in self._derived_cache:
+            path = self.path / name
+            if not path.exists():
+                fd, tmp = tempfile.mkstemp(dir=self.path, prefix=f"{name}.", suffix=".tmp")
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(np.ascontiguousarray(build(), dtype=OFFSET_DTYPE).tobytes())
+                # Concurrent builders write identical files; the last replace wins.
+                os.replace(tmp, path)
+            self._derived_cache[name] = np.memmap(path, dtype=OFFSET_DTYPE, mode="r")
+        return self._derived_cache[name]
+
+    def _build_text_index(self, column: str) -> np.ndarray:
+        values = np.array(
+            [value or "" for value in self.text(column, 0, len(self))], dtype=object
+        )
+        levels, ranks = np.unique(values, return_inverse=True) if len(values) else ([], values)
+        blob = "".join(level + TERMINATOR for level in levels).encode("utf-8")
+        path = self.path / f"{column}.levels"
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=f"{path.name}.", suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(blob)
+        os.replace(tmp, path)
+        return np.asarray(ranks, dtype=OFFSET_DTYPE)
+
+    def ranks(self, column: str) -> np.ndarray:
+        """Rank of each value of a text column among its sorted distinct values.
+
+        Missing values rank as the empty string, i.e. first.
+        """
+
+        return self._derived(f"{column}.rank", lambda: self._build_text_index(column))
+
+    def levels(self, column: str) -> Dict[str, int]:
+        """``{value: rank}`` for the distinct values of a text column."""
+
+        if column not in self._levels:
+            self.ranks(column)
+            raw = (self.path / f"{column}.levels").read_bytes().decode("utf-8")
+            levels = raw.split(TERMINATOR)[:-1]
+            self._levels[column] = {level: rank for rank, level in enumerate(levels)}
+        return self._levels[column]
+
+    def mask(self, lookups: Mapping, start: int = 0, stop: int | None = None) -> np.ndarray | None:
+        """Rows of ``[start, stop)`` matching ``filters.parse_record_filters`` lookups.
+
+        None when there are no lookups, i.e. every row matches.
+        """
+
+        if not lookups:
+            return None
+        stop = len(self) if stop is None else stop
+        mask = np.ones(stop - start, dtype=bool)
+        for lookup, value in lookups.items():
+            field, _, operator = lookup.partition("__")
+            if operator == "in":
+                levels = self.levels(field)
+                wanted = [levels[level] for level in value if level in levels]
+                mask &= np.isin(self.ranks(field)[start:stop], wanted)
+            elif operator == "gte":
+                mask &= self.numeric(field)[start:stop] >= value
+            else:
+                mask &= self.numeric(field)[start:stop] <= value
+        return mask
+
+    def _sort_key(self, term: str) -> np.ndarray:
+        field = term.lstrip("-")
+        if field == "position":
+            key = np.arange(len(self), dtype=OFFSET_DTYPE)
+        elif field in self._numeric:
+            key = self._numeric[field]
+        else:
+            key = self.ranks(field)
+        return np.negative(key) if term.startswith("-") else key
+
+    def order(self, ordering: Sequence[str]) -> np.ndarray:
+        """Row indices sorted by ``ordering`` terms (``-`` for descending), kept as a file."""
+
+        name = f"order.{','.join(ordering)}.idx"
+        # lexsort sorts by the last key first.
+        return self._derived(
+            name, lambda: np.lexsort([self._sort_key(term) for term in reversed(ordering)])
+        )
+
+    def select(self, lookups: Mapping, ordering: Sequence[str]) -> np.ndarray:
+        """Indices of the rows matching ``lookups``, sorted by ``ordering``."""
+
+        mask = self.mask(lookups)
+        if list(ordering) == ["position"]:
+            return np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        order = self.order(ordering)
+        return order if mask is None else order[mask[order]]
+
+
+class RowSlicer:
+    """``len()`` and slicing over a store as ``(field, ...)`` tuples, for paginators.
+
+    With ``indices``, only those rows are visible, in that order.
+    """
+
+    def __init__(self, store: ColumnStore, fields: Sequence[str], indices: np.ndarray | None):
+        self.store = store
+        self.fields = tuple(fields)
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.store) if self.indices is None else len(self.indices)
+
+    def __getitem__(self, item: slice) -> List[Tuple]:
+        if self.indices is None:
+            start, stop, _step = item.indices(len(self.store))
+            columns = self.store.columns(self.fields, start, stop)
+        else:
+            columns = self.store.take(self.fields, np.asarray(self.indices[item]))
+        return list(zip(*(columns[field] for field in self.fields)))
+
+
+@lru_cache(maxsize=16)
+def _open(path: str) -> ColumnStore:
+    return ColumnStore(Path(path))
+
+
+def _stored_file_exists(content: DatasetContent) -> bool:
+    return bool(content.file) and content.file.storage.exists(content.file.name)
+
+
+def _backfill(content: DatasetContent) -> None:
+    writer = ColumnWriter(content)
+    try:
+        if _stored_file_exists(content):
+            with content.file.open("rb") as stored:
+                for chunk in _iter_chunks(stored, BACKFILL_BATCH_ROWS):
+                    writer.append(chunk)
+        else:
+            # Migrated content whose file was lost: only the records table is left.
+            _backfill_from_table(content, writer)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.commit()
+
+
+def _backfill_from_table(content: DatasetContent, writer: ColumnWriter) -> None:
+    rows = (
+        EquipmentRecord.objects.filter(content_id=content.pk)
+        .order_by("position")
+        .values_list("equipment_name", "equipment_type", *NUMERIC_COLUMNS)
+        .iterator(chunk_size=BACKFILL_BATCH_ROWS)
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BACKFILL_BATCH_ROWS:
+            writer.append(_rows_to_chunk(batch))
+            batch = []
+    if batch:
+        writer.append(_rows_to_chunk(batch))
+
+
+def _rows_to_chunk(rows: List[Tuple]) -> ParsedChunk:
+    labels = np.array([row[:2] for row in rows], dtype=object).reshape(-1, 2)
+    values = np.array([row[2:] for row in rows], dtype=float).reshape(-1, len(NUMERIC_COLUMNS))
+    return ParsedChunk(names=labels[:, 0], types=labels[:, 1], values=values)
+
+
+def column_store(content: DatasetContent) -> ColumnStore:
+    """The mapped columns of ``content``, building them if missing."""
+
+    path = column_store_path(store_key(content.sha256, content.pk))
+    if not path.is_dir():
+        _backfill(content)
+    return _open(str(path))
+
+
+def delete_column_store(key: str) -> None:
+    _open.cache_clear()
+    shutil.rmtree(column_store_path(key), ignore_errors=True)
+
+
+def stale_column_stores(keys: Iterable[str], grace_cutoff: datetime) -> List[Path]:
+    """Store directories (finished or abandoned) that belong to none of ``keys``."""
+
+    root = column_store_root()
+    if not root.is_dir():
+        return []
+    current = {_store_name(key) for key in keys}
+    stale = []
+    for entry in root.iterdir():
+        if entry.name in current:
+            continue
+        try:
+            modified = _last_modified(entry)
+        except FileNotFoundError:  # Committed or removed meanwhile.
+            continue
+        if datetime.fromtimestamp(modified, tz=dt_timezone.utc) < grace_cutoff:
+            stale.append(entry)
+    return stale
+
+
+def _last_modified(path: Path) -> float:
+    """Newest mtime of ``path`` and the files in it.
+
+    Appending to a column file during ingest does not touch the directory's
+    own mtime, so a long upload's temporary store would look abandoned.
+    """
+
+    modified = path.stat().st_mtime
+    if path.is_dir():
+        with os.scandir(path) as entries:
+            for entry in entries:
+                modified = max(modified, entry.stat().st_mtime)
+    return modified
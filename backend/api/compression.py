@@ -0,0 +1,138 @@
+"""Negotiated response compression for JSON API payloads.
+
+Encodings are chosen from ``Accept-Encoding`` by q-value, preferring zstd,
+then brotli, then gzip on ties. zstd and brotli are used only when the
+``zstandard`` / ``brotli`` packages are installed; gzip always is. Only JSON
+bodies are compressed. HTML pages (the admin, the browsable API) embed CSRF
+tokens and are left alone.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Below this size the encoding overhead outweighs the saving.
+MIN_COMPRESS_BYTES = 200
+ZSTD_LEVEL = 3
+BROTLI_QUALITY = 5
+
+
+def _zstd(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Installed encoders in server preference order."""
+
+    encoders = {}
+    if zstandard is not None:
+        encoders["zstd"] = _zstd
+    if brotli is not None:
+        encoders["br"] = _brotli
+    encoders["gzip"] = compress_string
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, supported) -> Optional[str]:
+    """Pick the best of ``supported`` (ordered by preference) for ``Accept-Encoding``."""
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for name in supported:
+        quality = weights.get(name, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def _is_json(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """Compress JSON responses with the best encoding the client accepts.
+
+    Works in both sync and async middleware stacks, so it never moves an
+    ASGI request onto a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or not _is_json(response.get("Content-Type", ""))
+        ):
+            return response
+
+        # The body depends on Accept-Encoding whether or not this one is compressed.
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < MIN_COMPRESS_BYTES:
+            return response
+
+        encoders = available_encoders()
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), encoders)
+        if encoding is None:
+            return response
+        compressed = encoders[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # Other encodings of the same payload are not byte-identical: the tag becomes weak.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
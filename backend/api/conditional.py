@@ -0,0 +1,71 @@
+"""Strong ETags and ``If-None-Match`` handling for dataset payloads.
+
+A dataset never changes after ingest, so its id, upload time and the payload
+variant identify its representation exactly. History lists are versioned per
+owner instead: ``DatasetOwnerState.history_version`` is bumped whenever a
+dataset is added or removed.
+"""
+
+from __future__ import annotations
+
+from typing import Awaitable, Callable, Dict
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+# Bump whenever the serialized dataset payloads change shape so stale copies are refetched.
+PAYLOAD_VERSION = 1
+
+# Latest/history can change at any time: clients keep their copy but must revalidate.
+REVALIDATE = {"private": True, "no_cache": True}
+# A dataset id always maps to the same payload.
+IMMUTABLE = {"private": True, "max_age": 60 * 60 * 24, "immutable": True}
+
+
+def dataset_etag(dataset, variant: str) -> str:
+    uploaded = int(dataset.uploaded_at.timestamp() * 1_000_000)
+    return f'"dataset-{dataset.pk}-{uploaded}-{variant}-v{PAYLOAD_VERSION}"'
+
+
+def history_etag(owner_id, version: int, limit: int) -> str:
+    return f'"history-{owner_id}-{version}-{limit}-v{PAYLOAD_VERSION}"'
+
+
+def conditional_response(
+    request: HttpRequest,
+    etag: str,
+    build: Callable[[], HttpResponse],
+    cache_control: Dict = REVALIDATE,
+) -> HttpResponse:
+    """Return 304 when ``If-None-Match`` already names ``etag``, else ``build()``.
+
+    Both carry the ETag, ``Cache-Control`` and ``Vary: Authorization`` so
+    shared caches never hand one user's payload to another. ``Accept`` is in
+    ``Vary`` too because the renderer is negotiated from it.
+    """
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build()
+    return _tag(response, etag, cache_control)
+
+
+async def aconditional_response(
+    request: HttpRequest,
+    etag: str,
+    build: Callable[[], Awaitable[HttpResponse]],
+    cache_control: Dict = REVALIDATE,
+) -> HttpResponse:
+    """``conditional_response`` for async views: ``build`` is awaited only on a miss."""
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = await build()
+    return _tag(response, etag, cache_control)
+
+
+def _tag(response: HttpResponse, etag: str, cache_control: Dict) -> HttpResponse:
+    response["ETag"] = etag
+    patch_cache_control(response, **cache_control)
+    patch_vary_headers(response, ("Accept", "Authorization", "Cookie"))
+    return response
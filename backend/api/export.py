@@ -0,0 +1,162 @@
+"""Streaming dataset exports as CSV, NDJSON or Parquet.
+
+Rows are read in batches from the memory-mapped column files
+(``columns.column_store``), filtered with ``ColumnStore.mask`` and encoded one batch
+at a time. The first bytes go out as soon as the first batch is encoded, and
+memory stays at one batch however large the dataset is. Parquet needs the
+optional ``pyarrow`` package, imported on first use; each batch becomes one
+row group.
+"""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+import json
+from typing import Dict, Iterator, List, Mapping, Sequence
+
+import numpy as np
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from .columns import ColumnStore
+from .filters import parse_record_filters
+from .models import EquipmentRecord
+
+DEFAULT_BATCH_ROWS = 10_000
+EXPORT_FIELDS = ("position", *EquipmentRecord.RECORD_FIELDS)
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportNegotiation(DefaultContentNegotiation):
+    """``?format=`` names the export file type here, not a renderer; errors stay JSON."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def _batch_rows() -> int:
+    return int(getattr(settings, "DATASET_EXPORT_BATCH_ROWS", DEFAULT_BATCH_ROWS))
+
+
+def parse_export_format(params: Mapping) -> str:
+    export_format = params.get("format") or "csv"
+    if export_format not in CONTENT_TYPES:
+        raise ValidationError({"format": f"Must be one of: {', '.join(CONTENT_TYPES)}."})
+    if export_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ValidationError({"format": "Parquet export needs the pyarrow package."})
+    return export_format
+
+
+def parse_export_columns(params: Mapping) -> List[str]:
+    """``?columns=`` as a list of export fields, defaulting to the record fields."""
+
+    columns = [part.strip() for part in (params.get("columns") or "").split(",") if part.strip()]
+    if not columns:
+        return list(EquipmentRecord.RECORD_FIELDS)
+    invalid = [column for column in columns if column not in EXPORT_FIELDS]
+    if invalid:
+        raise ValidationError(
+            {
+                "columns": f"Unsupported column(s): {', '.join(invalid)}. "
+                f"Use: {', '.join(EXPORT_FIELDS)}."
+            }
+        )
+    return columns
+
+
+def iter_batches(
+    store: ColumnStore, columns: Sequence[str], lookups: Dict
+) -> Iterator[Dict[str, List]]:
+    """``{column: values}`` blocks of the rows matching ``lookups``, in upload order."""
+
+    batch_rows = _batch_rows()
+    for start in range(0, len(store), batch_rows):
+        stop = min(start + batch_rows, len(store))
+        mask = store.mask(lookups, start, stop)
+        batch = store.columns(columns, start, stop)
+        if mask is not None:
+            keep = np.flatnonzero(mask).tolist()
+            if not keep:
+                continue
+            batch = {column: [values[index] for index in keep] for column, values in batch.items()}
+        yield batch
+
+
+def _csv(batches: Iterator[Dict[str, List]], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(zip(*(batch[column] for column in columns)))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson(batches: Iterator[Dict[str, List]], columns: Sequence[str]) -> Iterator[bytes]:
+    for batch in batches:
+        rows = (dict(zip(columns, row)) for row in zip(*(batch[column] for column in columns)))
+        yield "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last ``drain``."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _parquet(batches: Iterator[Dict[str, List]], columns: Sequence[str]) -> Iterator[bytes]:
+    import pyarrow
+    import pyarrow.parquet
+
+    types = {
+        "position": pyarrow.int64(),
+        "equipment_name": pyarrow.string(),
+        "equipment_type": pyarrow.string(),
+    }
+    schema = pyarrow.schema([(column, types.get(column, pyarrow.float64())) for column in columns])
+    sink = _ChunkSink()
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            writer.write_table(pyarrow.table(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {"csv": _csv, "ndjson": _ndjson, "parquet": _parquet}
+
+
+def stream_export(
+    store: ColumnStore, export_format: str, columns: Sequence[str], params: Mapping
+) -> Iterator[bytes]:
+    """Encoded chunks of the export; filters are validated before the first chunk."""
+
+    lookups = parse_record_filters(params)
+    return ENCODERS[export_format](iter_batches(store, columns, lookups), columns)
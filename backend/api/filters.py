@@ -0,0 +1,89 @@
+"""Query-string filtering and ordering for equipment record listings."""
+
+from __future__ import annotations
+
+from typing import List, Mapping, Sequence
+
+from rest_framework.exceptions import ValidationError
+
+NUMERIC_FILTER_FIELDS = ("flowrate", "pressure", "temperature")
+ORDERING_FIELDS = (
+    "position",
+    "equipment_name",
+    "equipment_type",
+    "flowrate",
+    "pressure",
+    "temperature",
+)
+
+
+def _split(raw: str | None) -> List[str]:
+    if not raw:
+        return []
+    return [part.strip() for part in raw.split(",") if part.strip()]
+
+
+def _parse_float(params: Mapping, key: str) -> float | None:
+    raw = params.get(key)
+    if raw in (None, ""):
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError) as exc:
+        raise ValidationError({key: "Must be a number."}) from exc
+
+
+def parse_ordering(params: Mapping) -> List[str]:
+    """Validate ``?ordering=`` and append ``position`` as a stable tie-breaker."""
+
+    ordering = _split(params.get("ordering"))
+    invalid = [term for term in ordering if term.lstrip("-") not in ORDERING_FIELDS]
+    if invalid:
+        raise ValidationError(
+            {"ordering": f"Unsupported ordering field(s): {', '.join(invalid)}."}
+        )
+    if not any(term.lstrip("-") == "position" for term in ordering):
+        ordering.append("position")
+    return ordering
+
+
+def parse_record_filters(params: Mapping) -> dict:
+    """Translate query params into ``<field>__<operator>`` lookups for ``ColumnStore.mask``.
+
+    Supported params: ``equipment_type`` (comma-separated) and
+    ``min_<column>`` / ``max_<column>`` for flowrate, pressure and temperature.
+    """
+
+    lookups = {}
+    types = _split(params.get("equipment_type"))
+    if types:
+        lookups["equipment_type__in"] = types
+    for column in NUMERIC_FILTER_FIELDS:
+        lower = _parse_float(params, f"min_{column}")
+        upper = _parse_float(params, f"max_{column}")
+        if lower is not None:
+            lookups[f"{column}__gte"] = lower
+        if upper is not None:
+            lookups[f"{column}__lte"] = upper
+    return lookups
+
+
+def filter_records(store, fields: Sequence[str], params: Mapping):
+    """The rows of a ``ColumnStore`` matching ``params``, sorted, as a paginatable ``RowSlicer``."""
+
+    if is_unfiltered(params):
+        return store.rows(fields)
+    return store.rows(fields, store.select(parse_record_filters(params), parse_ordering(params)))
+
+
+def is_unfiltered(params: Mapping) -> bool:
+    """True when ``params`` select every row in upload order."""
+
+    return not parse_record_filters(params) and parse_ordering(params) == ["position"]
+
+
+def is_truthy(value: str | None, default: bool = True) -> bool:
+    if value is None:
+        return default
+    return value.strip().lower() not in {"0", "false", "no", "off"}
+
@@ -0,0 +1,323 @@
+"""Background ingestion: a DB-backed job queue drained by a local worker pool.
+
+The queue lives in the database, so nothing is lost when a worker process
+restarts. ``start_job_sweeper`` (started by the WSGI and ASGI entry points)
+hands queued jobs to the new process's pool. Running jobs hold a lease that a
+heartbeat thread renews. Jobs whose lease ran out belonged to a worker that
+died mid-ingest; their transaction rolled back, so they are queued again and
+rerun from the staged upload, up to ``MAX_ATTEMPTS`` claims.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import IngestJob
+from .pdf import ensure_dataset_report
+from .services import create_dataset_from_file
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TIMEOUT = 60 * 60
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_SWEEP_SECONDS = 60
+MAX_ATTEMPTS = 3
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+# Jobs submitted to this process's pool that have not finished yet.
+_local_jobs: set = set()
+_sweeper: threading.Thread | None = None
+
+
+def _progress_key(job_id) -> str:
+    return f"ingest-job:{job_id}:progress"
+
+
+def _heartbeat_key(job_id) -> str:
+    return f"ingest-job:{job_id}:heartbeat"
+
+
+def _lease_seconds() -> float:
+    return float(getattr(settings, "DATASET_INGEST_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+
+
+def live_progress(job: IngestJob) -> Dict:
+    """Return the latest progress a worker reported for ``job``.
+
+    Running jobs publish progress through the cache because the ingest
+    transaction keeps their own row updates invisible until it commits.
+    """
+
+    stored = {"progress": job.progress, "rows_processed": job.rows_processed}
+    if job.status != IngestJob.STATUS_RUNNING:
+        return stored
+    return cache.get(_progress_key(job.pk)) or stored
+
+
+def enqueue_upload(*, file_obj: BinaryIO, owner, name: str | None = None) -> IngestJob:
+    """Stage the upload, queue a job for it, and dispatch once the row is committed."""
+
+    safe_filename = Path(getattr(file_obj, "name", None) or "uploaded.csv").name
+    job = IngestJob(owner=owner, name=name or "", source_filename=safe_filename)
+    job.upload.save(safe_filename, File(file_obj), save=False)
+    job.save()
+    transaction.on_commit(lambda: dispatch(job.pk))
+    return job
+
+
+def dispatch(job_id) -> None:
+    """Hand a queued job to the in-process pool, or run it inline when eager."""
+
+    if getattr(settings, "DATASET_INGEST_EAGER", False):
+        run_job(job_id)
+        return
+
+    executor = _get_executor()
+    if executor is None:
+        # No local workers: a ``process_ingest_jobs`` process drains the queue.
+        return
+    with _executor_lock:
+        if job_id in _local_jobs:
+            return
+        _local_jobs.add(job_id)
+    executor.submit(_run_in_thread, job_id)
+
+
+def _get_executor() -> ThreadPoolExecutor | None:
+    global _executor
+    workers = int(getattr(settings, "DATASET_INGEST_WORKERS", 2))
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+    return _executor
+
+
+def _run_in_thread(job_id) -> None:
+    try:
+        run_job(job_id)
+    except Exception:  # pragma: no cover - run_job records failures itself
+        logger.exception("Ingest job %s crashed", job_id)
+    finally:
+        with _executor_lock:
+            _local_jobs.discard(job_id)
+        # Pool threads are reused; never leave their connection open between jobs.
+        connection.close()
+
+
+class _Heartbeat(threading.Thread):
+    """Renew a running job's lease every third of ``DATASET_INGEST_LEASE_SECONDS``.
+
+    Each beat refreshes a cache entry and ``heartbeat_at``, the latter on this
+    thread's own connection. Ingest parses outside any transaction, so the
+    write only waits for other short transactions; if it still fails, the
+    cache entry alone keeps the job alive.
+    """
+
+    def __init__(self, job_id):
+        super().__init__(name=f"ingest-heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self._stopped = threading.Event()
+
+    def beat(self) -> None:
+        cache.set(_heartbeat_key(self.job_id), True, timeout=_lease_seconds())
+        try:
+            IngestJob.objects.filter(pk=self.job_id, status=IngestJob.STATUS_RUNNING).update(
+                heartbeat_at=timezone.now()
+            )
+        except DatabaseError:
+            logger.debug("Heartbeat of ingest job %s not written", self.job_id, exc_info=True)
+
+    def run(self) -> None:
+        try:
+            while not self._stopped.wait(_lease_seconds() / 3):
+                self.beat()
+        finally:
+            connection.close()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        cache.delete(_heartbeat_key(self.job_id))
+
+
+def _claim(job_id) -> IngestJob | None:
+    now = timezone.now()
+    claimed = IngestJob.objects.filter(pk=job_id, status=IngestJob.STATUS_QUEUED).update(
+        status=IngestJob.STATUS_RUNNING,
+        started_at=now,
+        heartbeat_at=now,
+        attempts=F("attempts") + 1,
+    )
+    if not claimed:
+        return None
+    cache.set(_heartbeat_key(job_id), True, timeout=_lease_seconds())
+    return IngestJob.objects.select_related("owner").get(pk=job_id)
+
+
+def run_job(job_id) -> IngestJob | None:
+    """Ingest a queued job's file. Returns ``None`` if another worker claimed it."""
+
+    job = _claim(job_id)
+    if job is None:
+        return None
+
+    progress_key = _progress_key(job.pk)
+    total_bytes = max(job.upload.size, 1)
+
+    def report(rows: int, bytes_read: int) -> None:
+        percent = min(99, bytes_read * 100 // total_bytes)
+        cache.set(
+            progress_key,
+            {"progress": percent, "rows_processed": rows},
+            timeout=PROGRESS_TIMEOUT,
+        )
+
+    heartbeat = _Heartbeat(job.pk)
+    heartbeat.start()
+    try:
+        with job.upload.open("rb") as upload:
+            dataset = create_dataset_from_file(
+                file_obj=upload,
+                owner=job.owner,
+                name=job.name or None,
+                filename=job.source_filename,
+                progress=report,
+            )
+    except ValueError as exc:
+        job.status = IngestJob.STATUS_FAILED
+        job.error = str(exc)
+    except Exception:
+        logger.exception("Ingest job %s failed", job.pk)
+        job.status = IngestJob.STATUS_FAILED
+        job.error = "Unexpected error while processing the upload."
+    else:
+        job.status = IngestJob.STATUS_SUCCEEDED
+        job.dataset = dataset
+        job.progress = 100
+        job.rows_processed = dataset.total_records
+    finally:
+        heartbeat.stop()
+        job.finished_at = timezone.now()
+        job.upload.delete(save=False)
+        job.save()
+        cache.delete(progress_key)
+
+    if job.status == IngestJob.STATUS_SUCCEEDED and getattr(
+        settings, "DATASET_REPORT_PRERENDER", False
+    ):
+        try:
+            ensure_dataset_report(job.dataset)
+        except Exception:
+            logger.exception("Pre-rendering the report for dataset %s failed", job.dataset_id)
+    return job
+
+
+def run_pending(limit: int | None = None) -> int:
+    """Run queued jobs oldest first; returns how many this call processed."""
+
+    queued = IngestJob.objects.filter(status=IngestJob.STATUS_QUEUED).order_by("created_at")
+    job_ids = list(queued.values_list("id", flat=True)[:limit])
+    return sum(1 for job_id in job_ids if run_job(job_id) is not None)
+
+
+def requeue_stale_jobs(now: datetime | None = None) -> int:
+    """Queue running jobs whose lease expired again; returns how many were requeued.
+
+    Jobs that already used ``MAX_ATTEMPTS`` claims, or whose staged upload is
+    gone, are marked failed instead.
+    """
+
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=_lease_seconds())
+    stale = IngestJob.objects.filter(status=IngestJob.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    requeued = 0
+    for job in stale.only("id", "upload", "attempts", "heartbeat_at"):
+        if job.pk in _local_jobs or cache.get(_heartbeat_key(job.pk)):
+            continue
+        # Only touch the row if no worker renewed the lease since it was read.
+        still_stale = IngestJob.objects.filter(
+            pk=job.pk, status=IngestJob.STATUS_RUNNING, heartbeat_at=job.heartbeat_at
+        )
+        retry = job.attempts < MAX_ATTEMPTS and job.upload
+        if retry and job.upload.storage.exists(job.upload.name):
+            requeued += still_stale.update(
+                status=IngestJob.STATUS_QUEUED,
+                started_at=None,
+                heartbeat_at=None,
+                progress=0,
+                rows_processed=0,
+            )
+            continue
+        if still_stale.update(
+            status=IngestJob.STATUS_FAILED,
+            error="The worker processing this upload stopped; please upload the file again.",
+            upload="",
+            finished_at=now,
+        ):
+            logger.warning("Ingest job %s failed after its worker stopped", job.pk)
+            if job.upload:
+                job.upload.delete(save=False)
+    return requeued
+
+
+def recover_jobs() -> int:
+    """Requeue stale jobs, then hand every queued job to the local pool.
+
+    Returns how many queued jobs were dispatched. Claims are atomic, so
+    several processes sweeping the same queue never run a job twice.
+    """
+
+    requeue_stale_jobs()
+    queued = IngestJob.objects.filter(status=IngestJob.STATUS_QUEUED).order_by("created_at")
+    job_ids = list(queued.values_list("id", flat=True))
+    for job_id in job_ids:
+        dispatch(job_id)
+    return len(job_ids)
+
+
+def _sweep_forever(interval: float) -> None:
+    while True:
+        try:
+            recover_jobs()
+        except Exception:
+            logger.exception("Sweeping the ingest queue failed")
+        finally:
+            connection.close()
+        time.sleep(interval)
+
+
+def start_job_sweeper() -> None:
+    """Run ``recover_jobs`` now and every ``DATASET_INGEST_SWEEP_SECONDS`` on a daemon thread.
+
+    Does nothing when jobs run eagerly or there are no local workers; a
+    ``process_ingest_jobs`` process then requeues stale jobs itself.
+    """
+
+    global _sweeper
+    if getattr(settings, "DATASET_INGEST_EAGER", False) or _get_executor() is None:
+        return
+    interval = float(getattr(settings, "DATASET_INGEST_SWEEP_SECONDS", DEFAULT_SWEEP_SECONDS))
+    with _executor_lock:
+        if _sweeper is not None:
+            return
+        _sweeper = threading.Thread(
+            target=_sweep_forever, args=(interval,), name="ingest-sweeper", daemon=True
+        )
+    _sweeper.start()
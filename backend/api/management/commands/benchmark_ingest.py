@@ -0,0 +1,140 @@
+import json
+import platform
+import tempfile
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from api.benchmarks import (
+    parse_row_count,
+    peak_rss_bytes,
+    time_ingest_phases,
+    time_parallel_parse,
+    time_request,
+    write_synthetic_csv,
+)
+from api.models import Dataset
+from api.pdf import report_cache_path
+from api.retention import release_unused_content
+from api.services import _chunk_rows, _parallel_range_bytes
+
+BENCHMARK_USERNAME = "ingest-benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic equipment CSVs and measure parse, metrics and column-store "
+        "write time, peak RSS, and API latency. Results are emitted as JSON for regression "
+        "tracking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            default="10k,100k",
+            help="Comma-separated sizes, e.g. 10k,100k,1M,10M (default: 10k,100k).",
+        )
+        parser.add_argument("--types", type=int, default=6, help="Distinct equipment types (default: 6).")
+        parser.add_argument("--repeat", type=int, default=5, help="Requests per read endpoint (default: 5).")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data.")
+        parser.add_argument(
+            "--skip-endpoints",
+            action="store_true",
+            help="Only time the ingest phases; do not upload through the API.",
+        )
+        parser.add_argument(
+            "--processes",
+            default="",
+            help="Also time parallel parsing with these worker counts, e.g. 1,2,4,8.",
+        )
+        parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [parse_row_count(raw) for raw in options["rows"].split(",") if raw.strip()]
+        except ValueError as exc:
+            raise CommandError(f"Invalid --rows value: {options['rows']}") from exc
+        try:
+            processes = [int(raw) for raw in options["processes"].split(",") if raw.strip()]
+        except ValueError as exc:
+            raise CommandError(f"Invalid --processes value: {options['processes']}") from exc
+
+        owner, _ = get_user_model().objects.get_or_create(username=BENCHMARK_USERNAME)
+        results = {
+            "started_at": timezone.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "database": connection.vendor,
+                "chunk_rows": _chunk_rows(),
+            },
+            "runs": [],
+        }
+
+        with tempfile.TemporaryDirectory(prefix="ingest-benchmark-") as workdir:
+            for rows in sorted(sizes):
+                path = Path(workdir) / f"synthetic-{rows}.csv"
+                self.stderr.write(f"Generating {rows:,} rows…")
+                run = {
+                    "rows": rows,
+                    "types": options["types"],
+                    "file_bytes": write_synthetic_csv(path, rows, options["types"], options["seed"]),
+                }
+                run.update(time_ingest_phases(path, _chunk_rows()))
+                if processes:
+                    run["parallel_parse_seconds"] = time_parallel_parse(
+                        path, processes, _parallel_range_bytes(), _chunk_rows()
+                    )
+                if not options["skip_endpoints"]:
+                    run["endpoints"] = self._time_endpoints(path, owner, options["repeat"])
+                run["peak_rss_bytes"] = peak_rss_bytes()
+                path.unlink()
+                results["runs"].append(run)
+                self.stderr.write(
+                    f"{rows:,} rows: parse {run['parse_seconds']}s, metrics {run['metrics_seconds']}s, "
+                    f"store write {run['store_write_seconds']}s"
+                )
+
+        payload = json.dumps(results, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(payload)
+            self.stderr.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+    def _time_endpoints(self, path, owner, repeat):
+        host = next((host for host in settings.ALLOWED_HOSTS if host and "*" not in host), "localhost")
+        client = Client(HTTP_HOST=host.lstrip("."))
+        client.force_login(owner)
+
+        def upload():
+            with open(path, "rb") as handle:
+                return client.post(reverse("dataset-upload"), {"file": handle, "name": path.stem})
+
+        timings = {"upload": time_request(upload, 1)}
+        dataset = Dataset.objects.filter(owner=owner).order_by("-uploaded_at").first()
+        try:
+            detail_url = reverse("dataset-detail", kwargs={"pk": dataset.pk})
+            report_url = reverse("dataset-report", kwargs={"pk": dataset.pk})
+            timings["detail"] = time_request(
+                lambda: client.get(detail_url, {"include_records": "false"}), repeat
+            )
+            timings["history"] = time_request(lambda: client.get(reverse("dataset-history")), repeat)
+            timings["report_cold"] = time_request(lambda: client.get(report_url), 1)
+            timings["report_warm"] = time_request(lambda: client.get(report_url), repeat)
+        finally:
+            report_cache_path(dataset).unlink(missing_ok=True)
+            dataset.delete()
+            release_unused_content([dataset.content_id])
+        return timings
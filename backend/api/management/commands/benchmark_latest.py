@@ -0,0 +1,56 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from api.benchmarks import parse_row_count, time_latest_lookup
+
+BENCHMARK_USERNAME = "latest-benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time /api/datasets/latest/ as one user's history grows, next to the ordered scan "
+        "it replaced. Nothing is kept: the synthetic history is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--history",
+            default="10,1k,10k,100k",
+            help="Comma-separated history sizes (default: 10,1k,10k,100k).",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per size (default: 20).")
+        parser.add_argument("--json", action="store_true", help="Emit a single JSON object.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [parse_row_count(raw) for raw in options["history"].split(",") if raw.strip()]
+        except ValueError as exc:
+            raise CommandError(f"Invalid --history value: {options['history']}") from exc
+
+        owner, _ = get_user_model().objects.get_or_create(username=BENCHMARK_USERNAME)
+        host = next((host for host in settings.ALLOWED_HOSTS if host and "*" not in host), "localhost")
+        client = Client(HTTP_HOST=host.lstrip("."))
+        client.force_login(owner)
+        latest_url = reverse("dataset-latest")
+
+        runs = time_latest_lookup(
+            owner,
+            sizes,
+            options["repeat"],
+            lambda: client.get(latest_url, {"include_records": "false"}),
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"database": connection.vendor, "runs": runs}))
+            return
+        for run in runs:
+            self.stdout.write(
+                f"{run['history']:>9,} datasets: latest endpoint {run['endpoint']['median_ms']} ms "
+                f"(median), ordered scan {run['ordered_scan_ms']} ms"
+            )
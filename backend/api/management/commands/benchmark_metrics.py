@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.benchmarks import (
+    best_of,
+    engine_compute_metrics,
+    legacy_compute_metrics,
+    pandas_group_stats,
+    synthetic_frame,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare the metrics engine with the legacy pandas implementation on synthetic data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to generate (default: 1M).")
+        parser.add_argument("--types", type=int, default=6, help="Distinct equipment types (default: 6).")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation; best is kept.")
+        parser.add_argument("--json", action="store_true", help="Emit a single JSON object.")
+
+    def handle(self, *args, **options):
+        frame = synthetic_frame(options["rows"], type_cardinality=options["types"])
+
+        legacy_totals, legacy_metrics = legacy_compute_metrics(frame)
+        summary = engine_compute_metrics(frame)
+        if summary["metrics"] != legacy_metrics or any(
+            summary[key] != value for key, value in legacy_totals.items()
+        ):
+            self.stderr.write(self.style.WARNING("Engine output differs from the legacy implementation."))
+
+        legacy_seconds = best_of(lambda: legacy_compute_metrics(frame), options["repeat"])
+        # The engine also produces per-type stats, so the fair baseline adds a groupby.
+        grouped_seconds = legacy_seconds + best_of(lambda: pandas_group_stats(frame), options["repeat"])
+        engine_seconds = best_of(lambda: engine_compute_metrics(frame), options["repeat"])
+        result = {
+            "rows": options["rows"],
+            "types": options["types"],
+            "legacy_seconds": round(legacy_seconds, 4),
+            "legacy_with_groups_seconds": round(grouped_seconds, 4),
+            "engine_seconds": round(engine_seconds, 4),
+            "speedup": round(grouped_seconds / engine_seconds, 2) if engine_seconds else None,
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(result))
+            return
+        self.stdout.write(
+            f"{result['rows']:,} rows, {result['types']} types: legacy {result['legacy_seconds']}s "
+            f"({result['legacy_with_groups_seconds']}s with per-type stats), "
+            f"engine {result['engine_seconds']}s ({result['speedup']}x)"
+        )
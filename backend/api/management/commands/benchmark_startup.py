@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import LAZY_MODULES, measure_startup
+
+# Import time of ``django.setup()`` plus the URLconf, measured under -X importtime.
+DEFAULT_BUDGET_MS = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Time worker startup (django.setup() and the URLconf) in fresh interpreters with "
+        "python -X importtime. Fails when the median import time exceeds the budget or "
+        f"when a lazily loaded module ({', '.join(LAZY_MODULES)}) is imported at startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Interpreters to start (default: 5).")
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=DEFAULT_BUDGET_MS,
+            help=f"Maximum median import time in milliseconds (default: {DEFAULT_BUDGET_MS}).",
+        )
+        parser.add_argument("--json", action="store_true", help="Emit a single JSON object.")
+
+    def handle(self, *args, **options):
+        result = measure_startup(options["repeat"])
+        result["budget_ms"] = options["budget_ms"]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(result))
+        else:
+            self.stdout.write(
+                f"startup: {result['wall_ms']} ms wall, {result['import_ms']} ms importing "
+                f"(median of {options['repeat']}, budget {options['budget_ms']} ms)"
+            )
+            for entry in result["slowest"]:
+                self.stdout.write(f"  {entry['ms']:>8} ms  {entry['module']}")
+
+        if result["lazy_modules_loaded"]:
+            raise CommandError(
+                f"Imported at startup: {', '.join(result['lazy_modules_loaded'])}. "
+                "Import them where they are used."
+            )
+        if result["import_ms"] > options["budget_ms"]:
+            raise CommandError(
+                f"Startup import time {result['import_ms']} ms exceeds the "
+                f"{options['budget_ms']} ms budget."
+            )
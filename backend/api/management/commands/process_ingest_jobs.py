@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.jobs import requeue_stale_jobs, run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued background uploads. Use --loop to keep polling as a dedicated worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new jobs instead of exiting once the queue is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep between polls when --loop is set (default: 2).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} ingest job(s) whose worker stopped.")
+            processed = run_pending()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"Processed {processed} ingest job(s)."))
+            if not options["loop"]:
+                break
+            if not processed:
+                time.sleep(options["interval"])
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from api.retention import prune_datasets
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply DATASET_RETENTION: delete datasets beyond each owner's count, age and byte "
+        "limits, and remove stored files no dataset references."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be removed without deleting anything.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        result = prune_datasets(dry_run=dry_run)
+        if dry_run:
+            message = (
+                f"Would remove {result.datasets} dataset(s) ({result.dataset_bytes} bytes) "
+                f"and {result.orphan_files} orphaned file(s)."
+            )
+        else:
+            message = (
+                f"Removed {result.datasets} dataset(s) ({result.dataset_bytes} bytes), "
+                f"{result.contents} stored upload(s) no longer shared, "
+                f"and {result.orphan_files} orphaned file(s)."
+            )
+        self.stdout.write(self.style.SUCCESS(message))
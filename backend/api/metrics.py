@@ -0,0 +1,369 @@
+"""Vectorised, chunk-mergeable metrics over the numeric block of a dataset.
+
+Every chunk is reduced once into a small set of sufficient statistics (count,
+mean, sum of squared deviations, extremes with their labels, type counts and a
+bounded uniform sample for percentiles), overall and per equipment type.
+Partial results merge exactly, so the same code serves streaming ingest and
+parallel ingest. Derived metrics are
+registered functions of the final aggregates and never rescan the data::
+
+    @register_metric("max_pressure")
+    def _max_pressure(aggregates):
+        return aggregates.highlight("pressure", "max")
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+NUMERIC_COLUMNS = ("flowrate", "pressure", "temperature")
+PERCENTILES = (25, 50, 75, 95)
+DEFAULT_SAMPLE_SIZE = 100_000
+DEFAULT_GROUP_SAMPLE_SIZE = 10_000
+GROUP_PERCENTILE = 95
+# Dimensions ``Dataset.group_stats`` is keyed by.
+GROUP_BY_FIELDS = ("equipment_type",)
+
+Label = Tuple[Any, Any]
+
+
+def _label_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _subsample(rng: np.random.Generator, values: np.ndarray, size: int) -> np.ndarray:
+    """A uniform sample of at most ``size`` rows, in their original order."""
+
+    if values.shape[0] <= size:
+        return values
+    return values[np.sort(rng.choice(values.shape[0], size, replace=False))]
+
+
+def _merge_samples(
+    rng: np.random.Generator,
+    left: np.ndarray,
+    left_count: int,
+    right: np.ndarray,
+    right_count: int,
+    size: int,
+) -> np.ndarray:
+    """Uniform sample of the union, drawn from two uniform samples.
+
+    How many rows come from each side follows the hypergeometric split of the
+    true row counts, so no per-row keys have to be kept.
+    """
+
+    if left.shape[0] + right.shape[0] <= size:
+        return np.concatenate([left, right])
+    if not left_count:
+        return right
+    from_left = rng.hypergeometric(left_count, right_count, size)
+    left_rows = rng.choice(left.shape[0], from_left, replace=False)
+    right_rows = rng.choice(right.shape[0], size - from_left, replace=False)
+    return np.concatenate([left[left_rows], right[right_rows]])
+
+
+class MetricsAccumulator:
+    """Running aggregates for the ``(rows, columns)`` numeric block.
+
+    Percentiles come from a uniform sample of at most ``sample_size`` rows, so
+    they are exact for datasets up to that size and approximate beyond it.
+    Per-type aggregates live in ``groups`` as nested accumulators whose samples
+    are capped at ``group_sample_size``; pass ``None`` to skip grouping.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str] = NUMERIC_COLUMNS,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        seed: int | None = 0,
+        group_sample_size: int | None = DEFAULT_GROUP_SAMPLE_SIZE,
+    ):
+        width = len(columns)
+        self.columns = tuple(columns)
+        self.sample_size = sample_size
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self.min_labels: List[Label | None] = [None] * width
+        self.max_labels: List[Label | None] = [None] * width
+        self.type_counts: Dict[Any, int] = {}
+        self.group_sample_size = group_sample_size
+        self.groups: Dict[Any, MetricsAccumulator] = {}
+        self._rng = np.random.default_rng(seed)
+        self._sample = np.empty((0, width))
+
+    def update(self, values: np.ndarray, names: np.ndarray, types: np.ndarray) -> None:
+        """Fold one chunk in. ``values`` holds the columns in ``self.columns`` order."""
+
+        self.merge(self._reduce(values, names, types))
+
+    def _partial(self, sample_size: int, group_sample_size: int | None = None):
+        return MetricsAccumulator(
+            self.columns, sample_size, seed=None, group_sample_size=group_sample_size
+        )
+
+    def _reduce(self, values: np.ndarray, names: np.ndarray, types: np.ndarray):
+        part = self._partial(self.sample_size, self.group_sample_size)
+        rows = values.shape[0]
+        if not rows:
+            return part
+
+        columns = np.arange(values.shape[1])
+        low = values.argmin(axis=0)
+        high = values.argmax(axis=0)
+        part.count = rows
+        part.mean = values.mean(axis=0)
+        deviations = values - part.mean
+        part.m2 = np.einsum("ij,ij->j", deviations, deviations)
+        part.min = values[low, columns]
+        part.max = values[high, columns]
+        part.min_labels = [(names[index], types[index]) for index in low]
+        part.max_labels = [(names[index], types[index]) for index in high]
+
+        import pandas as pd
+
+        codes, uniques = pd.factorize(types)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        part.type_counts = dict(zip(uniques.tolist(), counts.tolist()))
+        if self.group_sample_size is not None:
+            part.groups = self._reduce_groups(values, codes, uniques.tolist())
+
+        part._sample = _subsample(self._rng, values, self.sample_size)
+        return part
+
+    def _reduce_groups(self, values: np.ndarray, codes: np.ndarray, keys: List) -> Dict:
+        """Per-type partials from one sort of the row indices by type code.
+
+        Rows without a type are left out, as they are from ``type_counts``.
+        """
+
+        # Small integer codes let NumPy use a radix sort.
+        code_type = np.int16 if len(keys) < np.iinfo(np.int16).max else np.intp
+        order = np.argsort(codes.astype(code_type), kind="stable")
+        typed = codes >= 0
+        if not typed.all():
+            order = order[codes[order] >= 0]
+        sizes = np.bincount(codes[typed], minlength=len(keys))
+        present = np.flatnonzero(sizes)
+        if not present.size:
+            return {}
+        sizes = sizes[present]
+        starts = np.r_[0, np.cumsum(sizes)[:-1]]
+
+        shape = (present.size, values.shape[1])
+        means, m2 = np.empty(shape), np.empty(shape)
+        minimums, maximums = np.empty(shape), np.empty(shape)
+        # Rows sorted by type, so every group's rows are one contiguous slice.
+        block = np.empty((order.size, values.shape[1]))
+        for column in range(values.shape[1]):
+            grouped = block[:, column]
+            grouped[:] = values[:, column][order]
+            means[:, column] = np.add.reduceat(grouped, starts) / sizes
+            deviations = grouped - np.repeat(means[:, column], sizes)
+            m2[:, column] = np.add.reduceat(deviations * deviations, starts)
+            minimums[:, column] = np.minimum.reduceat(grouped, starts)
+            maximums[:, column] = np.maximum.reduceat(grouped, starts)
+
+        groups = {}
+        for index, (code, start, size) in enumerate(
+            zip(present.tolist(), starts.tolist(), sizes.tolist())
+        ):
+            group = self._partial(self.group_sample_size)
+            group.count = size
+            group.mean = means[index]
+            group.m2 = m2[index]
+            group.min = minimums[index]
+            group.max = maximums[index]
+            group._sample = _subsample(
+                self._rng, block[start : start + size], self.group_sample_size
+            ).copy()
+            groups[keys[code]] = group
+        return groups
+
+    def merge(self, other: "MetricsAccumulator") -> None:
+        """Combine with aggregates of rows that come *after* this accumulator's rows.
+
+        Ties on extremes keep the earlier row, matching ``idxmax``/``idxmin``.
+        """
+
+        if not other.count:
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / total)
+        self.count = total
+
+        for index in range(len(self.columns)):
+            if other.min[index] < self.min[index]:
+                self.min[index] = other.min[index]
+                self.min_labels[index] = other.min_labels[index]
+            if other.max[index] > self.max[index]:
+                self.max[index] = other.max[index]
+                self.max_labels[index] = other.max_labels[index]
+
+        for key, value in other.type_counts.items():
+            self.type_counts[key] = self.type_counts.get(key, 0) + value
+
+        for key, group in other.groups.items():
+            if key in self.groups:
+                self.groups[key].merge(group)
+            else:
+                self.groups[key] = group
+
+        self._sample = _merge_samples(
+            self._rng,
+            self._sample,
+            total - other.count,
+            other._sample,
+            other.count,
+            self.sample_size,
+        )
+
+    def aggregates(self) -> "Aggregates":
+        return Aggregates(self)
+
+
+class Aggregates:
+    """Read-only view over a finished accumulator, handed to registered metrics."""
+
+    def __init__(self, accumulator: MetricsAccumulator):
+        self._acc = accumulator
+        self.count = accumulator.count
+        self.type_counts = dict(accumulator.type_counts)
+        self._percentiles: Dict[str, np.ndarray] = {}
+
+    def _index(self, column: str) -> int:
+        return self._acc.columns.index(column)
+
+    def mean(self, column: str) -> float:
+        return float(self._acc.mean[self._index(column)])
+
+    def std(self, column: str) -> float:
+        """Sample standard deviation (``ddof=1``), like ``pandas.Series.std``."""
+        if self.count < 2:
+            return 0.0
+        return float(math.sqrt(self._acc.m2[self._index(column)] / (self.count - 1)))
+
+    def minimum(self, column: str) -> float:
+        return float(self._acc.min[self._index(column)])
+
+    def maximum(self, column: str) -> float:
+        return float(self._acc.max[self._index(column)])
+
+    def percentile(self, column: str, q: float) -> float:
+        if column not in self._percentiles:
+            index = self._index(column)
+            self._percentiles[column] = np.percentile(
+                self._acc._sample[:, index], PERCENTILES
+            )
+        if q in PERCENTILES:
+            return float(self._percentiles[column][PERCENTILES.index(q)])
+        return float(np.percentile(self._acc._sample[:, self._index(column)], q))
+
+    def highlight(self, column: str, direction: str) -> Dict:
+        """The row holding a column's extreme, shaped like ``Dataset.metrics`` entries."""
+
+        index = self._index(column)
+        if direction == "max":
+            value, label = self._acc.max[index], self._acc.max_labels[index]
+        else:
+            value, label = self._acc.min[index], self._acc.min_labels[index]
+        name, equipment_type = label
+        return {
+            "equipment_name": _label_value(name),
+            "equipment_type": _label_value(equipment_type),
+            column: float(value),
+        }
+
+    def column_summary(self, column: str) -> Dict[str, float]:
+        summary = {
+            "mean": round(self.mean(column), 2),
+            "std": round(self.std(column), 2),
+            "min": round(self.minimum(column), 2),
+            "max": round(self.maximum(column), 2),
+        }
+        for q in PERCENTILES:
+            summary[f"p{q}"] = round(self.percentile(column, q), 2)
+        return summary
+
+    def group_summary(self) -> Dict[str, Dict]:
+        """Count and mean/min/max/p95 per column for every equipment type."""
+
+        summary = {}
+        for key in sorted(self._acc.groups, key=str):
+            group = self._acc.groups[key]
+            upper = np.percentile(group._sample, GROUP_PERCENTILE, axis=0)
+            entry: Dict[str, Any] = {"count": group.count}
+            for index, column in enumerate(self._acc.columns):
+                entry[column] = {
+                    "mean": round(float(group.mean[index]), 2),
+                    "min": round(float(group.min[index]), 2),
+                    "max": round(float(group.max[index]), 2),
+                    f"p{GROUP_PERCENTILE}": round(float(upper[index]), 2),
+                }
+            summary[str(key)] = entry
+        return summary
+
+
+MetricFunc = Callable[[Aggregates], Any]
+_REGISTRY: Dict[str, MetricFunc] = {}
+
+
+def register_metric(name: str) -> Callable[[MetricFunc], MetricFunc]:
+    """Register ``func(aggregates)`` to be stored under ``name`` in ``Dataset.metrics``."""
+
+    def decorator(func: MetricFunc) -> MetricFunc:
+        _REGISTRY[name] = func
+        return func
+
+    return decorator
+
+
+def evaluate_metrics(aggregates: Aggregates) -> Dict[str, Any]:
+    return {name: func(aggregates) for name, func in _REGISTRY.items()}
+
+
+def summarize(accumulator: MetricsAccumulator) -> Dict[str, Any]:
+    """Everything ``Dataset`` stores about the numeric block, from one accumulator."""
+
+    aggregates = accumulator.aggregates()
+    type_distribution = {
+        str(key): int(value) for key, value in sorted(aggregates.type_counts.items())
+    }
+    return {
+        "total_records": aggregates.count,
+        "avg_flowrate": round(aggregates.mean("flowrate"), 2),
+        "avg_pressure": round(aggregates.mean("pressure"), 2),
+        "avg_temperature": round(aggregates.mean("temperature"), 2),
+        "type_distribution": type_distribution,
+        "metrics": evaluate_metrics(aggregates),
+        "column_stats": {
+            column: aggregates.column_summary(column) for column in accumulator.columns
+        },
+        "group_stats": {GROUP_BY_FIELDS[0]: aggregates.group_summary()},
+    }
+
+
+@register_metric("max_flowrate")
+def _max_flowrate(aggregates: Aggregates) -> Dict:
+    return aggregates.highlight("flowrate", "max")
+
+
+@register_metric("min_flowrate")
+def _min_flowrate(aggregates: Aggregates) -> Dict:
+    return aggregates.highlight("flowrate", "min")
+
+
+@register_metric("max_temperature")
+def _max_temperature(aggregates: Aggregates) -> Dict:
+    return aggregates.highlight("temperature", "max")
@@ -0,0 +1,104 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def copy_records_to_table(apps, schema_editor):
+    Dataset = apps.get_model("api", "Dataset")
+    EquipmentRecord = apps.get_model("api", "EquipmentRecord")
+
+    for dataset in Dataset.objects.only("id", "records").iterator():
+        EquipmentRecord.objects.bulk_create(
+            (
+                EquipmentRecord(
+                    dataset_id=dataset.id,
+                    position=position,
+                    equipment_name=row.get("equipment_name"),
+                    equipment_type=row.get("equipment_type"),
+                    flowrate=row["flowrate"],
+                    pressure=row["pressure"],
+                    temperature=row["temperature"],
+                )
+                for position, row in enumerate(dataset.records or [])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def copy_records_to_json(apps, schema_editor):
+    Dataset = apps.get_model("api", "Dataset")
+    EquipmentRecord = apps.get_model("api", "EquipmentRecord")
+    fields = ("equipment_name", "equipment_type", "flowrate", "pressure", "temperature")
+
+    for dataset in Dataset.objects.only("id").iterator():
+        dataset.records = list(
+            EquipmentRecord.objects.filter(dataset_id=dataset.id)
+            .order_by("position")
+            .values(*fields)
+        )
+        dataset.save(update_fields=["records"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_dataset_owner"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EquipmentRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveIntegerField()),
+                (
+                    "equipment_name",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "equipment_type",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("flowrate", models.FloatField()),
+                ("pressure", models.FloatField()),
+                ("temperature", models.FloatField()),
+                (
+                    "dataset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="equipment_records",
+                        to="api.dataset",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["position"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dataset", "position"),
+                        name="unique_record_position_per_dataset",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(copy_records_to_table, copy_records_to_json),
+        # A default lets the column be re-added on rollback before the rows are copied back.
+        migrations.AlterField(
+            model_name="dataset",
+            name="records",
+            field=models.JSONField(default=list),
+        ),
+        migrations.RemoveField(
+            model_name="dataset",
+            name="records",
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_equipment_records"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["dataset", "equipment_type"], name="record_dataset_type_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["dataset", "flowrate"], name="record_dataset_flowrate_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["dataset", "pressure"], name="record_dataset_pressure_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["dataset", "temperature"], name="record_dataset_temp_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_ingest_jobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataset",
+            name="column_stats",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
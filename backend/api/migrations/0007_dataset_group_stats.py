@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_dataset_column_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataset",
+            name="group_stats",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:48
+
+from django.db import migrations, models
+
+
+def fill_stored_bytes(apps, schema_editor):
+    Dataset = apps.get_model("api", "Dataset")
+
+    for dataset in Dataset.objects.only("id", "original_file").iterator():
+        try:
+            size = dataset.original_file.size
+        except (OSError, ValueError):
+            # Missing files count as zero bytes; retention removes the row as usual.
+            continue
+        Dataset.objects.filter(pk=dataset.pk).update(stored_bytes=size)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_dataset_group_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataset",
+            name="stored_bytes",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_stored_bytes, migrations.RunPython.noop),
+    ]
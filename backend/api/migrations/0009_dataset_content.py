@@ -0,0 +1,245 @@
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import api.models
+
+BATCH_SIZE = 2000
+HASH_CHUNK_BYTES = 1024 * 1024
+SUMMARY_FIELDS = (
+    "total_records",
+    "avg_flowrate",
+    "avg_pressure",
+    "avg_temperature",
+    "type_distribution",
+    "metrics",
+    "column_stats",
+    "group_stats",
+)
+
+
+def _file_digest(field_file):
+    if not field_file.name or not field_file.storage.exists(field_file.name):
+        return None
+    digest = hashlib.sha256()
+    with field_file.storage.open(field_file.name, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def move_records_to_content(apps, schema_editor):
+    Dataset = apps.get_model("api", "Dataset")
+    DatasetContent = apps.get_model("api", "DatasetContent")
+    EquipmentRecord = apps.get_model("api", "EquipmentRecord")
+
+    for dataset in Dataset.objects.order_by("uploaded_at").iterator():
+        digest = _file_digest(dataset.original_file)
+        content = (
+            DatasetContent.objects.filter(sha256=digest).first() if digest else None
+        )
+        if content is None:
+            content = DatasetContent.objects.create(
+                sha256=digest,
+                file=dataset.original_file.name,
+                size=dataset.stored_bytes,
+                summary={field: getattr(dataset, field) for field in SUMMARY_FIELDS},
+            )
+            EquipmentRecord.objects.filter(dataset_id=dataset.id).update(
+                content=content
+            )
+        else:
+            # Identical bytes were already parsed; the duplicate file is left for
+            # ``prune_datasets`` to sweep once nothing references it.
+            EquipmentRecord.objects.filter(dataset_id=dataset.id).delete()
+        Dataset.objects.filter(pk=dataset.pk).update(content=content)
+
+
+def move_records_to_datasets(apps, schema_editor):
+    Dataset = apps.get_model("api", "Dataset")
+    DatasetContent = apps.get_model("api", "DatasetContent")
+    EquipmentRecord = apps.get_model("api", "EquipmentRecord")
+    fields = (
+        "position",
+        "equipment_name",
+        "equipment_type",
+        "flowrate",
+        "pressure",
+        "temperature",
+    )
+
+    # content id -> the first dataset that took over its rows; later ones get copies.
+    owners = {}
+    for dataset in Dataset.objects.order_by("uploaded_at").iterator():
+        content = DatasetContent.objects.get(pk=dataset.content_id)
+        Dataset.objects.filter(pk=dataset.pk).update(original_file=content.file.name)
+        if content.pk not in owners:
+            owners[content.pk] = dataset.id
+            EquipmentRecord.objects.filter(content_id=content.pk).update(
+                dataset_id=dataset.id
+            )
+            continue
+        rows = EquipmentRecord.objects.filter(
+            content_id=content.pk, dataset_id=owners[content.pk]
+        )
+        EquipmentRecord.objects.bulk_create(
+            (
+                EquipmentRecord(dataset_id=dataset.id, content_id=content.pk, **row)
+                for row in rows.values(*fields).iterator()
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_dataset_stored_bytes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatasetContent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sha256",
+                    models.CharField(blank=True, max_length=64, null=True, unique=True),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        max_length=255, upload_to=api.models.content_upload_path
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField(default=0)),
+                ("summary", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="dataset",
+            name="content",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="datasets",
+                to="api.datasetcontent",
+            ),
+        ),
+        migrations.AddField(
+            model_name="equipmentrecord",
+            name="content",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="records",
+                to="api.datasetcontent",
+            ),
+        ),
+        # Nullable/defaulted so both columns can be re-added on rollback before data moves back.
+        migrations.AlterField(
+            model_name="equipmentrecord",
+            name="dataset",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="equipment_records",
+                to="api.dataset",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="dataset",
+            name="original_file",
+            field=models.FileField(
+                default="", upload_to=api.models.dataset_upload_path
+            ),
+        ),
+        migrations.RunPython(move_records_to_content, move_records_to_datasets),
+        migrations.RemoveConstraint(
+            model_name="equipmentrecord",
+            name="unique_record_position_per_dataset",
+        ),
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_dataset_type_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_dataset_flowrate_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_dataset_pressure_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_dataset_temp_idx",
+        ),
+        migrations.RemoveField(
+            model_name="equipmentrecord",
+            name="dataset",
+        ),
+        migrations.RemoveField(
+            model_name="dataset",
+            name="original_file",
+        ),
+        migrations.AlterField(
+            model_name="dataset",
+            name="content",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="datasets",
+                to="api.datasetcontent",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="equipmentrecord",
+            name="content",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="records",
+                to="api.datasetcontent",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="equipmentrecord",
+            constraint=models.UniqueConstraint(
+                fields=("content", "position"),
+                name="unique_record_position_per_content",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["content", "equipment_type"], name="record_content_type_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["content", "flowrate"], name="record_content_flowrate_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["content", "pressure"], name="record_content_pressure_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentrecord",
+            index=models.Index(
+                fields=["content", "temperature"], name="record_content_temp_idx"
+            ),
+        ),
+    ]
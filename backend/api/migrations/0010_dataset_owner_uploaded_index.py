@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_dataset_content"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dataset",
+            index=models.Index(
+                fields=["owner", "-uploaded_at"], name="dataset_owner_uploaded_idx"
+            ),
+        ),
+    ]
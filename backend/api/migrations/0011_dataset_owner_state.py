@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def point_owners_at_latest(apps, schema_editor):
+    Dataset = apps.get_model("api", "Dataset")
+    DatasetOwnerState = apps.get_model("api", "DatasetOwnerState")
+
+    owner_ids = (
+        Dataset.objects.filter(owner__isnull=False)
+        .order_by("owner_id")
+        .values_list("owner_id", flat=True)
+        .distinct()
+    )
+    for owner_id in list(owner_ids):
+        latest = (
+            Dataset.objects.filter(owner_id=owner_id).order_by("-uploaded_at").first()
+        )
+        DatasetOwnerState.objects.create(owner_id=owner_id, latest_dataset=latest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_dataset_owner_uploaded_index"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatasetOwnerState",
+            fields=[
+                (
+                    "owner",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dataset_state",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "latest_dataset",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="latest_for",
+                        to="api.dataset",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(point_owners_at_latest, migrations.RunPython.noop),
+    ]
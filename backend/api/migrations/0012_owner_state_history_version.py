@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_dataset_owner_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetownerstate",
+            name="history_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_ingest_job_heartbeat"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_content_type_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_content_flowrate_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_content_pressure_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="equipmentrecord",
+            name="record_content_temp_idx",
+        ),
+    ]
@@ -5,11 +5,57 @@ from django.db import models
 from django.utils import timezone
 
 
+# Upload path of the former ``Dataset.original_file``; still referenced by old migrations.
 def dataset_upload_path(instance, filename):
 	timestamp = timezone.now().strftime("%Y%m%d%H%M%S")
 	return f"datasets/{timestamp}_{filename}"
 
 
+def content_upload_path(instance, filename):
+	digest = instance.sha256 or uuid4().hex
+	return f"datasets/content/{digest[:2]}/{digest}.csv"
+
+
+class DatasetContent(models.Model):
+	"""One stored CSV and its parsed rows, shared by every upload of identical bytes."""
+
+	# SHA-256 of the file bytes; null only for content migrated from files that were missing.
+	sha256 = models.CharField(max_length=64, unique=True, null=True, blank=True)
+	file = models.FileField(upload_to=content_upload_path, max_length=255)
+	size = models.PositiveBigIntegerField(default=0)
+	# Values of the Dataset summary fields, copied onto each dataset that reuses this content.
+	summary = models.JSONField(default=dict, blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self):
+		return self.sha256 or f"content {self.pk}"
+
+
+class DatasetQuerySet(models.QuerySet):
+	SUMMARY_FIELDS = (
+		"id",
+		"owner",
+		"content",
+		"name",
+		"source_filename",
+		"uploaded_at",
+		"total_records",
+		"avg_flowrate",
+		"avg_pressure",
+		"avg_temperature",
+		"type_distribution",
+		"metrics",
+		"column_stats",
+	)
+
+	def owned_by(self, user):
+		return self.filter(owner=user)
+
+	def summaries(self):
+		"""Only the metadata the summary payload needs, with the owner joined in."""
+		return self.select_related("owner").only(*self.SUMMARY_FIELDS, "owner__username")
+
+
 class Dataset(models.Model):
 	"""Persist parsed CSV data, summary metrics, and original file reference."""
 
@@ -23,7 +69,13 @@ class Dataset(models.Model):
 	)
 	name = models.CharField(max_length=255)
 	source_filename = models.CharField(max_length=255)
-	original_file = models.FileField(upload_to=dataset_upload_path)
+	content = models.ForeignKey(
+		DatasetContent,
+		on_delete=models.PROTECT,
+		related_name="datasets",
+	)
+	# Size of the uploaded file, so retention can cap bytes per owner without stat calls.
+	stored_bytes = models.PositiveBigIntegerField(default=0)
 	uploaded_at = models.DateTimeField(auto_now_add=True)
 
 	total_records = models.PositiveIntegerField()
@@ -32,20 +84,156 @@ class Dataset(models.Model):
 	avg_temperature = models.FloatField()
 	type_distribution = models.JSONField(default=dict)
 	metrics = models.JSONField(default=dict, blank=True)
-	records = models.JSONField()
+	column_stats = models.JSONField(default=dict, blank=True)
+	# Per-dimension breakdowns, e.g. {"equipment_type": {"Pump": {...}}}.
+	group_stats = models.JSONField(default=dict, blank=True)
+
+	objects = DatasetQuerySet.as_manager()
 
 	class Meta:
 		ordering = ["-uploaded_at"]
+		# Latest/history lookups and retention all scan one owner's datasets newest first.
+		indexes = [
+			models.Index(fields=["owner", "-uploaded_at"], name="dataset_owner_uploaded_idx"),
+		]
 
 	def __str__(self):
 		return f"{self.name} ({self.total_records} records)"
 
-	def save(self, *args, **kwargs):
-		super().save(*args, **kwargs)
-		if self.owner_id:
-			preserved_ids = (
-				Dataset.objects.filter(owner=self.owner)
-				.order_by("-uploaded_at")
-				.values_list("id", flat=True)[:5]
-			)
-			Dataset.objects.filter(owner=self.owner).exclude(id__in=preserved_ids).delete()
+	@property
+	def records(self):
+		"""Row data in upload order, read from the mapped column files on access."""
+		from .columns import column_store
+
+		columns = column_store(self.content).columns(EquipmentRecord.RECORD_FIELDS)
+		return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+class DatasetOwnerState(models.Model):
+	"""Per-owner pointer to the newest dataset, kept current by ingest.
+
+	Turns ``/datasets/latest/`` into a primary-key join instead of a sort over the
+	owner's history. Deleting the dataset clears the pointer; readers then fall
+	back to the ordered query and repair it.
+	"""
+
+	owner = models.OneToOneField(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		primary_key=True,
+		related_name="dataset_state",
+	)
+	latest_dataset = models.OneToOneField(
+		Dataset,
+		on_delete=models.SET_NULL,
+		related_name="latest_for",
+		null=True,
+		blank=True,
+	)
+	# Bumped whenever one of the owner's datasets is added or removed; part of the history ETag.
+	history_version = models.PositiveBigIntegerField(default=0)
+
+	def __str__(self):
+		return f"{self.owner_id} -> {self.latest_dataset_id}"
+
+
+class EquipmentRecord(models.Model):
+	"""A single parsed CSV row of content ingested before the column store.
+
+	New uploads no longer write here; these rows only seed ``columns`` backfills,
+	which read them by ``(content, position)`` through the unique constraint.
+	"""
+
+	RECORD_FIELDS = (
+		"equipment_name",
+		"equipment_type",
+		"flowrate",
+		"pressure",
+		"temperature",
+	)
+
+	content = models.ForeignKey(
+		DatasetContent,
+		on_delete=models.CASCADE,
+		related_name="records",
+	)
+	position = models.PositiveIntegerField()
+	equipment_name = models.CharField(max_length=255, null=True, blank=True)
+	equipment_type = models.CharField(max_length=255, null=True, blank=True)
+	flowrate = models.FloatField()
+	pressure = models.FloatField()
+	temperature = models.FloatField()
+
+	class Meta:
+		ordering = ["position"]
+		constraints = [
+			models.UniqueConstraint(
+				fields=["content", "position"],
+				name="unique_record_position_per_content",
+			),
+		]
+
+	def __str__(self):
+		return f"{self.equipment_name} ({self.equipment_type})"
+
+
+def job_upload_path(instance, filename):
+	timestamp = timezone.now().strftime("%Y%m%d%H%M%S")
+	return f"jobs/{timestamp}_{filename}"
+
+
+class IngestJob(models.Model):
+	"""A queued background upload; the staged file is removed once it finishes."""
+
+	STATUS_QUEUED = "queued"
+	STATUS_RUNNING = "running"
+	STATUS_SUCCEEDED = "succeeded"
+	STATUS_FAILED = "failed"
+	STATUS_CHOICES = [
+		(STATUS_QUEUED, "Queued"),
+		(STATUS_RUNNING, "Running"),
+		(STATUS_SUCCEEDED, "Succeeded"),
+		(STATUS_FAILED, "Failed"),
+	]
+
+	id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+	owner = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		related_name="ingest_jobs",
+		null=True,
+		blank=True,
+	)
+	name = models.CharField(max_length=255, blank=True)
+	source_filename = models.CharField(max_length=255)
+	upload = models.FileField(upload_to=job_upload_path, blank=True)
+	status = models.CharField(
+		max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True
+	)
+	progress = models.PositiveSmallIntegerField(default=0)
+	rows_processed = models.PositiveIntegerField(default=0)
+	error = models.TextField(blank=True)
+	dataset = models.ForeignKey(
+		Dataset,
+		on_delete=models.SET_NULL,
+		related_name="+",
+		null=True,
+		blank=True,
+	)
+	created_at = models.DateTimeField(auto_now_add=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	# Refreshed while a worker runs the job; a stale one means the worker died.
+	heartbeat_at = models.DateTimeField(null=True, blank=True)
+	# Times a worker claimed the job; jobs that keep killing their worker stop being retried.
+	attempts = models.PositiveSmallIntegerField(default=0)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["created_at"]
+
+	def __str__(self):
+		return f"{self.source_filename} ({self.status})"
+
+	@property
+	def is_finished(self):
+		return self.status in {self.STATUS_SUCCEEDED, self.STATUS_FAILED}
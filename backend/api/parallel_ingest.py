@@ -0,0 +1,286 @@
+"""Multi-process parsing for very large uploads.
+
+The stored CSV is memory-mapped and cut into byte ranges at line boundaries.
+Each range is parsed and validated in a worker process with the same code as
+the serial path (``parsing._iter_chunks``) and reduced into its own
+``MetricsAccumulator``. The parsed columns come back through POSIX shared
+memory rather than being pickled: float values, type codes and the
+NUL-joined names each go in one block. The parent takes ranges in file
+order, hands each to ``write`` with its row offset, and merges the partial
+aggregates.
+
+Nothing here imports Django, so workers can be started with ``spawn``.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import NUMERIC_COLUMNS, MetricsAccumulator
+from .parsing import ParsedChunk, _iter_chunks
+
+# Named shared memory outlives the worker's handle only on POSIX; elsewhere
+# ingest stays serial.
+SUPPORTED = os.name == "posix"
+# Ranges queued or finished but not yet written, per worker. Bounds how much
+# parsed data waits in shared memory.
+RANGES_IN_FLIGHT_PER_WORKER = 2
+# Joins the equipment names of a range into one shared block; uploads containing it are rejected.
+NAME_SEPARATOR = "\0"
+# Python 3.13+ can attach to a block without registering it with the resource tracker.
+ATTACH_OPTIONS = {"track": False} if sys.version_info >= (3, 13) else {}
+
+ByteRange = Tuple[int, int]
+WriteCallback = Callable[[ParsedChunk, int], None]
+ProgressCallback = Callable[[int, int], None]
+
+
+class UnsplittableCSV(ValueError):
+    """A range boundary fell inside a quoted field; parse the file serially instead."""
+
+
+def split_ranges(path, range_bytes: int) -> Tuple[bytes, List[ByteRange]]:
+    """Return the header line and ``[start, end)`` body ranges ending on newlines."""
+
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if not size:
+            raise ValueError("Uploaded file is empty.")
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header_end = mapped.find(b"\n") + 1 or size
+            ranges = []
+            start = header_end
+            while start < size:
+                newline = mapped.find(b"\n", min(start + range_bytes, size) - 1)
+                end = size if newline == -1 else newline + 1
+                ranges.append((start, end))
+                start = end
+            return mapped[:header_end], ranges
+
+
+class _ChainReader(io.RawIOBase):
+    """Read-only stream over several buffers in turn (the header, then one range)."""
+
+    def __init__(self, *parts):
+        self._parts = deque(memoryview(part) for part in parts)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._parts and not len(self._parts[0]):
+            self._parts.popleft()
+        if not self._parts:
+            return 0
+        part = self._parts[0]
+        size = min(len(buffer), len(part))
+        buffer[:size] = part[:size]
+        self._parts[0] = part[size:]
+        return size
+
+
+def _share(array: np.ndarray) -> str:
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    target = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    target[...] = array
+    del target
+    block.close()
+    return block.name
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    return shared_memory.SharedMemory(name=name, **ATTACH_OPTIONS)
+
+
+def _release(block: shared_memory.SharedMemory) -> None:
+    """Close and unlink a worker's block, dropping its one resource tracker entry.
+
+    Spawned workers share this process's tracker, where ``_share`` registered
+    the block. Attaching before Python 3.13 registers it again (the tracker
+    keeps a set, so nothing changes) and ``unlink`` unregisters it. An
+    untracked attach leaves the worker's entry, so it is unregistered here.
+    """
+
+    block.close()
+    block.unlink()
+    if ATTACH_OPTIONS:
+        resource_tracker.unregister(block._name, "shared_memory")
+
+
+def _take(name: str, dtype, shape) -> np.ndarray:
+    block = _attach(name)
+    try:
+        source = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array = source.copy()
+        del source
+    finally:
+        _release(block)
+    return array
+
+
+def _discard(name: str) -> None:
+    try:
+        block = _attach(name)
+    except FileNotFoundError:
+        return
+    _release(block)
+
+
+@dataclass
+class RangeResult:
+    """One parsed range: partial aggregates plus the names of its shared blocks."""
+
+    rows: int
+    quotes: int
+    accumulator: MetricsAccumulator
+    type_labels: list
+    names_bytes: int
+    values_block: Optional[str] = None
+    codes_block: Optional[str] = None
+    names_block: Optional[str] = None
+
+    def take(self) -> ParsedChunk:
+        """Copy the columns out of shared memory and free the blocks."""
+
+        values = _take(self.values_block, np.float64, (self.rows, len(NUMERIC_COLUMNS)))
+        codes = _take(self.codes_block, np.int32, (self.rows,))
+        names_raw = _take(self.names_block, np.uint8, (self.names_bytes,)).tobytes()
+        self.values_block = self.codes_block = self.names_block = None
+
+        labels = np.array([*self.type_labels, None], dtype=object)
+        names = np.array(names_raw.decode("utf-8").split(NAME_SEPARATOR), dtype=object)
+        # pandas reads an empty name as missing, so "" can only mean None.
+        names[names == ""] = None
+        return ParsedChunk(names=names, types=labels[codes], values=values)
+
+    def discard(self) -> None:
+        for name in (self.values_block, self.codes_block, self.names_block):
+            if name:
+                _discard(name)
+
+
+def _parse_range(
+    path, header: bytes, start: int, end: int, chunk_rows: int, sample_size: int
+) -> RangeResult:
+    """Worker: parse ``[start, end)`` of ``path`` and share its columns."""
+
+    import pandas as pd
+
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        body = handle.read(end - start)
+    quotes = body.count(b'"')
+
+    accumulator = MetricsAccumulator(NUMERIC_COLUMNS, sample_size=sample_size)
+    chunks = []
+    stream = io.BufferedReader(_ChainReader(header, body))
+    try:
+        for chunk in _iter_chunks(stream, chunk_rows):
+            accumulator.update(chunk.values, chunk.names, chunk.types)
+            chunks.append(chunk)
+    except ValueError as exc:
+        # An odd quote count means a boundary cut a quoted field in half.
+        if quotes % 2:
+            raise UnsplittableCSV(str(exc)) from exc
+        raise
+    del body
+
+    result = RangeResult(
+        rows=accumulator.count,
+        quotes=quotes,
+        accumulator=accumulator,
+        type_labels=[],
+        names_bytes=0,
+    )
+    if not chunks:
+        return result
+
+    values = np.concatenate([chunk.values for chunk in chunks])
+    codes, labels = pd.factorize(np.concatenate([chunk.types for chunk in chunks]))
+    names = np.concatenate([chunk.names for chunk in chunks])
+    names[pd.isna(names)] = ""
+    names = NAME_SEPARATOR.join(names.tolist()).encode("utf-8")
+    result.type_labels = labels.tolist()
+    result.names_bytes = len(names)
+    result.values_block = _share(np.ascontiguousarray(values))
+    result.codes_block = _share(codes.astype(np.int32))
+    result.names_block = _share(np.frombuffer(names, dtype=np.uint8))
+    return result
+
+
+def ingest_parallel(
+    path,
+    write: WriteCallback,
+    *,
+    processes: int,
+    range_bytes: int,
+    chunk_rows: int,
+    sample_size: int,
+    progress: ProgressCallback | None = None,
+) -> MetricsAccumulator:
+    """Parse ``path`` in ``processes`` workers and ``write`` its rows in file order.
+
+    ``write(chunk, offset)`` receives the rows in chunks of at most
+    ``chunk_rows``, each with the position of its first row. Raises
+    ``UnsplittableCSV`` if a boundary turned out to lie inside a quoted field;
+    the caller should discard what was written and fall back to the serial
+    path.
+    """
+
+    header, ranges = split_ranges(path, range_bytes)
+    accumulator = MetricsAccumulator(NUMERIC_COLUMNS, sample_size=sample_size)
+    quotes = header.count(b'"')
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        queue = iter(ranges)
+        pending = deque()
+
+        def submit_next():
+            byte_range = next(queue, None)
+            if byte_range is not None:
+                future = pool.submit(
+                    _parse_range, path, header, *byte_range, chunk_rows, sample_size
+                )
+                pending.append((byte_range, future))
+
+        for _ in range(processes * RANGES_IN_FLIGHT_PER_WORKER):
+            submit_next()
+        try:
+            while pending:
+                (_start, end), future = pending.popleft()
+                result = future.result()
+                submit_next()
+                quotes += result.quotes
+                if quotes % 2:
+                    result.discard()
+                    raise UnsplittableCSV("A range boundary falls inside a quoted field.")
+                if result.rows:
+                    parsed = result.take()
+                    for first in range(0, result.rows, chunk_rows):
+                        rows = slice(first, first + chunk_rows)
+                        write(
+                            ParsedChunk(parsed.names[rows], parsed.types[rows], parsed.values[rows]),
+                            accumulator.count + first,
+                        )
+                accumulator.merge(result.accumulator)
+                if progress:
+                    progress(accumulator.count, end)
+        except BaseException:
+            for _byte_range, future in pending:
+                future.cancel()
+            for _byte_range, future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    future.result().discard()
+            raise
+    return accumulator
@@ -0,0 +1,92 @@
+"""CSV schema and chunk parsing for uploads.
+
+Nothing here touches Django, so ingest worker processes can import it
+without configuring settings.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+
+import numpy as np
+
+from .metrics import NUMERIC_COLUMNS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+REQUIRED_COLUMNS = {
+    "Equipment Name",
+    "Type",
+    "Flowrate",
+    "Pressure",
+    "Temperature",
+}
+
+COLUMN_RENAMES = {
+    "Equipment Name": "equipment_name",
+    "Type": "equipment_type",
+    "Flowrate": "flowrate",
+    "Pressure": "pressure",
+    "Temperature": "temperature",
+}
+
+SOURCE_COLUMNS = {target: source for source, target in COLUMN_RENAMES.items()}
+
+
+@dataclass
+class ParsedChunk:
+    """One validated slice of the CSV as flat arrays.
+
+    ``values`` is a ``(rows, 3)`` float64 block in ``NUMERIC_COLUMNS`` order,
+    already rounded to two decimals.
+    """
+
+    names: np.ndarray
+    types: np.ndarray
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+
+def _prepare_chunk(df: pd.DataFrame) -> ParsedChunk:
+    import pandas as pd
+
+    missing = REQUIRED_COLUMNS.difference(df.columns)
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(sorted(missing))}")
+
+    # Column-major so the per-column reductions in the metrics engine are contiguous.
+    values = np.empty((len(df), len(NUMERIC_COLUMNS)), order="F")
+    for index, column in enumerate(NUMERIC_COLUMNS):
+        values[:, index] = pd.to_numeric(df[SOURCE_COLUMNS[column]], errors="coerce")
+    if np.isnan(values).any():
+        raise ValueError("Numeric columns contain invalid values. Please clean the CSV.")
+
+    return ParsedChunk(
+        names=df[SOURCE_COLUMNS["equipment_name"]].to_numpy(dtype=object),
+        types=df[SOURCE_COLUMNS["equipment_type"]].to_numpy(dtype=object),
+        values=np.round(values, 2),
+    )
+
+
+def _iter_chunks(file_obj: BinaryIO, chunk_rows: int) -> Iterator[ParsedChunk]:
+    """Yield validated, coerced chunks of at most ``chunk_rows`` rows."""
+
+    # pandas is imported on first ingest rather than in every worker at boot.
+    import pandas as pd
+
+    try:
+        reader = pd.read_csv(
+            file_obj,
+            chunksize=chunk_rows,
+            dtype={"Equipment Name": str, "Type": str},
+        )
+    except pd.errors.EmptyDataError as exc:
+        raise ValueError("Uploaded file is empty.") from exc
+
+    with reader:
+        for chunk in reader:
+            yield _prepare_chunk(chunk)
@@ -1,17 +1,41 @@
-"""Utility helpers for generating PDF summaries."""
+"""Utility helpers for generating PDF summaries.
 
+ReportLab is imported on the first render, so importing this module (views,
+jobs, retention) stays cheap.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from functools import lru_cache
 from io import BytesIO
-from typing import List
+from pathlib import Path
+from typing import TYPE_CHECKING, List
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from django.conf import settings
 
 from .models import Dataset
 
+if TYPE_CHECKING:
+    from reportlab.platypus import Table
+
+# Bump whenever the report layout changes so cached PDFs are re-rendered.
+REPORT_VERSION = 1
+REPORT_CACHE_DIR = "reports"
+
+
+@lru_cache(maxsize=1)
+def _styles():
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    return getSampleStyleSheet()
+
 
 def _table(data: List[List], column_widths=None) -> Table:
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
     table = Table(data, colWidths=column_widths)
     table.setStyle(
         TableStyle(
@@ -29,9 +53,12 @@ def _table(data: List[List], column_widths=None) -> Table:
 
 
 def build_dataset_report(dataset: Dataset) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
+    styles = _styles()
     story = []
 
     story.append(Paragraph(f"Dataset Report: {dataset.name}", styles["Heading1"]))
@@ -67,6 +94,10 @@ def build_dataset_report(dataset: Dataset) -> bytes:
         highlights = [["Insight", "Equipment", "Value"]]
         for key, payload in dataset.metrics.items():
             label = key.replace("_", " ").title()
+            if not isinstance(payload, dict):
+                # Registered scalar metrics have no equipment row attached.
+                highlights.append([label, "-", f"{payload}"])
+                continue
             equipment = f"{payload.get('equipment_name')} ({payload.get('equipment_type')})"
             value = ", ".join(
                 f"{field.title()}: {payload[field]}"
@@ -79,3 +110,36 @@ def build_dataset_report(dataset: Dataset) -> bytes:
     doc.build(story)
     buffer.seek(0)
     return buffer.read()
+
+
+def report_etag(dataset: Dataset) -> str:
+    return f'"{dataset.pk}-v{REPORT_VERSION}"'
+
+
+def report_cache_path(dataset: Dataset) -> Path:
+    return Path(settings.MEDIA_ROOT) / REPORT_CACHE_DIR / f"{dataset.pk}-v{REPORT_VERSION}.pdf"
+
+
+def ensure_dataset_report(dataset: Dataset) -> Path:
+    """Return the cached PDF for ``dataset``, rendering it on first use.
+
+    Datasets never change after upload, so the file is keyed only by dataset id
+    and ``REPORT_VERSION``. It is written to a temporary file and renamed into
+    place so concurrent workers never serve a partial PDF.
+    """
+
+    path = report_cache_path(dataset)
+    if path.exists():
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pdf_bytes = build_dataset_report(dataset)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(pdf_bytes)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
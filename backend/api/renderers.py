@@ -0,0 +1,41 @@
+"""Columnar JSON for row payloads.
+
+``application/vnd.equipment.columnar+json`` (or ``?format=columnar``) renders
+row lists as ``{column: [values, ...]}``. Every key is sent once rather than
+once per row, and clients can load each list straight into an array.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+
+def rows_to_columns(rows: List[Dict]) -> Dict[str, List]:
+    if not rows:
+        return {}
+    return {key: [row[key] for row in rows] for key in rows[0]}
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = "application/vnd.equipment.columnar+json"
+    format = "columnar"
+    # Keys that hold row lists: paginated ``results`` and inline dataset ``records``.
+    row_keys = ("results", "records")
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = {
+                key: (
+                    rows_to_columns(value)
+                    if key in self.row_keys and isinstance(value, list)
+                    else value
+                )
+                for key, value in data.items()
+            }
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+RECORD_RENDERERS = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
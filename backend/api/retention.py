@@ -0,0 +1,242 @@
+"""Dataset retention: batched pruning by count, age and stored bytes per owner.
+
+Uploads never prune inline; ``manage.py prune_datasets`` applies the policy
+from ``settings.DATASET_RETENTION`` in one pass. It streams dataset metadata
+ordered by owner, deletes expired rows in batches along with any stored
+content no remaining dataset shares, and then sweeps files under
+``datasets/``, ``reports/`` and ``columns/`` that no row references any more.
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Iterable, Iterator, List, Set, Tuple
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .caching import invalidate_datasets, invalidate_history
+from .columns import delete_column_store, stale_column_stores, store_key
+from .models import Dataset, DatasetContent, IngestJob
+from .pdf import REPORT_CACHE_DIR, REPORT_VERSION
+from .services import bump_history_version
+
+logger = logging.getLogger(__name__)
+
+DATASET_FILE_DIR = "datasets"
+DELETE_BATCH_SIZE = 500
+SCAN_CHUNK_SIZE = 2_000
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Per-owner limits; a value of 0 disables that limit."""
+
+    max_datasets: int = 5
+    max_age_days: int = 0
+    max_bytes: int = 0
+    orphan_grace_seconds: int = 3600
+
+    @classmethod
+    def from_settings(cls) -> "RetentionPolicy":
+        config = getattr(settings, "DATASET_RETENTION", {})
+        defaults = cls()
+        return cls(
+            max_datasets=int(config.get("MAX_DATASETS_PER_OWNER", defaults.max_datasets)),
+            max_age_days=int(config.get("MAX_AGE_DAYS", defaults.max_age_days)),
+            max_bytes=int(config.get("MAX_BYTES_PER_OWNER", defaults.max_bytes)),
+            orphan_grace_seconds=int(
+                config.get("ORPHAN_GRACE_SECONDS", defaults.orphan_grace_seconds)
+            ),
+        )
+
+
+@dataclass
+class PruneResult:
+    datasets: int = 0
+    dataset_bytes: int = 0
+    contents: int = 0
+    orphan_files: int = 0
+
+
+def _expired_for_owner(rows: Iterable[Tuple], policy: RetentionPolicy, cutoff) -> List[Tuple]:
+    """Rows, newest first, that fall outside any enabled limit."""
+
+    expired = []
+    kept_bytes = 0
+    for rank, row in enumerate(rows):
+        _owner_id, _pk, uploaded_at, stored_bytes, _content_id = row
+        over_count = policy.max_datasets and rank >= policy.max_datasets
+        too_old = cutoff is not None and uploaded_at < cutoff
+        over_bytes = policy.max_bytes and rank > 0 and kept_bytes + stored_bytes > policy.max_bytes
+        if over_count or too_old or over_bytes:
+            expired.append(row)
+        else:
+            kept_bytes += stored_bytes
+    return expired
+
+
+def _expired_datasets(policy: RetentionPolicy, now: datetime) -> List[Tuple]:
+    cutoff = now - timedelta(days=policy.max_age_days) if policy.max_age_days else None
+    rows = (
+        Dataset.objects.order_by("owner_id", "-uploaded_at")
+        .values_list("owner_id", "id", "uploaded_at", "stored_bytes", "content_id")
+        .iterator(chunk_size=SCAN_CHUNK_SIZE)
+    )
+    expired = []
+    for _owner_id, owner_rows in groupby(rows, key=lambda row: row[0]):
+        expired.extend(_expired_for_owner(owner_rows, policy, cutoff))
+    return expired
+
+
+def release_unused_content(content_ids: Iterable[int]) -> int:
+    """Delete those of ``content_ids`` no dataset uses any more, with their rows and files.
+
+    The rows are locked before they are checked for datasets, so a dedupe
+    upload linking one of them meanwhile either commits first (and the row is
+    kept) or waits and fails on the deleted key. Files are only removed for
+    rows this call actually deleted.
+    """
+
+    with transaction.atomic():
+        locked = set(
+            DatasetContent.objects.select_for_update()
+            .filter(pk__in=list(content_ids))
+            .values_list("pk", flat=True)
+        )
+        in_use = set(
+            Dataset.objects.filter(content_id__in=locked).values_list("content_id", flat=True)
+        )
+        unused = DatasetContent.objects.filter(pk__in=locked - in_use)
+        released = list(unused.values_list("sha256", "pk", "file"))
+        if not released:
+            return 0
+        unused.delete()
+    for sha256, content_id, name in released:
+        delete_column_store(store_key(sha256, content_id))
+        try:
+            default_storage.delete(name)
+        except OSError:
+            # Left for the orphan sweep of a later run.
+            logger.warning("Could not delete stored content %s", name, exc_info=True)
+    return len(released)
+
+
+def _is_stale(name: str, grace_cutoff: datetime) -> bool:
+    try:
+        return default_storage.get_modified_time(name) < grace_cutoff
+    except FileNotFoundError:
+        return False
+
+
+def _walk_files(directory: str) -> Iterator[str]:
+    dirs, files = default_storage.listdir(directory)
+    for file_name in files:
+        yield f"{directory}/{file_name}"
+    for sub_directory in dirs:
+        yield from _walk_files(f"{directory}/{sub_directory}")
+
+
+def _ingest_cutoff(grace_cutoff: datetime) -> datetime:
+    """``grace_cutoff``, moved back to the creation of the oldest unfinished ingest job.
+
+    A running job stores its content CSV and builds its column store before
+    any ``DatasetContent`` row exists, and the job does not record those
+    paths. Anything modified after the oldest queued or running job was
+    created may be one of them, so it waits for a run after the job is done.
+    """
+
+    oldest = IngestJob.objects.filter(
+        status__in=[IngestJob.STATUS_QUEUED, IngestJob.STATUS_RUNNING]
+    ).aggregate(oldest=Min("created_at"))["oldest"]
+    return grace_cutoff if oldest is None else min(grace_cutoff, oldest)
+
+
+def _orphan_files(grace_cutoff: datetime, ingest_cutoff: datetime) -> List[str]:
+    """Stored files no row references, last modified before the cutoffs.
+
+    The grace period protects uploads whose row is not committed yet and PDFs
+    that are still being rendered to a temporary file; uploads also wait for
+    ``ingest_cutoff`` (see ``_ingest_cutoff``).
+    """
+
+    orphans: List[str] = []
+    if default_storage.exists(DATASET_FILE_DIR):
+        referenced: Set[str] = set(DatasetContent.objects.values_list("file", flat=True))
+        orphans.extend(
+            name
+            for name in _walk_files(DATASET_FILE_DIR)
+            if name not in referenced and _is_stale(name, ingest_cutoff)
+        )
+    if default_storage.exists(REPORT_CACHE_DIR):
+        current = {
+            f"{pk}-v{REPORT_VERSION}.pdf" for pk in Dataset.objects.values_list("id", flat=True)
+        }
+        _dirs, files = default_storage.listdir(REPORT_CACHE_DIR)
+        orphans.extend(
+            f"{REPORT_CACHE_DIR}/{file_name}"
+            for file_name in files
+            if file_name not in current
+            and _is_stale(f"{REPORT_CACHE_DIR}/{file_name}", grace_cutoff)
+        )
+    return orphans
+
+
+def prune_datasets(
+    *,
+    policy: RetentionPolicy | None = None,
+    dry_run: bool = False,
+    now: datetime | None = None,
+) -> PruneResult:
+    """Apply ``policy`` to every owner's datasets and sweep orphaned files.
+
+    With ``dry_run`` nothing is deleted; the result reports the datasets and
+    orphaned files that would be (``contents`` stays 0). Column stores count
+    as one orphaned file per directory. Uploaded files and column stores
+    that may belong to a queued or running ingest job are left alone.
+    Cached summaries, stats and history lists of the affected datasets and
+    owners are deleted. Chart payloads are keyed by stored content and simply
+    time out.
+    """
+
+    policy = policy or RetentionPolicy.from_settings()
+    now = now or timezone.now()
+    result = PruneResult()
+
+    expired = _expired_datasets(policy, now)
+    result.datasets = len(expired)
+    result.dataset_bytes = sum(row[3] for row in expired)
+    if not dry_run:
+        for start in range(0, len(expired), DELETE_BATCH_SIZE):
+            batch = expired[start : start + DELETE_BATCH_SIZE]
+            with transaction.atomic():
+                owners = {row[0] for row in batch if row[0] is not None}
+                Dataset.objects.filter(pk__in=[row[1] for row in batch]).delete()
+                invalidate_datasets([row[1] for row in batch])
+                invalidate_history(owners)
+                bump_history_version(owners)
+            result.contents += release_unused_content({row[4] for row in batch})
+            for row in batch:
+                default_storage.delete(f"{REPORT_CACHE_DIR}/{row[1]}-v{REPORT_VERSION}.pdf")
+
+    grace_cutoff = now - timedelta(seconds=policy.orphan_grace_seconds)
+    ingest_cutoff = _ingest_cutoff(grace_cutoff)
+    orphans = _orphan_files(grace_cutoff, ingest_cutoff)
+    stale_columns = stale_column_stores(
+        (store_key(*row) for row in DatasetContent.objects.values_list("sha256", "pk")),
+        ingest_cutoff,
+    )
+    result.orphan_files = len(orphans) + len(stale_columns)
+    if not dry_run:
+        for name in orphans:
+            default_storage.delete(name)
+        for path in stale_columns:
+            shutil.rmtree(path, ignore_errors=True)
+    return result
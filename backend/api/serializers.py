@@ -2,7 +2,8 @@
 
 from rest_framework import serializers
 
-from .models import Dataset
+from .jobs import live_progress
+from .models import Dataset, EquipmentRecord, IngestJob
 
 
 class DatasetSummarySerializer(serializers.ModelSerializer):
@@ -21,20 +22,52 @@ class DatasetSummarySerializer(serializers.ModelSerializer):
             "avg_temperature",
             "type_distribution",
             "metrics",
+            "column_stats",
             "owner_username",
         ]
 
 
 class DatasetDetailSerializer(DatasetSummarySerializer):
-    records = serializers.JSONField()
+    records = serializers.JSONField(read_only=True)
 
     class Meta(DatasetSummarySerializer.Meta):
         fields = DatasetSummarySerializer.Meta.fields + ["records"]
 
 
+class EquipmentRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EquipmentRecord
+        fields = ["position", *EquipmentRecord.RECORD_FIELDS]
+
+
+class IngestJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestJob
+        fields = [
+            "id",
+            "status",
+            "progress",
+            "rows_processed",
+            "error",
+            "dataset",
+            "name",
+            "source_filename",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data.update(live_progress(instance))
+        return data
+
+
 class DatasetUploadSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=255, required=False, allow_blank=True)
     file = serializers.FileField()
+    background = serializers.BooleanField(required=False, default=False)
 
     def validate_file(self, file):
         if not file.name.lower().endswith(".csv"):
@@ -2,115 +2,301 @@
 
 from __future__ import annotations
 
-import io
-import json
+import hashlib
+import os
 from pathlib import Path
-from typing import BinaryIO, Dict, Tuple
-
-import pandas as pd
-from django.core.files.base import ContentFile
-from django.db import transaction
-
-from .models import Dataset
-
-REQUIRED_COLUMNS = {
-    "Equipment Name",
-    "Type",
-    "Flowrate",
-    "Pressure",
-    "Temperature",
-}
-
-COLUMN_RENAMES = {
-    "Equipment Name": "equipment_name",
-    "Type": "equipment_type",
-    "Flowrate": "flowrate",
-    "Pressure": "pressure",
-    "Temperature": "temperature",
-}
-
-def _load_dataframe(file_bytes: bytes) -> pd.DataFrame:
-    buffer = io.BytesIO(file_bytes)
-    df = pd.read_csv(buffer)
-    missing = REQUIRED_COLUMNS.difference(df.columns)
-    if missing:
-        raise ValueError(f"CSV is missing required columns: {', '.join(sorted(missing))}")
-
-    df = df[list(COLUMN_RENAMES.keys())].rename(columns=COLUMN_RENAMES)
-    for column in ("flowrate", "pressure", "temperature"):
-        df[column] = pd.to_numeric(df[column], errors="coerce")
-
-    if df.empty:
+from typing import BinaryIO, Callable
+
+import numpy as np
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from . import parallel_ingest
+from .caching import invalidate_history
+from .columns import BACKFILL_BATCH_ROWS, ColumnWriter, column_store
+from .metrics import (
+    DEFAULT_SAMPLE_SIZE,
+    GROUP_BY_FIELDS,
+    NUMERIC_COLUMNS,
+    MetricsAccumulator,
+    summarize,
+)
+from .models import Dataset, DatasetContent, DatasetOwnerState
+from .parsing import ParsedChunk, _iter_chunks
+
+# Dataset fields filled from ``metrics.summarize`` once the whole file is read.
+SUMMARY_FIELDS = [
+    "total_records",
+    "avg_flowrate",
+    "avg_pressure",
+    "avg_temperature",
+    "type_distribution",
+    "metrics",
+    "column_stats",
+    "group_stats",
+]
+
+ProgressCallback = Callable[[int, int], None]
+
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_PARALLEL_MIN_BYTES = 256 * 1024 * 1024
+DEFAULT_PARALLEL_RANGE_BYTES = 64 * 1024 * 1024
+
+
+def _chunk_rows() -> int:
+    return int(getattr(settings, "DATASET_INGEST_CHUNK_ROWS", DEFAULT_CHUNK_ROWS))
+
+
+def _sample_size() -> int:
+    return int(getattr(settings, "DATASET_METRICS_SAMPLE_SIZE", DEFAULT_SAMPLE_SIZE))
+
+
+def _ingest_processes(content: DatasetContent) -> int:
+    """Worker processes to parse ``content`` with, or 0 to parse it in this process."""
+
+    processes = int(getattr(settings, "DATASET_INGEST_PROCESSES", 0)) or os.cpu_count() or 1
+    min_bytes = getattr(settings, "DATASET_PARALLEL_INGEST_MIN_BYTES", DEFAULT_PARALLEL_MIN_BYTES)
+    if processes < 2 or content.size < int(min_bytes) or not parallel_ingest.SUPPORTED:
+        return 0
+    try:
+        content.file.path
+    except NotImplementedError:  # Remote storage: there is no local file to map.
+        return 0
+    return processes
+
+
+def _parallel_range_bytes() -> int:
+    return int(
+        getattr(settings, "DATASET_PARALLEL_INGEST_RANGE_BYTES", DEFAULT_PARALLEL_RANGE_BYTES)
+    )
+
+
+def _chunk_writer(columns: ColumnWriter):
+    def write(chunk: ParsedChunk, offset: int) -> None:
+        columns.append(chunk)
+
+    return write
+
+
+def _ingest_stream(
+    file_obj: BinaryIO, columns: ColumnWriter, progress: ProgressCallback | None = None
+) -> MetricsAccumulator:
+    """Parse ``file_obj`` chunk by chunk into ``columns``, accumulating metrics."""
+
+    accumulator = MetricsAccumulator(NUMERIC_COLUMNS, sample_size=_sample_size())
+    for chunk in _iter_chunks(file_obj, _chunk_rows()):
+        columns.append(chunk)
+        accumulator.update(chunk.values, chunk.names, chunk.types)
+        if progress:
+            progress(accumulator.count, file_obj.tell())
+
+    if not accumulator.count:
         raise ValueError("CSV must include at least one equipment row.")
+    return accumulator
+
+
+def _ingest_content(
+    content: DatasetContent, progress: ProgressCallback | None
+) -> MetricsAccumulator:
+    """Parse the stored file of ``content``, in worker processes if it is large enough.
+
+    The rows go to the memory-mapped column store, which is moved into place
+    only once the whole file has been read. It is the only copy of the rows
+    besides the file itself; nothing is written to the records table.
+    """
+
+    processes = _ingest_processes(content)
+    if processes:
+        columns = ColumnWriter(content)
+        try:
+            accumulator = parallel_ingest.ingest_parallel(
+                content.file.path,
+                _chunk_writer(columns),
+                processes=processes,
+                range_bytes=_parallel_range_bytes(),
+                chunk_rows=_chunk_rows(),
+                sample_size=_sample_size(),
+                progress=progress,
+            )
+            if not accumulator.count:
+                raise ValueError("CSV must include at least one equipment row.")
+        except parallel_ingest.UnsplittableCSV:
+            # Quoted fields span a range boundary: parse the file in order below.
+            columns.abort()
+        except BaseException:
+            columns.abort()
+            raise
+        else:
+            columns.commit()
+            return accumulator
+
+    columns = ColumnWriter(content)
+    try:
+        with content.file.open("rb") as stored:
+            accumulator = _ingest_stream(stored, columns, progress)
+    except BaseException:
+        columns.abort()
+        raise
+    columns.commit()
+    return accumulator
+
+
+def content_digest(file_obj: BinaryIO) -> str:
+    """SHA-256 of ``file_obj``, read in storage-sized chunks and rewound afterwards.
+
+    Raises ``ValueError`` for a NUL byte: pandas silently cuts a value short at
+    one, and it separates values in shared memory and the column store.
+    """
+
+    digest = hashlib.sha256()
+    for block in File(file_obj).chunks():
+        if b"\0" in block:
+            raise ValueError("CSV must not contain NUL characters.")
+        digest.update(block)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def _store_content(
+    file_obj: BinaryIO, filename: str, sha256: str, progress: ProgressCallback | None
+) -> DatasetContent:
+    """Store new bytes under their content address and parse them once.
+
+    The row is returned unsaved: parsing and the column store (keyed by the
+    hash, so no primary key is needed) run before any transaction starts.
+    """
+
+    content = DatasetContent(sha256=sha256)
+    content.file.save(filename, File(file_obj), save=False)
+    content.size = content.file.size
+    try:
+        accumulator = _ingest_content(content, progress)
+    except Exception:
+        content.file.delete(save=False)
+        raise
+
+    summary = summarize(accumulator)
+    content.summary = {field: summary[field] for field in SUMMARY_FIELDS}
+    return content
+
+
+def _save_content(content: DatasetContent) -> DatasetContent:
+    """Insert a freshly parsed ``content``, or return the row a concurrent upload committed."""
+
+    try:
+        with transaction.atomic():
+            content.save()
+    except IntegrityError:
+        # Same bytes, same column store; only the duplicate file has to go.
+        content.file.delete(save=False)
+        return DatasetContent.objects.get(sha256=content.sha256)
+    return content
+
 
-    if df[["flowrate", "pressure", "temperature"]].isnull().any().any():
-        raise ValueError("Numeric columns contain invalid values. Please clean the CSV.")
-
-    df["flowrate"] = df["flowrate"].round(2)
-    df["pressure"] = df["pressure"].round(2)
-    df["temperature"] = df["temperature"].round(2)
-    return df
-
-
-def _compute_metrics(df: pd.DataFrame) -> Tuple[Dict, Dict]:
-    totals = {
-        "total_records": int(df.shape[0]),
-        "avg_flowrate": round(df["flowrate"].mean(), 2),
-        "avg_pressure": round(df["pressure"].mean(), 2),
-        "avg_temperature": round(df["temperature"].mean(), 2),
-    }
-    raw_distribution = df["equipment_type"].value_counts().sort_index().to_dict()
-    type_distribution = {str(key): int(value) for key, value in raw_distribution.items()}
-
-    def _extreme(column: str, agg_func: str) -> Dict:
-        idx_func = df[column].idxmax if agg_func == "max" else df[column].idxmin
-        idx = idx_func()
-        row = df.loc[idx]
-        return {
-            "equipment_name": row["equipment_name"],
-            "equipment_type": row["equipment_type"],
-            column: float(row[column]),
-        }
-
-    metrics = {
-        "max_flowrate": _extreme("flowrate", "max"),
-        "min_flowrate": _extreme("flowrate", "min"),
-        "max_temperature": _extreme("temperature", "max"),
-    }
-    return totals | {"type_distribution": type_distribution}, metrics
-
-
-@transaction.atomic
 def create_dataset_from_file(
-    *, file_obj: BinaryIO, owner, name: str | None = None
+    *,
+    file_obj: BinaryIO,
+    owner,
+    name: str | None = None,
+    filename: str | None = None,
+    progress: ProgressCallback | None = None,
 ) -> Dataset:
-    """Parse the CSV, persist the dataset, and return the instance."""
+    """Create a dataset for the upload, parsing it only if its bytes are new.
 
-    raw_bytes = file_obj.read()
-    if not raw_bytes:
-        raise ValueError("Uploaded file is empty.")
+    Uploads are hashed first. Bytes seen before reuse the stored file, records
+    and summary of the existing ``DatasetContent``; new bytes are stored once
+    under their hash and streamed into the column store. ``progress`` is
+    called after every chunk with the rows ingested so far and the number of
+    bytes of the stored file consumed.
 
-    df = _load_dataframe(raw_bytes)
-    totals, metrics = _compute_metrics(df)
-    records = json.loads(df.to_json(orient="records"))
+    Hashing and parsing run outside any transaction, so a long ingest never
+    holds SQLite's write lock; only the content, dataset and owner-state rows
+    are written in one short transaction at the end.
+    """
 
-    safe_filename = Path(getattr(file_obj, "name", "uploaded.csv")).name
+    safe_filename = Path(filename or getattr(file_obj, "name", None) or "uploaded.csv").name
     display_name = name or Path(safe_filename).stem.replace("_", " ").title()
 
-    stored_file = ContentFile(raw_bytes)
-    stored_file.name = safe_filename
-
-    dataset = Dataset.objects.create(
-        owner=owner,
-        name=display_name,
-        source_filename=safe_filename,
-        original_file=stored_file,
-        total_records=totals["total_records"],
-        avg_flowrate=totals["avg_flowrate"],
-        avg_pressure=totals["avg_pressure"],
-        avg_temperature=totals["avg_temperature"],
-        type_distribution=totals["type_distribution"],
-        metrics=metrics,
-        records=records,
-    )
+    sha256 = content_digest(file_obj)
+    content = DatasetContent.objects.filter(sha256=sha256).first()
+    if content is None:
+        content = _store_content(file_obj, safe_filename, sha256, progress)
+    elif progress:
+        progress(content.summary.get("total_records", 0), content.size)
+
+    parsed = content if content.pk is None else None
+    try:
+        with transaction.atomic():
+            if parsed is not None:
+                content = _save_content(parsed)
+            dataset = Dataset(
+                owner=owner,
+                name=display_name,
+                source_filename=safe_filename,
+                content=content,
+                stored_bytes=content.size,
+            )
+            for field in SUMMARY_FIELDS:
+                setattr(dataset, field, content.summary[field])
+            dataset.save()
+            if owner is not None:
+                invalidate_history([owner.pk])
+                advance_latest_dataset(dataset)
+    except BaseException:
+        # The content row was rolled back too; its file is ours unless a concurrent
+        # upload's row won, in which case ``_save_content`` already dropped it.
+        if parsed is not None and parsed.file:
+            parsed.file.delete(save=False)
+        raise
     return dataset
+
+
+def advance_latest_dataset(dataset: Dataset) -> None:
+    """Record a new dataset in its owner's ``DatasetOwnerState``.
+
+    The history version is bumped, and the latest pointer moves to ``dataset``
+    unless it already names a newer one.
+    """
+
+    state, created = DatasetOwnerState.objects.get_or_create(
+        owner_id=dataset.owner_id, defaults={"latest_dataset": dataset, "history_version": 1}
+    )
+    if not created:
+        bump_history_version([state.pk])
+        DatasetOwnerState.objects.filter(pk=state.pk).exclude(
+            latest_dataset__uploaded_at__gt=dataset.uploaded_at
+        ).update(latest_dataset=dataset)
+
+
+def bump_history_version(owner_ids) -> None:
+    """Invalidate the history ETags of ``owner_ids`` after datasets were added or removed."""
+
+    DatasetOwnerState.objects.filter(owner_id__in=owner_ids).update(
+        history_version=F("history_version") + 1
+    )
+
+
+def ensure_group_stats(dataset: Dataset) -> dict:
+    """Return ``dataset.group_stats``, computing it once for datasets that predate it."""
+
+    if all(field in dataset.group_stats for field in GROUP_BY_FIELDS):
+        return dataset.group_stats
+
+    store = column_store(dataset.content)
+    accumulator = MetricsAccumulator(NUMERIC_COLUMNS, sample_size=_sample_size())
+    for start in range(0, len(store), BACKFILL_BATCH_ROWS):
+        stop = min(start + BACKFILL_BATCH_ROWS, len(store))
+        names = np.array(store.text("equipment_name", start, stop), dtype=object)
+        types = np.array(store.text("equipment_type", start, stop), dtype=object)
+        values = np.column_stack([store.numeric(column)[start:stop] for column in NUMERIC_COLUMNS])
+        accumulator.update(values, names, types)
+    if accumulator.count:
+        group_stats = summarize(accumulator)["group_stats"]
+    else:
+        group_stats = {field: {} for field in GROUP_BY_FIELDS}
+
+    Dataset.objects.filter(pk=dataset.pk).update(group_stats=group_stats)
+    dataset.group_stats = group_stats
+    return group_stats
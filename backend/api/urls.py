@@ -1,11 +1,24 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+# Under ASGI (API_ASYNC_VIEWS=True) the dataset read endpoints are served by async views.
+read_views = async_views if settings.API_ASYNC_VIEWS else views
 
 urlpatterns = [
+    path("auth/login/", views.AuthLoginView.as_view(), name="auth-login"),
+    path("auth/logout/", views.AuthLogoutView.as_view(), name="auth-logout"),
     path("datasets/upload/", views.DatasetUploadView.as_view(), name="dataset-upload"),
-    path("datasets/latest/", views.LatestDatasetView.as_view(), name="dataset-latest"),
-    path("datasets/history/", views.DatasetHistoryView.as_view(), name="dataset-history"),
-    path("datasets/<uuid:pk>/", views.DatasetDetailView.as_view(), name="dataset-detail"),
-    path("datasets/<uuid:pk>/report/", views.DatasetReportView.as_view(), name="dataset-report"),
+    path("datasets/latest/", read_views.LatestDatasetView.as_view(), name="dataset-latest"),
+    path("datasets/history/", read_views.DatasetHistoryView.as_view(), name="dataset-history"),
+    path("datasets/<uuid:pk>/", read_views.DatasetDetailView.as_view(), name="dataset-detail"),
+    path("datasets/<uuid:pk>/records/", read_views.DatasetRecordsView.as_view(), name="dataset-records"),
+    path("datasets/<uuid:pk>/stats/", views.DatasetStatsView.as_view(), name="dataset-stats"),
+    path("datasets/<uuid:pk>/histogram/", views.DatasetHistogramView.as_view(), name="dataset-histogram"),
+    path("datasets/<uuid:pk>/scatter/", views.DatasetScatterView.as_view(), name="dataset-scatter"),
+    path("datasets/<uuid:pk>/export/", views.DatasetExportView.as_view(), name="dataset-export"),
+    path("datasets/<uuid:pk>/report/", read_views.DatasetReportView.as_view(), name="dataset-report"),
+    path("jobs/<uuid:pk>/", views.IngestJobView.as_view(), name="ingest-job"),
+    path("cache/stats/", views.CacheStatsView.as_view(), name="cache-stats"),
 ]
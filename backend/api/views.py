@@ -1,18 +1,66 @@
-from io import BytesIO
-
-from django.http import FileResponse, Http404
-from rest_framework import generics, parsers, status
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date
+from rest_framework import generics, pagination, parsers, permissions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Dataset
-from .pdf import build_dataset_report
+from .authentication import token_cache
+from .caching import cache_stats, cached_payload, dataset_key, history_key, stats_key
+from .charts import dataset_histogram, dataset_scatter
+from .columns import column_store
+from .conditional import IMMUTABLE, REVALIDATE, conditional_response, dataset_etag, history_etag
+from .export import (
+	CONTENT_TYPES,
+	ExportNegotiation,
+	parse_export_columns,
+	parse_export_format,
+	stream_export,
+)
+from .filters import filter_records, is_truthy
+from .jobs import enqueue_upload
+from .metrics import GROUP_BY_FIELDS
+from .models import Dataset, DatasetOwnerState, IngestJob
+from .pdf import ensure_dataset_report, report_etag
+from .renderers import RECORD_RENDERERS, ColumnarJSONRenderer
 from .serializers import (
 	DatasetDetailSerializer,
 	DatasetSummarySerializer,
 	DatasetUploadSerializer,
+	EquipmentRecordSerializer,
+	IngestJobSerializer,
 )
-from .services import create_dataset_from_file
+from .services import create_dataset_from_file, ensure_group_stats
+
+
+class AuthLoginView(APIView):
+	"""Exchange a username and password for an API token (hashed once, here)."""
+
+	authentication_classes = []
+	permission_classes = [permissions.AllowAny]
+	parser_classes = [parsers.JSONParser, parsers.FormParser, parsers.MultiPartParser]
+
+	def post(self, request, *args, **kwargs):
+		serializer = AuthTokenSerializer(data=request.data, context={"request": request})
+		serializer.is_valid(raise_exception=True)
+		user = serializer.validated_data["user"]
+		token, _ = Token.objects.get_or_create(user=user)
+		return Response({"token": token.key, "username": user.get_username()})
+
+
+class AuthLogoutView(APIView):
+	"""Revoke the token used for this request."""
+
+	def post(self, request, *args, **kwargs):
+		if isinstance(request.auth, Token):
+			token_cache.discard(request.auth.key)
+			request.auth.delete()
+		return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class DatasetUploadView(APIView):
@@ -22,6 +70,18 @@ class DatasetUploadView(APIView):
 		serializer = DatasetUploadSerializer(data=request.data)
 		serializer.is_valid(raise_exception=True)
 
+		if serializer.validated_data["background"]:
+			job = enqueue_upload(
+				file_obj=serializer.validated_data["file"],
+				owner=request.user,
+				name=serializer.validated_data.get("name"),
+			)
+			return Response(
+				IngestJobSerializer(job).data,
+				status=status.HTTP_202_ACCEPTED,
+				headers={"Location": reverse("ingest-job", kwargs={"pk": job.pk})},
+			)
+
 		try:
 			dataset = create_dataset_from_file(
 				file_obj=serializer.validated_data["file"],
@@ -31,48 +91,260 @@ class DatasetUploadView(APIView):
 		except ValueError as exc:
 			return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-		return Response(
-			DatasetDetailSerializer(dataset).data,
-			status=status.HTTP_201_CREATED,
+		# Rows stay out of the response unless asked for; they are paged at .../records/.
+		include_records = is_truthy(request.query_params.get("include_records"), default=False)
+		serializer_class = DatasetDetailSerializer if include_records else DatasetSummarySerializer
+		return Response(serializer_class(dataset).data, status=status.HTTP_201_CREATED)
+
+
+class IncludeRecordsMixin:
+	"""Let clients skip the inline ``records`` array with ``?include_records=false``.
+
+	Responses carry a strong ETag, and ``If-None-Match`` is answered with 304.
+	``?format=columnar`` sends ``records`` as one list per column.
+	"""
+
+	cache_control = REVALIDATE
+	renderer_classes = RECORD_RENDERERS
+
+	def get_serializer_class(self):
+		if is_truthy(self.request.query_params.get("include_records")):
+			return DatasetDetailSerializer
+		return DatasetSummarySerializer
+
+	def retrieve(self, request, *args, **kwargs):
+		dataset = self.get_object()
+		serializer_class = self.get_serializer_class()
+		variant = "records" if serializer_class is DatasetDetailSerializer else "summary"
+		return conditional_response(
+			request,
+			dataset_etag(dataset, f"{variant}.{request.accepted_renderer.format}"),
+			lambda: Response(self.serialize(dataset, serializer_class)),
+			self.cache_control,
 		)
 
+	def serialize(self, dataset, serializer_class):
+		def build():
+			return serializer_class(dataset, context=self.get_serializer_context()).data
+
+		if serializer_class is DatasetDetailSerializer:
+			# Inline records are sliced from the column files; a cached copy would only add size.
+			return build()
+		return cached_payload("summary", dataset_key(dataset.pk, "summary"), build)
 
-class LatestDatasetView(generics.RetrieveAPIView):
-	serializer_class = DatasetDetailSerializer
 
+class LatestDatasetView(IncludeRecordsMixin, generics.RetrieveAPIView):
 	def get_queryset(self):
-		return Dataset.objects.filter(owner=self.request.user)
+		return Dataset.objects.owned_by(self.request.user).summaries()
 
 	def get_object(self):
-		dataset = self.get_queryset().order_by("-uploaded_at").first()
-		if not dataset:
-			raise Http404("No datasets have been uploaded yet.")
+		# Ingest keeps DatasetOwnerState pointing at the newest dataset, so this is a pk join.
+		queryset = self.get_queryset()
+		dataset = queryset.filter(latest_for__owner=self.request.user).first()
+		if dataset is None:
+			# No pointer yet, or its dataset was deleted: find the newest one and repair it.
+			dataset = queryset.order_by("-uploaded_at").first()
+			if not dataset:
+				raise Http404("No datasets have been uploaded yet.")
+			DatasetOwnerState.objects.update_or_create(
+				owner=self.request.user, defaults={"latest_dataset": dataset}
+			)
 		return dataset
 
 
 class DatasetHistoryView(generics.ListAPIView):
 	serializer_class = DatasetSummarySerializer
+	# Older datasets stay reachable by id until ``prune_datasets`` removes them.
+	history_limit = 5
 
 	def get_queryset(self):
-		return Dataset.objects.filter(owner=self.request.user)
+		return (
+			Dataset.objects.owned_by(self.request.user)
+			.summaries()
+			.order_by("-uploaded_at")[: self.history_limit]
+		)
+
+	def list(self, request, *args, **kwargs):
+		version = (
+			DatasetOwnerState.objects.filter(owner=request.user)
+			.values_list("history_version", flat=True)
+			.first()
+		)
+		return conditional_response(
+			request,
+			history_etag(request.user.pk, version or 0, self.history_limit),
+			lambda: Response(
+				cached_payload(
+					"history",
+					history_key(request.user.pk, version or 0),
+					lambda: self.get_serializer(self.get_queryset(), many=True).data,
+				)
+			),
+		)
 
 
-class DatasetDetailView(generics.RetrieveAPIView):
-	serializer_class = DatasetDetailSerializer
+class DatasetDetailView(IncludeRecordsMixin, generics.RetrieveAPIView):
 	lookup_field = "pk"
+	# A dataset id always maps to the same payload, so clients may reuse it without asking.
+	cache_control = IMMUTABLE
 
 	def get_queryset(self):
-		return Dataset.objects.filter(owner=self.request.user)
+		return Dataset.objects.owned_by(self.request.user).summaries()
+
+
+class RecordPagination(pagination.LimitOffsetPagination):
+	default_limit = 100
+	max_limit = 1000
+
+
+class DatasetRecordsView(generics.ListAPIView):
+	"""Paginated rows of one dataset with server-side filtering and ordering."""
+
+	serializer_class = EquipmentRecordSerializer
+	pagination_class = RecordPagination
+	renderer_classes = RECORD_RENDERERS
+
+	def get_dataset(self):
+		return get_object_or_404(
+			Dataset.objects.select_related("content").only("id", "content__sha256"),
+			pk=self.kwargs["pk"],
+			owner=self.request.user,
+		)
+
+	def get_queryset(self):
+		# Filtered and sorted pages are gathered from the mapped column files by index.
+		store = column_store(self.get_dataset().content)
+		return filter_records(store, EquipmentRecordSerializer.Meta.fields, self.request.query_params)
+
+	def list(self, request, *args, **kwargs):
+		columnar = isinstance(request.accepted_renderer, ColumnarJSONRenderer)
+		fields = EquipmentRecordSerializer.Meta.fields
+		rows = self.get_queryset()
+		page = self.paginate_queryset(rows) or []
+		if not columnar:
+			return self.get_paginated_response([dict(zip(fields, row)) for row in page])
+		columns = zip(*page) if page else ([] for _ in fields)
+		return self.get_paginated_response(dict(zip(fields, map(list, columns))))
+
+
+class DatasetStatsView(APIView):
+	"""Per-group aggregates computed at ingest time, e.g. ``?group_by=equipment_type``."""
+
+	def get(self, request, pk):
+		group_by = request.query_params.get("group_by") or GROUP_BY_FIELDS[0]
+		if group_by not in GROUP_BY_FIELDS:
+			raise ValidationError(
+				{"group_by": f"Supported values: {', '.join(GROUP_BY_FIELDS)}."}
+			)
+
+		def build():
+			dataset = get_object_or_404(
+				Dataset.objects.only("id", "owner", "content", "group_stats"),
+				pk=pk,
+				owner=request.user,
+			)
+			groups = ensure_group_stats(dataset).get(group_by, {})
+			payload = {
+				"dataset": dataset.pk,
+				"group_by": group_by,
+				"groups": [{group_by: key, **stats} for key, stats in groups.items()],
+			}
+			return dataset.owner_id, payload
+
+		# The owner is cached with the payload, so a hit needs no query at all.
+		owner_id, payload = cached_payload("stats", stats_key(pk, group_by), build)
+		if owner_id != request.user.pk:
+			raise Http404("No Dataset matches the given query.")
+		return Response(payload)
+
+
+class DatasetChartView(APIView):
+	"""Fixed-size chart payloads built on the server and cached per stored content."""
+
+	build_payload = None
+
+	def get(self, request, pk):
+		dataset = get_object_or_404(
+			Dataset.objects.select_related("content").only("id", "content__sha256"),
+			pk=pk,
+			owner=request.user,
+		)
+		return Response(self.build_payload(dataset, request.query_params))
+
+
+class DatasetHistogramView(DatasetChartView):
+	build_payload = staticmethod(dataset_histogram)
+
+
+class DatasetScatterView(DatasetChartView):
+	build_payload = staticmethod(dataset_scatter)
+
+
+class IngestJobView(generics.RetrieveAPIView):
+	"""Poll the status and progress of a background upload."""
+
+	serializer_class = IngestJobSerializer
+
+	def get_queryset(self):
+		return IngestJob.objects.filter(owner=self.request.user)
+
+
+class CacheStatsView(APIView):
+	"""Hit and miss counts of the payload cache in this worker process (staff only)."""
+
+	permission_classes = [permissions.IsAdminUser]
+
+	def get(self, request):
+		return Response(cache_stats())
+
+
+class DatasetExportView(APIView):
+	"""Stream a dataset as ``?format=csv|ndjson|parquet`` with ``?columns=`` and record filters."""
+
+	content_negotiation_class = ExportNegotiation
+
+	def get(self, request, pk):
+		dataset = get_object_or_404(
+			Dataset.objects.select_related("content").only("id", "content__sha256"),
+			pk=pk,
+			owner=request.user,
+		)
+		export_format = parse_export_format(request.query_params)
+		columns = parse_export_columns(request.query_params)
+		chunks = stream_export(
+			column_store(dataset.content), export_format, columns, request.query_params
+		)
+		response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+		response["Content-Disposition"] = content_disposition_header(
+			True, f"dataset-{dataset.pk}.{export_format}"
+		)
+		patch_cache_control(response, private=True, no_cache=True)
+		return response
 
 
 class DatasetReportView(APIView):
 	def get(self, request, pk):
 		try:
-			dataset = Dataset.objects.get(pk=pk, owner=request.user)
+			dataset = Dataset.objects.summaries().get(pk=pk, owner=request.user)
 		except Dataset.DoesNotExist as exc:
 			raise Http404("Dataset not found") from exc
 
-		pdf_bytes = build_dataset_report(dataset)
-		buffer = BytesIO(pdf_bytes)
+		etag = report_etag(dataset)
+		last_modified = int(dataset.uploaded_at.timestamp())
+		not_modified = get_conditional_response(
+			request, etag=etag, last_modified=last_modified
+		)
+		if not_modified is not None:
+			return not_modified
+
 		filename = f"dataset-report-{dataset.uploaded_at:%Y%m%d%H%M%S}.pdf"
-		return FileResponse(buffer, as_attachment=True, filename=filename)
+		response = FileResponse(
+			ensure_dataset_report(dataset).open("rb"),
+			as_attachment=True,
+			filename=filename,
+			content_type="application/pdf",
+		)
+		response["ETag"] = etag
+		response["Last-Modified"] = http_date(last_modified)
+		patch_cache_control(response, private=True, no_cache=True)
+		return response
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_asgi_application()
+
+from api.jobs import start_job_sweeper  # noqa: E402  (needs the app registry)
+
+# Pick up background uploads a previous worker process left queued or running.
+start_job_sweeper()
+
+if settings.API_ASYNC_VIEWS:
+    # WhiteNoise is WSGI-only and left out of MIDDLEWARE in this profile.
+    application = ASGIStaticFilesHandler(application)
@@ -0,0 +1,54 @@
+"""Build a ``CACHES["default"]`` entry from a ``CACHE_URL`` string.
+
+Supported forms::
+
+    locmem://                   per-process LRU (the default)
+    file:///absolute/directory  shared by every process on one host
+    redis://[:password@]host:6379/0
+    rediss://...                (Redis, or a compatible server, over TLS)
+
+Redis needs the ``redis`` package, which reads connection options such as
+``socket_timeout`` from the URL's query string.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+from urllib.parse import unquote, urlsplit
+
+BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+}
+
+
+def parse_cache_url(url: str, max_entries: int = 300, timeout: int = 300) -> Dict:
+    """Return Django cache settings for ``url``.
+
+    ``max_entries`` bounds the local-memory and file backends. Local memory
+    evicts the least recently used entry once it is full; Redis applies its
+    own ``maxmemory`` policy instead.
+    """
+
+    parts = urlsplit(url)
+    try:
+        backend = BACKENDS[parts.scheme]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported CACHE_URL scheme: {parts.scheme!r}") from exc
+
+    config = {"BACKEND": backend, "TIMEOUT": timeout}
+    if parts.scheme == "locmem":
+        # Entries are kept most recent first; culling max_entries-th of the
+        # cache at a time drops exactly the least recently used one.
+        config["LOCATION"] = parts.netloc or "default"
+        config["OPTIONS"] = {"MAX_ENTRIES": max_entries, "CULL_FREQUENCY": max(max_entries, 1)}
+    elif parts.scheme == "file":
+        if parts.netloc or not parts.path:
+            raise ValueError("CACHE_URL file:// paths must be absolute.")
+        config["LOCATION"] = unquote(parts.path)
+        config["OPTIONS"] = {"MAX_ENTRIES": max_entries}
+    else:
+        config["LOCATION"] = url
+    return config
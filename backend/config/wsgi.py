@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+from api.jobs import start_job_sweeper  # noqa: E402  (needs the app registry)
+
+# Pick up background uploads a previous worker process left queued or running.
+start_job_sweeper()
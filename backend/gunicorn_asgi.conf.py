@@ -0,0 +1,20 @@
+"""Gunicorn settings for the ASGI profile: uvicorn workers serving ``config.asgi``.
+
+    gunicorn -c gunicorn_asgi.conf.py
+
+Each worker runs one event loop, and the dataset read endpoints are async
+views (``API_ASYNC_VIEWS``). A few processes can then hold many slow or
+concurrent dashboard clients without a thread per request.
+"""
+
+import os
+
+os.environ.setdefault("API_ASYNC_VIEWS", "True")
+# Django cannot reuse connections across async requests; pool in the database
+# driver or in front of the database instead.
+os.environ.setdefault("DATABASE_CONN_MAX_AGE", "0")
+
+wsgi_app = "config.asgi:application"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
@@ -3,11 +3,11 @@
 import base64
 import os
 import sys
+import time
 from datetime import datetime
 
-import pandas as pd
 import requests
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import (
     QApplication,
     QFileDialog,
@@ -22,8 +22,8 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QPushButton,
     QScrollArea,
-    QTableWidget,
-    QTableWidgetItem,
+    QComboBox,
+    QTableView,
     QVBoxLayout,
     QWidget,
     QDialog,
@@ -31,11 +31,22 @@ from PyQt5.QtWidgets import (
 )
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from network import ApiClient, TaskRunner
+from records_model import RecordsTableModel
 from styles import DASHBOARD_QSS
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000/api")
 API_USERNAME = os.getenv("API_USERNAME")
 API_PASSWORD = os.getenv("API_PASSWORD")
+API_TOKEN = os.getenv("API_TOKEN")
+JOB_POLL_INTERVAL_MS = 1000
+# Failed polls back off up to this interval; polling gives up after this many
+# failures in a row, or once the job has been watched for JOB_POLL_TIMEOUT_S.
+JOB_POLL_MAX_INTERVAL_MS = 15000
+JOB_POLL_MAX_ERRORS = 6
+JOB_POLL_TIMEOUT_S = 30 * 60
+HISTOGRAM_COLUMN = "flowrate"
+HISTOGRAM_BINS = 20
 
 
 class CredentialDialog(QDialog):
@@ -61,20 +72,36 @@ class CredentialDialog(QDialog):
 
 
 def build_auth_headers(parent=None):
-    global API_USERNAME, API_PASSWORD
+    """Token header for API calls; credentials are exchanged for a token once per session."""
+    global API_USERNAME, API_PASSWORD, API_TOKEN
+    if API_TOKEN:
+        return {"Authorization": f"Token {API_TOKEN}"}
     if not API_USERNAME or not API_PASSWORD:
         dialog = CredentialDialog(parent)
         if dialog.exec_() == QDialog.Accepted:
             username, password = dialog.get_credentials()
             if not username or not password:
-                raise RuntimeError("Username and password are required for Basic Auth.")
+                raise RuntimeError("Username and password are required to sign in.")
             API_USERNAME, API_PASSWORD = username, password
         else:
             raise RuntimeError(
                 "Set API_USERNAME and API_PASSWORD env vars or provide them when prompted."
             )
-    token = base64.b64encode(f"{API_USERNAME}:{API_PASSWORD}".encode()).decode()
-    return {"Authorization": f"Basic {token}"}
+    response = requests.post(
+        f"{API_BASE_URL}/auth/login/",
+        json={"username": API_USERNAME, "password": API_PASSWORD},
+        timeout=15,
+    )
+    if response.status_code == 404:
+        # Older backends without token login: fall back to Basic auth.
+        token = base64.b64encode(f"{API_USERNAME}:{API_PASSWORD}".encode()).decode()
+        return {"Authorization": f"Basic {token}"}
+    if response.status_code == 400:
+        API_USERNAME = API_PASSWORD = None
+        raise RuntimeError("Invalid username or password.")
+    response.raise_for_status()
+    API_TOKEN = response.json()["token"]
+    return {"Authorization": f"Token {API_TOKEN}"}
 
 
 class DistributionCanvas(FigureCanvas):
@@ -108,13 +135,48 @@ class DistributionCanvas(FigureCanvas):
         self.draw_idle()
 
 
+class HistogramCanvas(FigureCanvas):
+    """Draws pre-binned histogram payloads from the API's ``/histogram/`` endpoint."""
+
+    def __init__(self):
+        self.figure = Figure(figsize=(5, 3), facecolor="none")
+        super().__init__(self.figure)
+        self.axes = self.figure.add_subplot(111)
+
+    def update_histogram(self, histogram: dict):
+        self.axes.clear()
+        self.axes.set_facecolor("#ffffff")
+        if not histogram or not histogram.get("counts"):
+            self.axes.text(0.5, 0.5, "No data", ha="center", va="center", color="#64748b", fontsize=12)
+        else:
+            edges = histogram["edges"]
+            widths = [right - left for left, right in zip(edges, edges[1:])]
+            self.axes.bar(edges[:-1], histogram["counts"], width=widths, align="edge", color="#0ea5e9", edgecolor="#ffffff")
+            self.axes.set_xlabel(histogram["column"].title(), fontsize=11, color="#64748b", fontweight="600")
+            self.axes.set_ylabel("Rows", fontsize=11, color="#64748b", fontweight="600")
+            self.axes.tick_params(labelsize=10, colors="#475569")
+            self.axes.grid(axis="y", alpha=0.2, linestyle="--", linewidth=0.8, color="#cbd5e1")
+        for spine in self.axes.spines.values():
+            spine.set_color("#e2e8f0")
+        self.figure.tight_layout()
+        self.draw_idle()
+
+
 class DatasetDashboard(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Chemical Equipment Parameter Visualizer")
         self.resize(1200, 780)
         self.latest_dataset = None
+        self.latest_histogram = None
         self.history = []
+        self.api = ApiClient(API_BASE_URL)
+        self.tasks = TaskRunner()
+        self._refreshing = False
+        self._job_timer = None
+        self._job_poll_pending = False
+        self._job_poll_errors = 0
+        self._job_deadline = 0.0
         self._build_ui()
         self.refresh_dashboard()
 
@@ -134,6 +196,7 @@ class DatasetDashboard(QMainWindow):
         layout.addWidget(self._build_upload_card())
         layout.addWidget(self._build_summary_card())
         layout.addWidget(self._build_chart_card())
+        layout.addWidget(self._build_histogram_card())
         layout.addWidget(self._build_records_card())
         layout.addWidget(self._build_history_card())
         layout.addStretch()
@@ -197,8 +260,8 @@ class DatasetDashboard(QMainWindow):
         browse_button = QPushButton("Browse…")
         browse_button.setProperty("variant", "ghost")
         browse_button.clicked.connect(self._pick_file)
-        upload_button = QPushButton("Upload")
-        upload_button.clicked.connect(self._upload_file)
+        self.upload_button = QPushButton("Upload")
+        self.upload_button.clicked.connect(self._upload_file)
 
         form.addWidget(QLabel("Dataset Name"), 0, 0)
         form.addWidget(self.name_input, 0, 1, 1, 3)
@@ -206,9 +269,13 @@ class DatasetDashboard(QMainWindow):
         form.addWidget(self.file_input, 1, 1, 1, 2)
         form.addWidget(browse_button, 1, 3)
         
+        self.upload_status = QLabel("")
+        self.upload_status.setObjectName("SectionSubtitle")
+
         button_row = QHBoxLayout()
+        button_row.addWidget(self.upload_status)
         button_row.addStretch()
-        button_row.addWidget(upload_button)
+        button_row.addWidget(self.upload_button)
         
         layout.addLayout(form)
         layout.addLayout(button_row)
@@ -266,23 +333,61 @@ class DatasetDashboard(QMainWindow):
         vbox.addWidget(self.chart)
         return frame
 
-    def _build_records_card(self):
+    def _build_histogram_card(self):
         frame = self._styled_card()
         vbox = QVBoxLayout(frame)
         vbox.setContentsMargins(0, 0, 0, 0)
         vbox.setSpacing(12)
-        header = QLabel("Detailed Records (first 100)")
+        header = QLabel(f"{HISTOGRAM_COLUMN.title()} Distribution")
         header.setObjectName("SectionTitle")
         vbox.addWidget(header)
-        self.records_table = QTableWidget()
+        self.histogram_chart = HistogramCanvas()
+        self.histogram_chart.setMinimumHeight(260)
+        vbox.addWidget(self.histogram_chart)
+        return frame
+
+    def _build_records_card(self):
+        frame = self._styled_card()
+        vbox = QVBoxLayout(frame)
+        vbox.setContentsMargins(0, 0, 0, 0)
+        vbox.setSpacing(12)
+        header_row = QHBoxLayout()
+        header = QLabel("Detailed Records")
+        header.setObjectName("SectionTitle")
+        self.records_count = QLabel("")
+        self.records_count.setObjectName("SectionSubtitle")
+        self.type_filter = QComboBox()
+        self.type_filter.addItem("All types", "")
+        self.type_filter.currentIndexChanged.connect(self._apply_record_filter)
+        header_row.addWidget(header)
+        header_row.addStretch(1)
+        header_row.addWidget(self.records_count)
+        header_row.addSpacing(8)
+        header_row.addWidget(self.type_filter)
+        vbox.addLayout(header_row)
+
+        # Rows are paged in from the API as the view scrolls; sorting is done server-side.
+        self.records_model = RecordsTableModel(self.api, self.tasks, self)
+        self.records_model.countChanged.connect(
+            lambda loaded, total: self.records_count.setText(f"{loaded:,} of {total:,} rows loaded")
+        )
+        self.records_model.loadFailed.connect(
+            lambda message: QMessageBox.critical(self, "Error", f"Failed to load records: {message}")
+        )
+        self.records_table = QTableView()
+        self.records_table.setModel(self.records_model)
         self.records_table.setAlternatingRowColors(True)
-        self.records_table.setColumnCount(0)
-        self.records_table.setRowCount(0)
-        self.records_table.setMinimumHeight(240)
+        self.records_table.setSortingEnabled(True)
+        self.records_table.horizontalHeader().setSortIndicatorShown(False)
+        self.records_table.horizontalHeader().setStretchLastSection(True)
+        self.records_table.setMinimumHeight(320)
         self.records_table.verticalHeader().setDefaultSectionSize(32)
         vbox.addWidget(self.records_table)
         return frame
 
+    def _apply_record_filter(self):
+        self.records_model.set_filters(equipment_type=self.type_filter.currentData())
+
     def _build_history_card(self):
         frame = self._styled_card()
         vbox = QVBoxLayout(frame)
@@ -299,6 +404,10 @@ class DatasetDashboard(QMainWindow):
         self.refresh_button.clicked.connect(self.refresh_dashboard)
         self.report_button = QPushButton("Download PDF")
         self.report_button.clicked.connect(self.download_selected_report)
+        self.report_status = QLabel("")
+        self.report_status.setObjectName("SectionSubtitle")
+        header_row.addWidget(self.report_status)
+        header_row.addSpacing(8)
         header_row.addWidget(self.refresh_button)
         header_row.addSpacing(8)
         header_row.addWidget(self.report_button)
@@ -335,71 +444,156 @@ class DatasetDashboard(QMainWindow):
         if file_path:
             self.file_input.setText(file_path)
 
+    def _ensure_auth(self):
+        """Attach the API token to the shared session; prompts for credentials once."""
+        try:
+            self.api.set_auth_headers(build_auth_headers(self))
+        except (RuntimeError, requests.RequestException) as exc:
+            QMessageBox.critical(self, "Auth Missing", str(exc))
+            return False
+        return True
+
     def _upload_file(self):
         file_path = self.file_input.text().strip()
         if not file_path:
             QMessageBox.warning(self, "Missing File", "Please choose a CSV file.")
             return
-        try:
-            headers = build_auth_headers(self)
-            with open(file_path, "rb") as file_handle:
-                files = {"file": file_handle}
-                data = {}
-                if self.name_input.text().strip():
-                    data["name"] = self.name_input.text().strip()
-                response = requests.post(
-                    f"{API_BASE_URL}/datasets/upload/",
-                    headers=headers,
-                    files=files,
-                    data=data,
-                    timeout=20,
-                )
-                response.raise_for_status()
+        if not self._ensure_auth():
+            return
+        fields = {"background": "true"}
+        if self.name_input.text().strip():
+            fields["name"] = self.name_input.text().strip()
+
+        self.upload_button.setEnabled(False)
+        self.upload_status.setText("Uploading… 0%")
+        self.tasks.submit(
+            lambda progress: self.api.upload("datasets/upload/", file_path, fields, progress=progress),
+            on_done=lambda job: self._start_job_polling(job["id"]),
+            on_error=self._upload_failed,
+            on_progress=lambda sent, total: self.upload_status.setText(
+                f"Uploading… {sent * 100 // max(total, 1)}%"
+            ),
+        )
+
+    def _upload_failed(self, message):
+        if self._job_timer:
+            self._job_timer.stop()
+        self.upload_button.setEnabled(True)
+        self.upload_status.setText("")
+        QMessageBox.critical(self, "Upload Failed", message)
+
+    def _start_job_polling(self, job_id):
+        """Poll the background ingest job without blocking the event loop."""
+        self.upload_status.setText("Upload queued…")
+        self._job_poll_pending = False
+        self._job_poll_errors = 0
+        self._job_deadline = time.monotonic() + JOB_POLL_TIMEOUT_S
+        self._job_timer = QTimer(self)
+        self._job_timer.setInterval(JOB_POLL_INTERVAL_MS)
+        self._job_timer.timeout.connect(lambda: self._poll_job(job_id))
+        self._job_timer.start()
+
+    def _poll_job(self, job_id):
+        if self._job_poll_pending:
+            return
+        if time.monotonic() > self._job_deadline:
+            self._stop_job_polling("The upload is still processing on the server.")
+            return
+        self._job_poll_pending = True
+        self.tasks.submit(
+            lambda _progress: self.api.get_json(f"jobs/{job_id}/", timeout=10),
+            on_done=self._handle_job_status,
+            on_error=self._job_poll_failed,
+        )
+
+    def _job_poll_failed(self, message):
+        """A failed poll says nothing about the job: back off and ask again."""
+        self._job_poll_pending = False
+        if not self._job_timer.isActive():
+            return
+        self._job_poll_errors += 1
+        if self._job_poll_errors >= JOB_POLL_MAX_ERRORS:
+            self._stop_job_polling(f"Lost contact with the server ({message}).")
+            return
+        interval = JOB_POLL_INTERVAL_MS * 2**self._job_poll_errors
+        self._job_timer.setInterval(min(interval, JOB_POLL_MAX_INTERVAL_MS))
+        self.upload_status.setText(f"Reconnecting… (attempt {self._job_poll_errors + 1})")
+
+    def _stop_job_polling(self, reason):
+        self._job_timer.stop()
+        self.upload_button.setEnabled(True)
+        self.upload_status.setText("")
+        QMessageBox.warning(
+            self,
+            "Upload Status Unknown",
+            f"{reason} It may still finish; refresh the dashboard later to check.",
+        )
+
+    def _handle_job_status(self, job):
+        self._job_poll_pending = False
+        if not self._job_timer.isActive():
+            return
+        self._job_poll_errors = 0
+        self._job_timer.setInterval(JOB_POLL_INTERVAL_MS)
+        self.upload_status.setText(f"Processing ({job['status']})… {job['progress']}%")
+        if job["status"] == "succeeded":
+            self._job_timer.stop()
+            self.upload_button.setEnabled(True)
+            self.upload_status.setText("")
             QMessageBox.information(self, "Success", "Upload completed!")
             self.refresh_dashboard()
-        except Exception as exc:
-            QMessageBox.critical(self, "Upload Failed", str(exc))
+        elif job["status"] == "failed":
+            self._upload_failed(job.get("error") or "Processing failed.")
 
     def refresh_dashboard(self):
-        try:
-            headers = build_auth_headers(self)
-        except RuntimeError as exc:
-            QMessageBox.critical(self, "Auth Missing", str(exc))
+        if self._refreshing or not self._ensure_auth():
             return
+        self._refreshing = True
+        self.refresh_button.setEnabled(False)
+        # Latest (plus its rows and histogram) and history load concurrently.
+        self.tasks.gather(
+            {"latest": self._fetch_latest_bundle, "history": self._fetch_history},
+            on_done=self._apply_refresh,
+            on_error=self._refresh_failed,
+        )
 
-        try:
-            latest = requests.get(
-                f"{API_BASE_URL}/datasets/latest/", headers=headers, timeout=15
-            )
-            if latest.status_code == 404:
-                self.latest_dataset = None
-            else:
-                latest.raise_for_status()
-                self.latest_dataset = latest.json()
-        except Exception as exc:
-            QMessageBox.critical(self, "Error", f"Failed to load latest dataset: {exc}")
-            return
+    def _fetch_latest_bundle(self):
+        latest = self.api.get_json(
+            "datasets/latest/", params={"include_records": "false"}, allow_404=True
+        )
+        if latest is None:
+            return None, None
+        histogram = self.api.get_json(
+            f"datasets/{latest['id']}/histogram/",
+            params={"column": HISTOGRAM_COLUMN, "bins": HISTOGRAM_BINS},
+        )
+        return latest, histogram
 
-        try:
-            history = requests.get(
-                f"{API_BASE_URL}/datasets/history/", headers=headers, timeout=15
-            )
-            history.raise_for_status()
-            self.history = history.json()
-        except Exception as exc:
-            QMessageBox.critical(self, "Error", f"Failed to load history: {exc}")
-            return
+    def _fetch_history(self):
+        return self.api.get_json("datasets/history/")
 
+    def _apply_refresh(self, results):
+        self._refreshing = False
+        self.refresh_button.setEnabled(True)
+        self.latest_dataset, self.latest_histogram = results["latest"]
+        self.history = results["history"]
         self._render_latest_dataset()
         self._render_history()
 
+    def _refresh_failed(self, message):
+        self._refreshing = False
+        self.refresh_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to load dashboard data: {message}")
+
     def _render_latest_dataset(self):
         if not self.latest_dataset:
             for label in self.summary_labels.values():
                 label.setText("-")
-            self.records_table.setRowCount(0)
-            self.records_table.setColumnCount(0)
+            self._reset_type_filter({})
+            self.records_model.set_dataset(None)
+            self.records_count.setText("")
             self.chart.update_chart({})
+            self.histogram_chart.update_histogram(None)
             return
 
         ds = self.latest_dataset
@@ -410,19 +604,19 @@ class DatasetDashboard(QMainWindow):
         uploaded = datetime.fromisoformat(ds["uploaded_at"].replace("Z", "+00:00"))
         self.summary_labels["uploaded"].setText(uploaded.strftime("%d %b %Y %H:%M"))
 
-        records = pd.DataFrame(ds["records"])
-        self.records_table.setRowCount(min(len(records), 100))
-        self.records_table.setColumnCount(len(records.columns))
-        self.records_table.setHorizontalHeaderLabels(records.columns)
-        for row_index in range(min(len(records), 100)):
-            for col_index, column in enumerate(records.columns):
-                value = str(records.iloc[row_index][column])
-                self.records_table.setItem(
-                    row_index, col_index, QTableWidgetItem(value)
-                )
-        self.records_table.resizeColumnsToContents()
+        self._reset_type_filter(ds.get("type_distribution", {}))
+        self.records_model.set_dataset(ds["id"])
 
         self.chart.update_chart(ds.get("type_distribution", {}))
+        self.histogram_chart.update_histogram(self.latest_histogram)
+
+    def _reset_type_filter(self, distribution):
+        self.type_filter.blockSignals(True)
+        self.type_filter.clear()
+        self.type_filter.addItem("All types", "")
+        for equipment_type in distribution:
+            self.type_filter.addItem(equipment_type, equipment_type)
+        self.type_filter.blockSignals(False)
 
     def _render_history(self):
         self.history_list.clear()
@@ -454,27 +648,47 @@ class DatasetDashboard(QMainWindow):
             QMessageBox.warning(self, "Select Dataset", "Choose a dataset first.")
             return
         dataset = selected.data(Qt.UserRole)
-        try:
-            headers = build_auth_headers(self)
-            response = requests.get(
-                f"{API_BASE_URL}/datasets/{dataset['id']}/report/",
-                headers=headers,
-                timeout=30,
-            )
-            response.raise_for_status()
-            save_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Save PDF Report",
-                f"{dataset['name']}.pdf",
-                filter="PDF Files (*.pdf)",
-            )
-            if save_path:
-                with open(save_path, "wb") as file_handle:
-                    file_handle.write(response.content)
-                QMessageBox.information(self, "Saved", "Report downloaded successfully.")
-        except Exception as exc:
-            QMessageBox.critical(self, "Download Failed", str(exc))
+        save_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save PDF Report",
+            f"{dataset['name']}.pdf",
+            filter="PDF Files (*.pdf)",
+        )
+        if not save_path or not self._ensure_auth():
+            return
+
+        self.report_button.setEnabled(False)
+        self.report_status.setText("Downloading…")
+        self.tasks.submit(
+            lambda progress: self.api.download(
+                f"datasets/{dataset['id']}/report/", save_path, progress=progress
+            ),
+            on_done=self._report_saved,
+            on_error=self._report_failed,
+            on_progress=self._report_progress,
+        )
 
+    def _report_progress(self, received, total):
+        if total:
+            self.report_status.setText(f"Downloading… {received * 100 // total}%")
+        else:
+            self.report_status.setText(f"Downloading… {received // 1024} KB")
+
+    def _report_saved(self, _path):
+        self.report_button.setEnabled(True)
+        self.report_status.setText("")
+        QMessageBox.information(self, "Saved", "Report downloaded successfully.")
+
+    def _report_failed(self, message):
+        self.report_button.setEnabled(True)
+        self.report_status.setText("")
+        QMessageBox.critical(self, "Download Failed", message)
+
+    def closeEvent(self, event):
+        if self._job_timer:
+            self._job_timer.stop()
+        self.tasks.wait(2000)
+        super().closeEvent(event)
 
 def main():
     app = QApplication(sys.argv)
@@ -0,0 +1,236 @@
+"""Background HTTP for the desktop client.
+
+All requests go through one pooled ``requests.Session`` (keep-alive, shared
+connection pool) and run on a ``QThreadPool`` so the GUI thread never waits on
+the network. Results, errors and progress come back as Qt signals, which Qt
+delivers on the GUI thread.
+"""
+
+import io
+import os
+import threading
+import uuid
+
+import requests
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 4
+TRANSFER_CHUNK_BYTES = 64 * 1024
+
+
+class ApiClient:
+    """Thin wrapper over a keep-alive session rooted at ``base_url``."""
+
+    def __init__(self, base_url: str, pool_size: int = POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # (path, params) -> (ETag, decoded body); revalidated with If-None-Match.
+        self._etag_cache = {}
+        self._etag_lock = threading.Lock()
+
+    def set_auth_headers(self, headers: dict):
+        """Apply ``headers``; cached bodies are dropped only when the credentials change.
+
+        The dashboard re-applies the same token before every refresh, so
+        clearing unconditionally would mean ``If-None-Match`` is never sent.
+        """
+        if headers.get("Authorization") != self.session.headers.get("Authorization"):
+            with self._etag_lock:
+                self._etag_cache.clear()
+        self.session.headers.update(headers)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.session.get(self.url(path), **kwargs)
+
+    def get_json(self, path: str, params=None, timeout=15, allow_404=False):
+        """GET ``path`` as JSON, reusing the cached body when the server answers 304."""
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._etag_lock:
+            cached = self._etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = self.get(path, params=params, timeout=timeout, headers=headers)
+        if cached and response.status_code == 304:
+            return cached[1]
+        if allow_404 and response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[key] = (etag, data)
+        return data
+
+    def upload(self, path: str, file_path: str, fields: dict, progress=None, timeout=60):
+        """POST ``file_path`` as multipart ``file`` while reporting bytes sent."""
+        with MultipartFileBody(file_path, fields, progress) as body:
+            response = self.session.post(
+                self.url(path),
+                data=body,
+                headers={"Content-Type": body.content_type},
+                timeout=timeout,
+            )
+        response.raise_for_status()
+        return response.json()
+
+    def download(self, path: str, destination: str, progress=None, timeout=60):
+        """Stream a response body into ``destination`` while reporting bytes received."""
+        with self.get(path, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            total = int(response.headers.get("Content-Length") or 0)
+            received = 0
+            with open(destination, "wb") as file_handle:
+                for chunk in response.iter_content(TRANSFER_CHUNK_BYTES):
+                    file_handle.write(chunk)
+                    received += len(chunk)
+                    if progress:
+                        progress(received, total)
+        return destination
+
+
+class MultipartFileBody:
+    """File-like multipart/form-data body read straight from disk.
+
+    ``requests`` sends objects with ``read()`` and ``__len__`` in blocks with a
+    ``Content-Length`` header, so the CSV is never loaded into memory and each
+    block read doubles as an upload progress tick.
+    """
+
+    def __init__(self, file_path: str, fields: dict, progress=None):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._progress = progress
+        self._file = open(file_path, "rb")
+
+        prelude = io.BytesIO()
+        for name, value in fields.items():
+            prelude.write(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            )
+        filename = os.path.basename(file_path).replace('"', "")
+        prelude.write(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: text/csv\r\n\r\n".encode()
+        )
+        self._parts = [
+            io.BytesIO(prelude.getvalue()),
+            self._file,
+            io.BytesIO(f"\r\n--{boundary}--\r\n".encode()),
+        ]
+        self._length = (
+            len(self._parts[0].getvalue()) + os.path.getsize(file_path) + len(self._parts[2].getvalue())
+        )
+        self._sent = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._length
+        chunks = []
+        while self._parts and size > 0:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            size -= len(chunk)
+        data = b"".join(chunks)
+        self._sent += len(data)
+        if self._progress and data:
+            self._progress(self._sent, self._length)
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+
+
+class Task(QRunnable):
+    """Runs ``func(progress)`` on the pool; ``progress(done, total)`` emits a signal."""
+
+    def __init__(self, func):
+        super().__init__()
+        self.func = func
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.func(self.signals.progress.emit)
+        except Exception as exc:  # surfaced to the GUI as a message
+            self.signals.failed.emit(str(exc) or exc.__class__.__name__)
+        else:
+            self.signals.finished.emit(result)
+
+
+class TaskRunner:
+    """Submits work to a shared ``QThreadPool`` and wires its signals to callbacks."""
+
+    def __init__(self, max_threads: int = POOL_SIZE):
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._active = set()
+
+    def submit(self, func, on_done=None, on_error=None, on_progress=None) -> Task:
+        task = Task(func)
+        # Keep the task (and its signals object) alive until it reports back.
+        self._active.add(task)
+        task.signals.finished.connect(lambda _result: self._active.discard(task))
+        task.signals.failed.connect(lambda _message: self._active.discard(task))
+        if on_done:
+            task.signals.finished.connect(on_done)
+        if on_error:
+            task.signals.failed.connect(on_error)
+        if on_progress:
+            task.signals.progress.connect(on_progress)
+        self.pool.start(task)
+        return task
+
+    def gather(self, funcs: dict, on_done, on_error=None):
+        """Run every ``name -> func`` concurrently; ``on_done`` gets a dict of all results.
+
+        ``on_error`` is called once, with the first failure, and ``on_done`` is skipped.
+        """
+        results = {}
+        state = {"failed": False}
+
+        def finish(name, result):
+            results[name] = result
+            if len(results) == len(funcs) and not state["failed"]:
+                on_done(results)
+
+        def fail(message):
+            if not state["failed"]:
+                state["failed"] = True
+                if on_error:
+                    on_error(message)
+
+        for name, func in funcs.items():
+            self.submit(
+                lambda _progress, func=func: func(),
+                on_done=lambda result, name=name: finish(name, result),
+                on_error=fail,
+            )
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
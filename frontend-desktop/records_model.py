@@ -0,0 +1,180 @@
+"""Virtualised records table: a Qt model over NumPy columns, paged from the API.
+
+Rows are fetched ``PAGE_SIZE`` at a time as the view scrolls (``canFetchMore``
+/ ``fetchMore``). Sorting and filtering are delegated to the records endpoint,
+so the model only ever holds the rows the user has scrolled past. Pages are
+requested in the columnar format and copied into the arrays column by column,
+without building a dict per row.
+"""
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+PAGE_SIZE = 500
+TEXT_COLUMNS = ("equipment_name", "equipment_type")
+NUMERIC_COLUMNS = ("flowrate", "pressure", "temperature")
+COLUMNS = TEXT_COLUMNS + NUMERIC_COLUMNS
+
+
+class ColumnStore:
+    """Append-only column arrays that grow geometrically, so paging stays O(rows)."""
+
+    def __init__(self):
+        self.size = 0
+        self._capacity = 0
+        self.columns = self._allocate(0)
+
+    @staticmethod
+    def _allocate(capacity):
+        arrays = {column: np.empty(capacity, dtype=object) for column in TEXT_COLUMNS}
+        arrays.update({column: np.empty(capacity, dtype=np.float64) for column in NUMERIC_COLUMNS})
+        return arrays
+
+    def append(self, columns, count):
+        """Append ``count`` rows given as ``{column: [values, ...]}``."""
+        needed = self.size + count
+        if needed > self._capacity:
+            capacity = max(needed, self._capacity * 2, PAGE_SIZE)
+            grown = self._allocate(capacity)
+            for column, values in self.columns.items():
+                grown[column][: self.size] = values[: self.size]
+            self.columns, self._capacity = grown, capacity
+        for column in COLUMNS:
+            # NumPy stores a missing numeric value (None) as NaN.
+            self.columns[column][self.size : needed] = columns[column]
+        self.size = needed
+
+    def value(self, row, column):
+        return self.columns[column][row]
+
+
+class RecordsTableModel(QAbstractTableModel):
+    """Rows of one dataset, loaded on demand from ``/datasets/<id>/records/``."""
+
+    loadFailed = pyqtSignal(str)
+    countChanged = pyqtSignal(int, int)
+
+    def __init__(self, api, tasks, parent=None):
+        super().__init__(parent)
+        self.api = api
+        self.tasks = tasks
+        self.dataset_id = None
+        self.total = 0
+        self.ordering = ""
+        self.filters = {}
+        self._store = ColumnStore()
+        self._fetching = False
+        # Set when a page comes back empty or fails, so Qt stops asking for more.
+        self._exhausted = False
+        # Bumped on every reset so pages requested for an old query are dropped.
+        self._generation = 0
+
+    # Qt model interface -------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._store.size
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = COLUMNS[index.column()]
+        if role == Qt.DisplayRole:
+            value = self._store.value(index.row(), column)
+            if column in NUMERIC_COLUMNS:
+                return "" if np.isnan(value) else f"{value:.2f}"
+            return "" if value is None else str(value)
+        if role == Qt.TextAlignmentRole and column in NUMERIC_COLUMNS:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section].replace("_", " ").title()
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.dataset_id is None:
+            return False
+        return not (self._fetching or self._exhausted) and self._store.size < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._request_page()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        prefix = "-" if order == Qt.DescendingOrder else ""
+        self.ordering = f"{prefix}{COLUMNS[column]}"
+        self.reload()
+
+    # Query state ----------------------------------------------------------
+
+    def set_dataset(self, dataset_id):
+        """Show another dataset, starting unfiltered but keeping the sort order."""
+        self.dataset_id = dataset_id
+        self.filters = {}
+        self.reload()
+
+    def set_filters(self, **filters):
+        """Server-side filters, e.g. ``equipment_type="Pump"`` or ``min_flowrate=100``."""
+        self.filters = {key: value for key, value in filters.items() if value not in (None, "")}
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self._generation += 1
+        self._store = ColumnStore()
+        self.total = 0
+        self._fetching = False
+        self._exhausted = False
+        self.endResetModel()
+        if self.dataset_id is not None:
+            self._request_page()
+
+    def _request_page(self):
+        self._fetching = True
+        generation = self._generation
+        params = {
+            "format": "columnar",
+            "limit": PAGE_SIZE,
+            "offset": self._store.size,
+            **self.filters,
+        }
+        if self.ordering:
+            params["ordering"] = self.ordering
+        path = f"datasets/{self.dataset_id}/records/"
+        self.tasks.submit(
+            lambda _progress: self.api.get_json(path, params=params),
+            on_done=lambda page: self._append_page(generation, page),
+            on_error=lambda message: self._page_failed(generation, message),
+        )
+
+    def _append_page(self, generation, page):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        self.total = page["count"]
+        columns = page["results"]
+        count = len(columns[COLUMNS[0]])
+        if count:
+            first = self._store.size
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+            self._store.append(columns, count)
+            self.endInsertRows()
+        else:
+            # The rows shrank since the count was taken; asking again would loop forever.
+            self.total = self._store.size
+            self._exhausted = True
+        self.countChanged.emit(self._store.size, self.total)
+
+    def _page_failed(self, generation, message):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        # Qt would retry at once and forever; reload() (sort, filter, refresh) tries again.
+        self._exhausted = True
+        self.loadFailed.emit(message)
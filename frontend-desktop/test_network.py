@@ -0,0 +1,67 @@
+"""Tests for the desktop HTTP client; run with ``python -m unittest`` from this directory."""
+
+import json
+import unittest
+
+import requests
+from requests.adapters import BaseAdapter
+
+from network import ApiClient
+
+
+class RecordingAdapter(BaseAdapter):
+    """Answers every request with one JSON body and ETag, honouring If-None-Match."""
+
+    etag = '"history-1-1-5-v1"'
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.headers["ETag"] = self.etag
+        if request.headers.get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.headers["Content-Type"] = "application/json"
+            response._content = json.dumps([{"name": "Dataset"}]).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class ApiClientTests(unittest.TestCase):
+    def setUp(self):
+        self.api = ApiClient("http://testserver/api")
+        self.adapter = RecordingAdapter()
+        self.api.session.mount("http://", self.adapter)
+
+    def refresh(self, token="abc"):
+        # DatasetDashboard._ensure_auth re-applies the headers before every refresh.
+        self.api.set_auth_headers({"Authorization": f"Token {token}"})
+        return self.api.get_json("datasets/history/")
+
+    def test_repeat_refresh_revalidates_with_etag(self):
+        first = self.refresh()
+        second = self.refresh()
+
+        self.assertEqual(second, first)
+        self.assertNotIn("If-None-Match", self.adapter.requests[0].headers)
+        self.assertEqual(self.adapter.requests[1].headers["If-None-Match"], RecordingAdapter.etag)
+
+    def test_new_credentials_drop_cached_bodies(self):
+        self.refresh()
+        self.refresh(token="other")
+
+        self.assertNotIn("If-None-Match", self.adapter.requests[1].headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Tests for the paged records model; run with ``python -m unittest`` from this directory."""
+
+import unittest
+
+from records_model import COLUMNS, RecordsTableModel
+
+
+class ImmediateTasks:
+    """Runs submitted work synchronously, like ``TaskRunner`` once the worker finishes."""
+
+    def submit(self, work, on_done=None, on_error=None, on_progress=None):
+        try:
+            result = work(None)
+        except Exception as exc:
+            on_error(str(exc))
+        else:
+            on_done(result)
+
+
+class PagedApi:
+    """Serves ``rows`` rows under a fixed ``count``, like a dataset that shrank mid-scroll."""
+
+    def __init__(self, rows, count):
+        self.rows = rows
+        self.count = count
+        self.calls = 0
+
+    def get_json(self, path, params=None):
+        self.calls += 1
+        stop = min(params["offset"] + params["limit"], self.rows)
+        size = max(stop - params["offset"], 0)
+        results = {column: [1.0] * size for column in COLUMNS}
+        return {"count": self.count, "results": results}
+
+
+class FlakyApi(PagedApi):
+    """Serves the first page, then fails every request."""
+
+    def get_json(self, path, params=None):
+        if self.calls:
+            self.calls += 1
+            raise RuntimeError("server unavailable")
+        return super().get_json(path, params)
+
+
+class RecordsTableModelTests(unittest.TestCase):
+    def test_empty_page_stops_fetching(self):
+        api = PagedApi(rows=3, count=10)
+        model = RecordsTableModel(api, ImmediateTasks())
+        model.set_dataset(1)
+
+        self.assertTrue(model.canFetchMore())
+        model.fetchMore()
+        self.assertEqual((model.rowCount(), model.total), (3, 3))
+        self.assertFalse(model.canFetchMore())
+        self.assertEqual(api.calls, 2)
+
+    def test_failed_page_waits_for_reload(self):
+        api = FlakyApi(rows=1000, count=1000)
+        model = RecordsTableModel(api, ImmediateTasks())
+        model.set_dataset(1)
+
+        model.fetchMore()
+        self.assertFalse(model.canFetchMore())
+        model.fetchMore()
+        self.assertEqual(api.calls, 2)
+        model.reload()
+        self.assertEqual(api.calls, 3)
+
+if __name__ == "__main__":
+    unittest.main()
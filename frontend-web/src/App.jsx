@@ -5,16 +5,14 @@ import HistoryList from './components/HistoryList'
 import LoginScreen from './components/LoginScreen'
 import useDatasets from './hooks/useDatasets.js'
 import useAuth from './hooks/useAuth.js'
-import { API_BASE_URL } from './lib/api.js'
+import { API_BASE_URL, logout } from './lib/api.js'
 
 const HAS_UPLOAD_KEY = 'cev-has-uploaded'
 
 const App = () => {
   const { credentials, saveCredentials, clearCredentials } = useAuth()
   const authKey =
-    credentials?.username && credentials?.password
-      ? `${credentials.username}:${credentials.password}`
-      : null
+    credentials?.username && credentials?.token ? `${credentials.username}:${credentials.token}` : null
   const isAuthenticated = Boolean(authKey)
   const { latest, history, isLoading, error, refresh } = useDatasets(isAuthenticated ? authKey : null)
   const [hasUploaded, setHasUploaded] = useState(() => {
@@ -34,6 +32,8 @@ const App = () => {
   }
 
   const handleSignOut = () => {
+    // Revoke the token server-side; the local copy is dropped either way.
+    logout().catch(() => {})
     clearCredentials()
     if (typeof window !== 'undefined') {
       localStorage.removeItem(HAS_UPLOAD_KEY)
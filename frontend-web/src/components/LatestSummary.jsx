@@ -1,4 +1,6 @@
 import DistributionChart from './charts/DistributionChart'
+import HistogramChart from './charts/HistogramChart'
+import ScatterChart from './charts/ScatterChart'
 import SummaryCards from './summary/SummaryCards'
 import RecordsTable from './tables/RecordsTable'
 
@@ -38,7 +40,11 @@ const LatestSummary = ({ dataset, isLoading, error }) => {
       <SummaryCards dataset={dataset} />
       <div className="grid lg:grid-cols-2 gap-4">
         <DistributionChart distribution={dataset.type_distribution} />
-        <RecordsTable records={dataset.records} />
+        <RecordsTable key={dataset.id} datasetId={dataset.id} />
+      </div>
+      <div className="grid lg:grid-cols-2 gap-4">
+        <HistogramChart key={`histogram-${dataset.id}`} datasetId={dataset.id} />
+        <ScatterChart key={`scatter-${dataset.id}`} datasetId={dataset.id} />
       </div>
     </section>
   )
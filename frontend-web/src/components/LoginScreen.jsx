@@ -1,5 +1,5 @@
 import { useMemo, useState } from 'react'
-import { verifyCredentials } from '../lib/api.js'
+import { login } from '../lib/api.js'
 
 const LoginScreen = ({ onSave }) => {
   const presetCredentials = useMemo(() => {
@@ -29,9 +29,9 @@ const LoginScreen = ({ onSave }) => {
     setStatus({ success: false, message: 'Verifying credentials…' })
 
     try {
-      await verifyCredentials(trimmedUser, trimmedPass)
-      const result = onSave?.(trimmedUser, trimmedPass)
-      setStatus({ success: true, message: 'Credentials verified and saved locally.' })
+      const { token, username: verifiedUser } = await login(trimmedUser, trimmedPass)
+      const result = onSave?.(verifiedUser, token)
+      setStatus({ success: true, message: 'Signed in.' })
       if (result?.success) {
         setUsername('')
         setPassword('')
@@ -50,7 +50,7 @@ const LoginScreen = ({ onSave }) => {
           <p className="text-xs uppercase tracking-[0.2em] text-blue-500 font-semibold">Secure Access</p>
           <h1 className="text-2xl font-bold text-gray-900">Sign in to continue</h1>
           <p className="text-sm text-gray-600">
-            Use the Django Basic Auth credentials you share with reviewers. Once signed in you can
+            Use the Django credentials you share with reviewers. Once signed in you can
             upload CSVs, visualize the data, and download PDF summaries.
           </p>
         </header>
@@ -1,5 +1,5 @@
 import { useRef, useState } from 'react'
-import { uploadDataset } from '../lib/api.js'
+import { uploadDataset, waitForIngestJob } from '../lib/api.js'
 
 const UploadForm = ({ onUploaded, disabled = false, disabledMessage = '' }) => {
   const [name, setName] = useState('')
@@ -28,6 +28,7 @@ const UploadForm = ({ onUploaded, disabled = false, disabledMessage = '' }) => {
     }
     const formData = new FormData()
     formData.append('file', file)
+    formData.append('background', 'true')
     if (name.trim()) {
       formData.append('name', name.trim())
     }
@@ -36,7 +37,10 @@ const UploadForm = ({ onUploaded, disabled = false, disabledMessage = '' }) => {
     setStatus({ type: null, message: '' })
 
     try {
-      await uploadDataset(formData)
+      const { data: job } = await uploadDataset(formData)
+      await waitForIngestJob(job.id, ({ status: jobStatus, progress }) => {
+        setStatus({ type: null, message: `Processing upload (${jobStatus})… ${progress}%` })
+      })
       setStatus({ type: 'success', message: 'Upload successful!' })
       resetForm()
       onUploaded?.()
@@ -100,7 +104,11 @@ const UploadForm = ({ onUploaded, disabled = false, disabledMessage = '' }) => {
         {status.message && (
           <p
             className={`text-sm ${
-              status.type === 'error' ? 'text-red-600' : 'text-green-600'
+              status.type === 'error'
+                ? 'text-red-600'
+                : status.type === 'success'
+                  ? 'text-green-600'
+                  : 'text-gray-600'
             }`}
           >
             {status.message}
@@ -0,0 +1,88 @@
+import { useEffect, useMemo, useState } from 'react'
+import { Bar } from 'react-chartjs-2'
+import {
+  BarElement,
+  CategoryScale,
+  Chart as ChartJS,
+  LinearScale,
+  Title,
+  Tooltip,
+} from 'chart.js'
+import { getDatasetHistogram } from '../../lib/api.js'
+
+ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip)
+
+const COLUMNS = ['flowrate', 'pressure', 'temperature']
+const BINS = 20
+
+// Bins are computed and cached by the API, so the payload size never depends on row count.
+const HistogramChart = ({ datasetId }) => {
+  const [column, setColumn] = useState(COLUMNS[0])
+  const [histogram, setHistogram] = useState(null)
+  const [error, setError] = useState('')
+
+  useEffect(() => {
+    if (!datasetId) return undefined
+    let cancelled = false
+    getDatasetHistogram(datasetId, { column, bins: BINS })
+      .then((data) => {
+        if (!cancelled) {
+          setHistogram(data)
+          setError('')
+        }
+      })
+      .catch((err) => {
+        if (!cancelled) setError(err.message)
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [datasetId, column])
+
+  const chartData = useMemo(() => {
+    if (!histogram) return null
+    const { edges, counts } = histogram
+    return {
+      labels: counts.map((_, index) => `${edges[index]}–${edges[index + 1]}`),
+      datasets: [
+        {
+          label: 'Rows',
+          data: counts,
+          backgroundColor: '#0ea5e9',
+          barPercentage: 1,
+          categoryPercentage: 1,
+        },
+      ],
+    }
+  }, [histogram])
+
+  const options = {
+    responsive: true,
+    plugins: {
+      legend: { display: false },
+      title: { display: true, text: `${column[0].toUpperCase()}${column.slice(1)} Distribution` },
+    },
+  }
+
+  return (
+    <div className="bg-white rounded-lg border border-gray-200 p-4 space-y-2">
+      <div className="flex justify-end">
+        <select
+          value={column}
+          onChange={(event) => setColumn(event.target.value)}
+          className="text-sm border border-gray-300 rounded px-2 py-1"
+        >
+          {COLUMNS.map((option) => (
+            <option key={option} value={option}>
+              {option}
+            </option>
+          ))}
+        </select>
+      </div>
+      {error && <p className="text-sm text-red-600">{error}</p>}
+      {chartData && <Bar data={chartData} options={options} height={220} />}
+    </div>
+  )
+}
+
+export default HistogramChart
@@ -0,0 +1,78 @@
+import { useEffect, useMemo, useState } from 'react'
+import { Scatter } from 'react-chartjs-2'
+import { Chart as ChartJS, LinearScale, PointElement, Title, Tooltip } from 'chart.js'
+import { getDatasetScatter } from '../../lib/api.js'
+
+ChartJS.register(LinearScale, PointElement, Title, Tooltip)
+
+const MAX_POINTS = 1000
+
+// The API downsamples with LTTB, so large datasets still render at most MAX_POINTS points.
+const ScatterChart = ({ datasetId, x = 'flowrate', y = 'temperature' }) => {
+  const [scatter, setScatter] = useState(null)
+  const [error, setError] = useState('')
+
+  useEffect(() => {
+    if (!datasetId) return undefined
+    let cancelled = false
+    getDatasetScatter(datasetId, { x, y, max_points: MAX_POINTS })
+      .then((data) => {
+        if (!cancelled) {
+          setScatter(data)
+          setError('')
+        }
+      })
+      .catch((err) => {
+        if (!cancelled) setError(err.message)
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [datasetId, x, y])
+
+  const chartData = useMemo(() => {
+    if (!scatter) return null
+    return {
+      datasets: [
+        {
+          label: `${y} vs ${x}`,
+          data: scatter.points.map(([px, py]) => ({ x: px, y: py })),
+          backgroundColor: '#6366f1',
+          pointRadius: 2,
+        },
+      ],
+    }
+  }, [scatter, x, y])
+
+  if (error) {
+    return <p className="text-sm text-red-600">{error}</p>
+  }
+
+  if (!chartData) return null
+
+  const sampled = scatter.points.length < scatter.total
+  const options = {
+    responsive: true,
+    plugins: {
+      legend: { display: false },
+      title: {
+        display: true,
+        text: sampled
+          ? `${y} vs ${x} (${scatter.points.length} of ${scatter.total} rows)`
+          : `${y} vs ${x}`,
+      },
+    },
+    scales: {
+      x: { title: { display: true, text: x } },
+      y: { title: { display: true, text: y } },
+    },
+  }
+
+  return (
+    <div className="bg-white rounded-lg border border-gray-200 p-4">
+      <Scatter data={chartData} options={options} height={220} />
+    </div>
+  )
+}
+
+export default ScatterChart
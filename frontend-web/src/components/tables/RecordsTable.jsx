@@ -1,5 +1,37 @@
-const RecordsTable = ({ records = [] }) => {
-  if (!records.length) {
+import { useEffect, useState } from 'react'
+import { getDatasetRecords } from '../../lib/api.js'
+
+const PAGE_SIZE = 50
+const COLUMNS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+const RecordsTable = ({ datasetId }) => {
+  const [page, setPage] = useState({ offset: 0, count: 0, results: [] })
+  const [offset, setOffset] = useState(0)
+  const [error, setError] = useState('')
+
+  useEffect(() => {
+    if (!datasetId) return undefined
+    let cancelled = false
+    getDatasetRecords(datasetId, { limit: PAGE_SIZE, offset })
+      .then((data) => {
+        if (!cancelled) {
+          setPage({ offset, count: data.count, results: data.results })
+          setError('')
+        }
+      })
+      .catch((err) => {
+        if (!cancelled) setError(err.message)
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [datasetId, offset])
+
+  if (error) {
+    return <p className="text-sm text-red-600">{error}</p>
+  }
+
+  if (!page.results.length) {
     return (
       <div className="border border-dashed border-gray-300 rounded-lg p-4 text-center text-gray-500">
         No records available.
@@ -7,15 +39,14 @@ const RecordsTable = ({ records = [] }) => {
     )
   }
 
-  const columns = Object.keys(records[0])
-  const visibleRecords = records.slice(0, 50)
+  const lastRow = page.offset + page.results.length
 
   return (
     <div className="overflow-auto border border-gray-200 rounded-lg">
       <table className="min-w-full text-sm">
         <thead className="bg-gray-50">
           <tr>
-            {columns.map((column) => (
+            {COLUMNS.map((column) => (
               <th key={column} className="px-4 py-2 text-left font-semibold text-gray-600">
                 {column.replace('_', ' ')}
               </th>
@@ -23,9 +54,9 @@ const RecordsTable = ({ records = [] }) => {
           </tr>
         </thead>
         <tbody>
-          {visibleRecords.map((record, index) => (
-            <tr key={`${record.equipment_name}-${index}`} className="odd:bg-white even:bg-gray-50">
-              {columns.map((column) => (
+          {page.results.map((record) => (
+            <tr key={record.position} className="odd:bg-white even:bg-gray-50">
+              {COLUMNS.map((column) => (
                 <td key={column} className="px-4 py-2 text-gray-700">
                   {record[column]}
                 </td>
@@ -34,11 +65,29 @@ const RecordsTable = ({ records = [] }) => {
           ))}
         </tbody>
       </table>
-      {records.length > visibleRecords.length && (
-        <p className="text-xs text-gray-500 px-4 py-2">
-          Showing {visibleRecords.length} of {records.length} rows.
-        </p>
-      )}
+      <div className="flex items-center justify-between px-4 py-2 text-xs text-gray-500">
+        <span>
+          Showing {page.offset + 1}–{lastRow} of {page.count} rows.
+        </span>
+        <div className="flex gap-2">
+          <button
+            type="button"
+            onClick={() => setOffset(Math.max(0, page.offset - PAGE_SIZE))}
+            disabled={page.offset === 0}
+            className="px-2 py-1 border border-gray-300 rounded disabled:opacity-50 cursor-pointer"
+          >
+            Previous
+          </button>
+          <button
+            type="button"
+            onClick={() => setOffset(page.offset + PAGE_SIZE)}
+            disabled={lastRow >= page.count}
+            className="px-2 py-1 border border-gray-300 rounded disabled:opacity-50 cursor-pointer"
+          >
+            Next
+          </button>
+        </div>
+      </div>
     </div>
   )
 }
@@ -10,16 +10,15 @@ const useAuth = () => {
 
   // credentials are initialized from storage on first render; no effect needed
 
-  const save = useCallback((username, password) => {
+  const save = useCallback((username, token) => {
     const trimmedUser = username?.trim()
-    const trimmedPass = password?.trim()
-    if (!trimmedUser || !trimmedPass) {
+    if (!trimmedUser || !token) {
       setCredentials(clearAuthCredentials())
-      return { success: false, message: 'Username and password are required.' }
+      return { success: false, message: 'Username and token are required.' }
     }
-    const stored = setAuthCredentials(trimmedUser, trimmedPass)
+    const stored = setAuthCredentials(trimmedUser, token)
     setCredentials(stored)
-    return { success: true, message: 'Credentials saved. They are stored locally in this browser.' }
+    return { success: true, message: 'Signed in. The session token is stored locally in this browser.' }
   }, [])
 
   const reset = useCallback(() => {
@@ -32,7 +32,7 @@ const useDatasets = (authKey) => {
     } catch (error) {
       let message = 'Unable to fetch datasets. Please try again.'
       if (error?.response?.status === 401) {
-        message = 'Invalid username or password. Double-check your Django credentials.'
+        message = 'Your session has expired or was revoked. Sign out and sign in again.'
       } else if (error?.message === 'Network Error') {
         message = `Cannot reach backend at ${API_BASE_URL}. Is it running and reachable?`
       } else if (error?.response?.data?.detail) {
@@ -27,23 +27,87 @@ const client = axios.create({
 
 client.interceptors.request.use((config) => {
   const credentials = getAuthCredentials()
-  if (credentials?.username && credentials?.password) {
-    const token = btoa(`${credentials.username}:${credentials.password}`)
-    config.headers.Authorization = `Basic ${token}`
+  if (credentials?.token) {
+    config.headers.Authorization = `Token ${credentials.token}`
   } else if (config.headers.Authorization) {
     delete config.headers.Authorization
   }
   return config
 })
 
+// Dataset payloads carry strong ETags. Keep the last body per URL and let the
+// server answer 304 Not Modified instead of resending it.
+const etagCache = new Map()
+
+const cacheKey = (url, params, token) => JSON.stringify([token || null, url, params || {}])
+
+const getCached = async (url, params) => {
+  const key = cacheKey(url, params, getAuthCredentials()?.token)
+  const cached = etagCache.get(key)
+  const response = await client.get(url, {
+    params,
+    headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+    validateStatus: (status) => (status >= 200 && status < 300) || (cached && status === 304),
+  })
+  if (response.status === 304) return cached.data
+  const etag = response.headers.etag
+  if (etag) etagCache.set(key, { etag, data: response.data })
+  return response.data
+}
+
 export const uploadDataset = (formData) =>
   client.post('/datasets/upload/', formData, {
     headers: { 'Content-Type': 'multipart/form-data' },
   })
 
-export const getLatestDataset = () => client.get('/datasets/latest/').then((res) => res.data)
+export const getIngestJob = (jobId) => client.get(`/jobs/${jobId}/`).then((res) => res.data)
+
+const JOB_POLL_INTERVAL_MS = 1000
+const JOB_POLL_MAX_INTERVAL_MS = 15000
+const JOB_POLL_MAX_ERRORS = 6
+const JOB_POLL_TIMEOUT_MS = 30 * 60 * 1000
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
+// Network errors, 5xx and 429 say nothing about the job itself; retry those.
+const isTransient = (error) => {
+  const status = error?.response?.status
+  return !status || status >= 500 || status === 429
+}
+
+// Poll a background upload until it finishes; resolves with the final job payload.
+// Only a `failed` job rejects as a failed upload. Transient poll errors are
+// retried with exponential backoff, and polling gives up (the job may still
+// finish) after JOB_POLL_MAX_ERRORS failures in a row or JOB_POLL_TIMEOUT_MS.
+export const waitForIngestJob = async (jobId, onProgress) => {
+  const deadline = Date.now() + JOB_POLL_TIMEOUT_MS
+  let errors = 0
+  while (Date.now() < deadline) {
+    let job
+    try {
+      job = await getIngestJob(jobId)
+    } catch (error) {
+      errors += 1
+      if (!isTransient(error) || errors >= JOB_POLL_MAX_ERRORS) {
+        throw new Error(
+          'Lost contact with the server while processing. The upload may still finish; refresh later to check.',
+        )
+      }
+      await sleep(Math.min(JOB_POLL_INTERVAL_MS * 2 ** errors, JOB_POLL_MAX_INTERVAL_MS))
+      continue
+    }
+    errors = 0
+    onProgress?.(job)
+    if (job.status === 'succeeded') return job
+    if (job.status === 'failed') throw new Error(job.error || 'Upload processing failed.')
+    await sleep(JOB_POLL_INTERVAL_MS)
+  }
+  throw new Error('The upload is still processing on the server. Refresh later to check.')
+}
 
-export const getDatasetHistory = () => client.get('/datasets/history/').then((res) => res.data)
+export const getLatestDataset = () => getCached('/datasets/latest/', { include_records: false })
+
+export const getDatasetHistory = () => getCached('/datasets/history/')
 
 export const downloadDatasetReport = async (datasetId) => {
   const response = await client.get(`/datasets/${datasetId}/report/`, {
@@ -53,15 +117,27 @@ export const downloadDatasetReport = async (datasetId) => {
 }
 
 export const getDatasetDetail = (datasetId) =>
-  client.get(`/datasets/${datasetId}/`).then((res) => res.data)
+  getCached(`/datasets/${datasetId}/`, { include_records: false })
+
+export const getDatasetRecords = (datasetId, params = {}) =>
+  client.get(`/datasets/${datasetId}/records/`, { params }).then((res) => res.data)
+
+export const getDatasetHistogram = (datasetId, params = {}) =>
+  client.get(`/datasets/${datasetId}/histogram/`, { params }).then((res) => res.data)
 
-export const verifyCredentials = async (username, password) => {
+export const getDatasetScatter = (datasetId, params = {}) =>
+  client.get(`/datasets/${datasetId}/scatter/`, { params }).then((res) => res.data)
+
+// The password is checked once here; later requests only send the returned token.
+export const login = async (username, password) => {
   if (!username || !password) {
     throw new Error('Username and password are required for verification.')
   }
-  const token = btoa(`${username}:${password}`)
-  await axios.get(`${API_BASE_URL}/datasets/history/`, {
-    headers: { Authorization: `Basic ${token}` },
-  })
-  return true
+  const response = await axios.post(`${API_BASE_URL}/auth/login/`, { username, password })
+  return response.data
+}
+
+export const logout = () => {
+  etagCache.clear()
+  return client.post('/auth/logout/')
 }
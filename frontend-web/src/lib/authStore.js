@@ -1,4 +1,6 @@
-const STORAGE_KEY = 'cev-basic-auth'
+const STORAGE_KEY = 'cev-auth-token'
+// Older builds stored the raw username/password pair here; it is dropped on first load.
+const LEGACY_STORAGE_KEY = 'cev-basic-auth'
 
 let runtimeCredentials = null
 
@@ -7,10 +9,11 @@ const readFromStorage = () => {
     return null
   }
   try {
+    window.localStorage.removeItem(LEGACY_STORAGE_KEY)
     const raw = window.localStorage.getItem(STORAGE_KEY)
     if (!raw) return null
     const parsed = JSON.parse(raw)
-    if (parsed?.username && parsed?.password) {
+    if (parsed?.username && parsed?.token) {
       return parsed
     }
   } catch (error) {
@@ -20,7 +23,7 @@ const readFromStorage = () => {
 }
 
 export const getAuthCredentials = () => {
-  if (runtimeCredentials?.username && runtimeCredentials?.password) {
+  if (runtimeCredentials?.username && runtimeCredentials?.token) {
     return runtimeCredentials
   }
   const stored = readFromStorage()
@@ -31,11 +34,11 @@ export const getAuthCredentials = () => {
   return null
 }
 
-export const setAuthCredentials = (username, password) => {
-  if (!username || !password) {
+export const setAuthCredentials = (username, token) => {
+  if (!username || !token) {
     return clearAuthCredentials()
   }
-  runtimeCredentials = { username, password, source: 'user' }
+  runtimeCredentials = { username, token, source: 'user' }
   if (typeof window !== 'undefined') {
     window.localStorage.setItem(STORAGE_KEY, JSON.stringify(runtimeCredentials))
   }